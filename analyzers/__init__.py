@@ -1,3 +1,5 @@
 from .bailian import BailianAnalyzer
+from .limiter import AdaptiveLimiter
+from .policy import RequestPolicy, CircuitBreaker
 
-__all__ = ["BailianAnalyzer"]
+__all__ = ["BailianAnalyzer", "AdaptiveLimiter", "RequestPolicy", "CircuitBreaker"]
@@ -2,23 +2,87 @@
 """阿里百炼 API 分析器"""
 
 import asyncio
+import hashlib
+import inspect
 import json
-from typing import Dict, Any, Optional
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterable, AsyncIterator, Callable
 from datetime import datetime
 
 import aiohttp
 
-from config import BAILIAN_API_KEY, BAILIAN_MODEL, BAILIAN_ENDPOINT, DEBUG, BAILIAN_TIMEOUT
+import metrics
+from config import (
+    BAILIAN_API_KEY, BAILIAN_MODEL, BAILIAN_ENDPOINT, DEBUG, BAILIAN_TIMEOUT, LLM_CACHE_ENABLED,
+    BAILIAN_BATCH_SIZE, BAILIAN_BATCH_LINGER, BAILIAN_STREAM, BAILIAN_ABORT_MARGIN
+)
 from models.opportunity import Opportunity
+from analyzers.cache import ResponseCache
+from analyzers.limiter import AdaptiveLimiter, OK, THROTTLED, FAILED
+from analyzers.policy import RequestPolicy, RETRY_STATUSES
+from analyzers.usage import UsageTracker
+
+
+SYSTEM_PROMPT = "你是一个产品机会分析专家。分析技术新闻和产品，评估商业机会。输出严格的 JSON 格式。\n\n"
+
+# 流式输出中已完整出现的评分（数字后已有分隔符）
+_STREAMED_SCORE = re.compile(r'"score"\s*:\s*(\d+)\s*[,}\n]')
+
+OUTPUT_SCHEMA = """{
+    "score": 75,
+    "summary": "50 字一句话：为什么适合/不适合一人公司",
+    "description": "100 字：做什么、解决什么问题、目标用户",
+    "solo_feasibility": "150 字：为什么适合一人公司 + Agent 完成，哪些工作可自动化",
+    "agent_roles": ["内容 Agent", "客服 Agent", "开发 Agent", "营销 Agent"],
+    "startup_cost": "<$1k 或 $1-5k 或 $5-20k 或 >$20k",
+    "time_to_revenue": "<7 天 或 30 天 或 90 天 或 >90 天",
+    "revenue_model": "订阅 或 一次性 或 联盟 或 广告 或 API 收费",
+    "monthly_potential": "$1-10k 或 $10-50k 或 $50k+",
+    "automation_rate": "50% 或 70% 或 90%+",
+    "customer_acquisition": "SEO 或 社交媒体 或 付费广告 或 联盟 或 Product Hunt",
+    "risks": "50 字主要风险",
+    "action_plan": "50 字第一步做什么",
+    "tags": ["SaaS", "AI", "B2B", "内容", "自动化"]
+}"""
+
+SCORING_RUBRIC = """评分标准（一人公司视角）：
+- 90-100: 启动成本低 (<$5k) + 30 天见钱 + 可 90% 自动化 + 月入$50k+ 潜力 → 立即开干
+- 70-89: 一人能完成 + 有明确获客渠道 + 月入$10-50k 潜力 → 深入研究
+- 50-69: 需要验证 + 可能需要外包部分工作 → 保持关注
+- 0-49: 需要团队/重资金/难自动化 → 跳过"""
 
 
 class BailianAnalyzer:
     """阿里百炼大模型分析器"""
     
-    def __init__(self, api_key: str = None, model: str = None):
+    # 批量请求的输出 token 上限（按条目数放大，但不超过该值）
+    MAX_BATCH_TOKENS = 8000
+    
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        cache: Optional[ResponseCache] = None,
+        batch_size: int = BAILIAN_BATCH_SIZE,
+        limiter: Optional[AdaptiveLimiter] = None,
+        policy: Optional[RequestPolicy] = None,
+        usage: Optional[UsageTracker] = None
+    ):
         self.api_key = api_key or BAILIAN_API_KEY
         self.model = model or BAILIAN_MODEL
         self.endpoint = BAILIAN_ENDPOINT
+        self.timeout = BAILIAN_TIMEOUT
+        self.temperature = 0.7
+        self.max_tokens = 1000
+        self.batch_size = max(1, batch_size)
+        self.limiter = limiter or AdaptiveLimiter()
+        self.policy = policy or RequestPolicy()
+        self.usage = usage or UsageTracker()
+        self.stream = BAILIAN_STREAM
+        self.early_aborts = 0
+        self._rejected: set = set()  # 提前终止的条目（source:id），回调时按未分析处理
+        self.cache = cache if cache is not None else (ResponseCache() if LLM_CACHE_ENABLED else None)
         
         if not self.api_key:
             raise ValueError("BAILIAN_API_KEY not configured")
@@ -26,140 +90,377 @@ class BailianAnalyzer:
     async def analyze_async(
         self,
         item: Dict[str, Any],
-        session: Optional[aiohttp.ClientSession] = None
+        session: Optional[aiohttp.ClientSession] = None,
+        min_score: Optional[int] = None
     ) -> Optional[Opportunity]:
         """
-        分析一个项目，生成机会评估（带重试机制）
+        分析一个项目，生成机会评估（带重试机制和响应缓存）
         
         Args:
             item: 收集到的项目数据
+            min_score: 给出时启用流式提前终止：评分低于 min_score - BAILIAN_ABORT_MARGIN
+                       即停止生成，返回只有评分的 Opportunity（不写缓存）
             
         Returns:
             Opportunity 对象，如果分析失败返回 None
         """
-        max_retries = 3
-        base_delay = 2  # 秒
+        try:
+            prompt = self._build_prompt(item)
+            
+            cache_key = self._cache_key(prompt)
+            content = self.cache.get(cache_key) if cache_key else None
+            
+            sources = [item.get('source', 'unknown')]
+            
+            if content is None:
+                abort_below = min_score - BAILIAN_ABORT_MARGIN if min_score is not None and self.stream else None
+                content = await self._request(prompt, session, abort_below=abort_below, sources=sources)
+                if content is None:
+                    return None
+                analysis = self._parse_json(content)
+                # 只缓存能解析的完整回答
+                if analysis and cache_key and not analysis.get('rejected'):
+                    self.cache.set(cache_key, content)
+            else:
+                self.usage.record(self.model, sources, cache_hit=True)
+                analysis = self._parse_json(content)
+            
+            if not analysis:
+                return None
+            if analysis.get('rejected'):
+                analysis.setdefault('summary', f"评分 {analysis.get('score')} 明显低于阈值，已提前终止分析")
+            
+            return self._build_opportunity(item, analysis)
+            
+        except Exception as e:
+            print(f"Error analyzing item: {e}")
+            if DEBUG:
+                import traceback
+                traceback.print_exc()
+            return None
+
+    async def analyze_batch_async(
+        self,
+        items: List[Dict[str, Any]],
+        session: Optional[aiohttp.ClientSession] = None,
+        min_score: Optional[int] = None
+    ) -> List[Optional[Opportunity]]:
+        """
+        一次请求分析多个条目（说明和评分标准只发送一次）
+        
+        每个条目先查单条缓存；结果按 id 对应回条目，并以单条分析的缓存键写入缓存。
+        请求失败、输出无法解析或缺少某个 id 时，对应条目回退到逐条分析。
+        
+        Args:
+            items: 收集到的项目数据列表
+            min_score: 回退到逐条分析时传给 analyze_async（流式提前终止）
+            
+        Returns:
+            与 items 一一对应的 Opportunity 列表，分析失败的位置为 None
+        """
+        results: List[Optional[Opportunity]] = [None] * len(items)
+        pending = []  # (位置, 缓存键)
+        
+        for index, item in enumerate(items):
+            cache_key = self._cache_key(self._build_prompt(item))
+            content = self.cache.get(cache_key) if cache_key else None
+            analysis = self._parse_json(content) if content is not None else None
+            if analysis:
+                self.usage.record(self.model, [item.get('source', 'unknown')], cache_hit=True)
+                results[index] = self._build_opportunity(item, analysis)
+            else:
+                pending.append((index, cache_key))
+        
+        ids = [str(items[index]['id']) for index, _ in pending]
+        analyses: Dict[str, Dict[str, Any]] = {}
+        if len(pending) > 1 and len(set(ids)) == len(ids):
+            try:
+                prompt = self._build_batch_prompt([items[index] for index, _ in pending])
+                max_tokens = min(self.max_tokens * len(pending), self.MAX_BATCH_TOKENS)
+                sources = [items[index].get('source', 'unknown') for index, _ in pending]
+                content = await self._request(prompt, session, max_tokens=max_tokens, sources=sources)
+                for analysis in self._parse_json_array(content or ''):
+                    if isinstance(analysis, dict) and str(analysis.get('id', '')) in ids:
+                        analyses[str(analysis.pop('id'))] = analysis
+            except Exception as e:
+                print(f"Error analyzing batch: {e}")
+                if DEBUG:
+                    import traceback
+                    traceback.print_exc()
+            if DEBUG:
+                print(f"Batch of {len(pending)}: {len(analyses)} parsed")
+        
+        fallback = []
+        for (index, cache_key), item_id in zip(pending, ids):
+            analysis = analyses.get(item_id)
+            if analysis is None:
+                fallback.append(index)
+                continue
+            if cache_key:
+                self.cache.set(cache_key, json.dumps(analysis, ensure_ascii=False))
+            results[index] = self._build_opportunity(items[index], analysis)
+        
+        for index in fallback:
+            results[index] = await self.analyze_async(items[index], session=session, min_score=min_score)
+        
+        return results
+    
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        """单条提示词的缓存键（未启用缓存返回 None）"""
+        if not self.cache:
+            return None
+        return self.cache.key(self.model, PROMPT_VERSION, self.temperature, self.max_tokens, prompt)
 
-        prompt = self._build_prompt(item)
+    async def _request(
+        self,
+        prompt: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_tokens: Optional[int] = None,
+        abort_below: Optional[int] = None,
+        sources: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        调用模型接口（按 self.policy 重试、熔断和限额），返回 AI 输出文本
+        
+        Args:
+            abort_below: 给出时以 SSE 流式请求，输出的评分低于该值即终止，
+                         返回 {"score": n, "rejected": true}
+            sources: 本次请求分析的条目来源（用量统计）
+        
+        Returns:
+            AI 输出文本，请求失败返回 None
+        """
         payload = {
             "model": self.model,
             "messages": [
                 {
                     "role": "user",
-                    "content": "你是一个产品机会分析专家。分析技术新闻和产品，评估商业机会。输出严格的 JSON 格式。\n\n" + prompt
+                    "content": SYSTEM_PROMPT + prompt
                 }
             ],
-            "max_tokens": 1000,
-            "temperature": 0.7
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature
         }
+        if abort_below is not None:
+            payload["stream"] = True
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
 
         own_session = session is None
-        timeout = aiohttp.ClientTimeout(total=BAILIAN_TIMEOUT)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
         client = session or aiohttp.ClientSession(timeout=timeout)
 
+        policy = self.policy
+        estimated_tokens = len(payload["messages"][0]["content"]) // 2 + payload["max_tokens"]
+        last_error = ''
+        call = {'attempts': 0, 'failed': True, 'latency': 0.0}
+        self.usage.in_flight_tokens += estimated_tokens
+
         try:
-            for attempt in range(max_retries):
+            for attempt in range(policy.max_attempts):
+                await policy.before_request(estimated_tokens)
+                call['attempts'] += 1
+                retry_after = None
                 try:
-                    async with client.post(
-                        self.endpoint,
-                        headers=headers,
-                        json=payload
-                    ) as response:
-                        if response.status == 429:  # Rate limited
-                            delay = base_delay * (2 ** attempt)
-                            print(f"Rate limited, retrying in {delay}s...")
-                            await asyncio.sleep(delay)
-                            continue
-
-                        if response.status != 200:
-                            response_text = await response.text()
-                            print(f"API Error: {response.status}")
-                            print(f"Response: {response_text[:500]}")
-                            return None
-
-                        result = await response.json()
-                        break  # Success
-
+                    status, body, response_headers = await self._post(client, headers, payload, abort_below, call)
                 except (aiohttp.ServerTimeoutError, asyncio.TimeoutError):
-                    if attempt < max_retries - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"Timeout, retrying in {delay}s...")
-                        await asyncio.sleep(delay)
-                    else:
-                        print(f"Timeout after {max_retries} attempts")
-                        return None
+                    last_error = 'timeout'
+                    policy.retryable(None)
                 except aiohttp.ClientError as e:
-                    if attempt < max_retries - 1:
-                        delay = base_delay * (2 ** attempt)
-                        print(f"Request error: {e}, retrying in {delay}s...")
-                        await asyncio.sleep(delay)
-                    else:
-                        print(f"Request failed after {max_retries} attempts: {e}")
+                    last_error = f"request error: {e}"
+                    policy.retryable(None)
+                else:
+                    if status == 200:
+                        policy.success()
+                        result = body
+                        call['failed'] = False
+                        break  # Success
+
+                    if status not in RETRY_STATUSES:
+                        policy.client_error()
+                        print(f"API Error: {status}")
+                        print(f"Response: {body[:500]}")
                         return None
+
+                    last_error = f"HTTP {status}"
+                    retry_after = policy.retryable(status, response_headers)
+
+                if attempt < policy.max_attempts - 1:
+                    metrics.inc('llm_retries_total', model=self.model, reason=last_error.split(':')[0])
+                    delay = policy.backoff(attempt, retry_after)
+                    print(f"{last_error}, retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
             else:
+                policy.stats['gave_up'] += 1
+                metrics.inc('llm_gave_up_total', model=self.model)
+                print(f"Giving up after {policy.max_attempts} attempts ({last_error})")
                 return None
-            
-            # 处理成功的响应
-            if DEBUG:
-                print(f"API Response: {json.dumps(result, indent=2)}")
-            
-            # 解析 AI 输出 - Anthropic 兼容 API 格式
-            content = ''
-            if 'content' in result and isinstance(result['content'], list) and len(result['content']) > 0:
-                content = result['content'][0].get('text', '')
-            elif 'choices' in result:
-                content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
-            
-            if DEBUG:
-                print(f"AI Response: {content}")
-            
-            # 尝试解析 JSON
-            analysis = self._parse_json(content)
-            if not analysis:
-                return None
-            
-            # 创建 Opportunity（一人公司格式）
-            return Opportunity(
-                id=item['id'],
-                title=item['title'],
-                source=item.get('source', 'unknown'),
-                url=item.get('url', ''),
-                score=analysis.get('score', 50),
-                summary=analysis.get('summary', ''),
-                description=analysis.get('description', ''),
-                solo_feasibility=analysis.get('solo_feasibility', ''),
-                agent_roles=analysis.get('agent_roles', []),
-                startup_cost=analysis.get('startup_cost', ''),
-                time_to_revenue=analysis.get('time_to_revenue', ''),
-                revenue_model=analysis.get('revenue_model', ''),
-                monthly_potential=analysis.get('monthly_potential', ''),
-                automation_rate=analysis.get('automation_rate', ''),
-                customer_acquisition=analysis.get('customer_acquisition', ''),
-                risks=analysis.get('risks', ''),
-                action_plan=analysis.get('action_plan', ''),
-                tags=analysis.get('tags', []),
-                source_url=item.get('url', ''),
-                research_links=[
-                    item.get('url', ''),
-                    f"https://www.google.com/search?q={item.get('title', '')}",
-                    f"https://www.google.com/search?q={item.get('title', '')}+competitors+alternatives"
-                ],
-                created_at=datetime.now()
-            )
-            
-        except Exception as e:
-            print(f"Error analyzing item: {e}")
-            if DEBUG:
-                import traceback
-                traceback.print_exc()
-            return None
         finally:
             if own_session:
                 await client.close()
+            self.usage.in_flight_tokens -= estimated_tokens
+            if call['failed']:
+                self.usage.record(self.model, sources, **call)
+        
+        usage = result.get('usage') or {}
+        input_tokens = usage.get('input_tokens') or usage.get('prompt_tokens') or 0
+        output_tokens = usage.get('output_tokens') or usage.get('completion_tokens') or 0
+        policy.settle(estimated_tokens, input_tokens + output_tokens)
+        self.usage.record(
+            self.model,
+            sources,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency=call['latency'],
+            attempts=call['attempts'],
+            aborted=result.get('stop_reason') == 'aborted'
+        )
+        
+        # 处理成功的响应
+        if DEBUG:
+            print(f"API Response: {json.dumps(result, indent=2)}")
+        
+        # 解析 AI 输出 - Anthropic 兼容 API 格式
+        content = ''
+        if 'content' in result and isinstance(result['content'], list) and len(result['content']) > 0:
+            content = result['content'][0].get('text', '')
+        elif 'choices' in result:
+            content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
+        
+        if DEBUG:
+            print(f"AI Response: {content}")
+        
+        return content
+
+    async def _post(
+        self,
+        client: aiohttp.ClientSession,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        abort_below: Optional[int] = None,
+        call: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Any, Any]:
+        """
+        发送一次请求，占用一个自适应并发名额；429 和超时会缩小共享窗口
+        
+        call 给出时把本次请求耗时（不含排队）累加到 call['latency']。
+        
+        Returns:
+            (状态码, 200 时为 JSON，否则为响应文本, 响应头)
+        """
+        started = await self.limiter.acquire()
+        outcome = FAILED
+        status = 'error'
+        try:
+            async with client.post(self.endpoint, headers=headers, json=payload) as response:
+                status = response.status
+                if response.status == 200:
+                    if response.content_type == 'text/event-stream':
+                        body = await self._read_stream(response, abort_below)
+                    else:
+                        body = await response.json()
+                    outcome = OK
+                else:
+                    body = await response.text()
+                    if response.status == 429:
+                        outcome = THROTTLED
+                return response.status, body, response.headers
+        except (aiohttp.ServerTimeoutError, asyncio.TimeoutError):
+            outcome = THROTTLED
+            status = 'timeout'
+            raise
+        finally:
+            self.limiter.release(started, outcome)
+            elapsed = time.monotonic() - started
+            metrics.observe('llm_request_seconds', elapsed, model=self.model)
+            metrics.inc('llm_responses_total', model=self.model, status=status)
+            if call is not None:
+                call['latency'] += elapsed
+
+    async def _read_stream(self, response: aiohttp.ClientResponse, abort_below: Optional[int]) -> Dict[str, Any]:
+        """
+        读取 SSE 流（Anthropic 或 OpenAI 兼容格式），拼成与非流式响应相同结构的结果
+        
+        评分一出现就检查：低于 abort_below 时关闭连接，不再等待剩余输出。
+        """
+        text = ''
+        usage: Dict[str, int] = {}
+        score_checked = abort_below is None
+        
+        async for line in response.content:
+            line = line.strip()
+            if not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                break
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            
+            if event.get('type') == 'message_start':
+                usage.update(event.get('message', {}).get('usage') or {})
+            elif event.get('type') == 'content_block_delta':
+                text += event.get('delta', {}).get('text', '')
+            elif event.get('type') == 'message_delta':
+                usage.update(event.get('usage') or {})
+            elif event.get('choices'):
+                text += (event['choices'][0].get('delta') or {}).get('content') or ''
+                usage.update(event.get('usage') or {})
+            
+            if not score_checked:
+                match = _STREAMED_SCORE.search(text)
+                if match:
+                    score_checked = True
+                    score = int(match.group(1))
+                    if score < abort_below:
+                        response.close()
+                        self.early_aborts += 1
+                        # message_start 中的 output_tokens 只是占位（通常为 1），按已生成的字符粗估后覆盖
+                        usage['output_tokens'] = max(usage.get('output_tokens', 0), len(text) // 2)
+                        rejected = json.dumps({'score': score, 'rejected': True})
+                        return {'content': [{'type': 'text', 'text': rejected}], 'usage': usage, 'stop_reason': 'aborted'}
+                elif len(text) > 200:
+                    score_checked = True  # 评分没有出现在开头，不再检查
+        
+        return {'content': [{'type': 'text', 'text': text}], 'usage': usage}
+
+    def _build_opportunity(self, item: Dict[str, Any], analysis: Dict[str, Any]) -> Opportunity:
+        """由条目和模型输出创建 Opportunity（一人公司格式）；同时更新该条目的提前终止标记"""
+        if analysis.get('rejected'):
+            self._rejected.add(_item_key(item))
+        else:
+            self._rejected.discard(_item_key(item))
+        return Opportunity(
+            id=item['id'],
+            title=item['title'],
+            source=item.get('source', 'unknown'),
+            url=item.get('url', ''),
+            score=analysis.get('score', 50),
+            summary=analysis.get('summary', ''),
+            description=analysis.get('description', ''),
+            solo_feasibility=analysis.get('solo_feasibility', ''),
+            agent_roles=analysis.get('agent_roles', []),
+            startup_cost=analysis.get('startup_cost', ''),
+            time_to_revenue=analysis.get('time_to_revenue', ''),
+            revenue_model=analysis.get('revenue_model', ''),
+            monthly_potential=analysis.get('monthly_potential', ''),
+            automation_rate=analysis.get('automation_rate', ''),
+            customer_acquisition=analysis.get('customer_acquisition', ''),
+            risks=analysis.get('risks', ''),
+            action_plan=analysis.get('action_plan', ''),
+            tags=analysis.get('tags', []),
+            source_url=item.get('url', ''),
+            research_links=[
+                item.get('url', ''),
+                f"https://www.google.com/search?q={item.get('title', '')}",
+                f"https://www.google.com/search?q={item.get('title', '')}+competitors+alternatives"
+            ],
+            created_at=datetime.now()
+        )
 
     def analyze(self, item: Dict[str, Any]) -> Optional[Opportunity]:
         """同步兼容接口：内部调用异步实现"""
@@ -170,39 +471,42 @@ class BailianAnalyzer:
         return f"""
 你是一人公司成功创业者，擅长用 AI Agent 军团自动化业务。请分析这个机会：
 
-标题：{item.get('title', '')}
-来源：{item.get('source', 'unknown').upper()}
-链接：{item.get('url', '')}
-{f"描述：{item.get('description', '')[:500]}" if item.get('description') else ""}
-{f"热度：{item.get('score', 0)} 分" if item.get('score') else ""}
+{self._describe_item(item)}
 
 请从**一人公司 + Agent 军团**角度分析，判断是否适合 1 人干到年入百万美金：
 
 输出严格的 JSON 格式：
-{{
-    "score": 75,
-    "summary": "50 字一句话：为什么适合/不适合一人公司",
-    "description": "100 字：做什么、解决什么问题、目标用户",
-    "solo_feasibility": "150 字：为什么适合一人公司 + Agent 完成，哪些工作可自动化",
-    "agent_roles": ["内容 Agent", "客服 Agent", "开发 Agent", "营销 Agent"],
-    "startup_cost": "<$1k 或 $1-5k 或 $5-20k 或 >$20k",
-    "time_to_revenue": "<7 天 或 30 天 或 90 天 或 >90 天",
-    "revenue_model": "订阅 或 一次性 或 联盟 或 广告 或 API 收费",
-    "monthly_potential": "$1-10k 或 $10-50k 或 $50k+",
-    "automation_rate": "50% 或 70% 或 90%+",
-    "customer_acquisition": "SEO 或 社交媒体 或 付费广告 或 联盟 或 Product Hunt",
-    "risks": "50 字主要风险",
-    "action_plan": "50 字第一步做什么",
-    "tags": ["SaaS", "AI", "B2B", "内容", "自动化"]
-}}
+{OUTPUT_SCHEMA}
 
-评分标准（一人公司视角）：
-- 90-100: 启动成本低 (<$5k) + 30 天见钱 + 可 90% 自动化 + 月入$50k+ 潜力 → 立即开干
-- 70-89: 一人能完成 + 有明确获客渠道 + 月入$10-50k 潜力 → 深入研究
-- 50-69: 需要验证 + 可能需要外包部分工作 → 保持关注
-- 0-49: 需要团队/重资金/难自动化 → 跳过
+{SCORING_RUBRIC}
 """
     
+    def _build_batch_prompt(self, items: List[Dict[str, Any]]) -> str:
+        """构建多条目分析提示词：说明和评分标准只发送一次"""
+        blocks = "\n\n".join(f"### 机会 id={item['id']}\n{self._describe_item(item)}" for item in items)
+        return f"""
+你是一人公司成功创业者，擅长用 AI Agent 军团自动化业务。请逐个分析以下 {len(items)} 个机会：
+
+{blocks}
+
+请从**一人公司 + Agent 军团**角度分别分析每个机会，判断是否适合 1 人干到年入百万美金。
+
+输出严格的 JSON 数组，每个机会一个对象，用 "id" 字段填写上面对应的 id（原样照抄），其余字段格式如下：
+{OUTPUT_SCHEMA}
+
+{SCORING_RUBRIC}
+"""
+    
+    @staticmethod
+    def _describe_item(item: Dict[str, Any]) -> str:
+        """提示词中描述单个条目的部分"""
+        return f"""标题：{item.get('title', '')}
+来源：{item.get('source', 'unknown').upper()}
+链接：{item.get('url', '')}
+{f"描述：{item.get('description', '')[:500]}" if item.get('description') else ""}
+{f"热度：{item.get('score', 0)} 分" if item.get('score') else ""}
+{f"同时出现在：{', '.join(signal['source'].upper() for signal in item['sources'])}" if len(item.get('sources', [])) > 1 else ""}"""
+    
     def _parse_json(self, content: str) -> Optional[Dict]:
         """解析 JSON 输出"""
         try:
@@ -219,41 +523,206 @@ class BailianAnalyzer:
                     pass
             return None
     
-    async def batch_analyze_async(self, items: list, min_score: int = 60) -> list:
+    def _parse_json_array(self, content: str) -> List[Any]:
+        """解析批量输出的 JSON 数组（也接受 {"results": [...]} 包装），失败返回空列表"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            import re
+            match = re.search(r'\[.*\]', content, re.DOTALL)
+            if not match:
+                return []
+            try:
+                data = json.loads(match.group())
+            except json.JSONDecodeError:
+                return []
+        if isinstance(data, dict):
+            data = data.get('results', [data])
+        return data if isinstance(data, list) else []
+    
+    async def batch_analyze_async(
+        self,
+        items: list,
+        min_score: int = 60,
+        on_result: Optional[Callable[[Dict[str, Any], Optional[Opportunity]], None]] = None
+    ) -> list:
         """
         批量分析
         
         Args:
             items: 项目列表
             min_score: 最低分数阈值
+            on_result: 每个条目分析完成后的回调 (item, opp)，包括低分和失败的条目
             
         Returns:
             机会列表（按分数排序）
         """
-        opportunities = []
-        total = len(items)
-        semaphore = asyncio.Semaphore(5)
-        timeout = aiohttp.ClientTimeout(total=BAILIAN_TIMEOUT)
-
-        async def analyze_one(item: Dict[str, Any], session: aiohttp.ClientSession) -> Optional[Opportunity]:
-            async with semaphore:
-                if DEBUG:
-                    print(f"Analyzing: {item.get('title', '')[:50]}...")
-                return await self.analyze_async(item, session=session)
+        async def feed():
+            for item in items:
+                yield item
 
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            tasks = [asyncio.create_task(analyze_one(item, session)) for item in items]
-            completed = 0
-            for task in asyncio.as_completed(tasks):
-                opp = await task
-                completed += 1
-                print(f"Progress: {completed}/{total}")
-                if opp and opp.score >= min_score:
-                    opportunities.append(opp)
+        opportunities = [
+            opp async for opp in self.analyze_stream(feed(), min_score=min_score, total=len(items), on_result=on_result)
+        ]
         
         # 按分数排序
         return sorted(opportunities, key=lambda x: x.score, reverse=True)
 
+    async def analyze_stream(
+        self,
+        items: AsyncIterable[Dict[str, Any]],
+        min_score: int = 60,
+        concurrency: Optional[int] = None,
+        queue_size: int = 20,
+        total: Optional[int] = None,
+        on_result: Optional[Callable[[Dict[str, Any], Optional[Opportunity]], None]] = None
+    ) -> AsyncIterator[Opportunity]:
+        """
+        流式分析：边收集边分析，达到阈值的机会按完成顺序产出
+        
+        条目经有界队列交给 concurrency 个 worker，队列满时上游等待（背压）；
+        实际在途请求数由共享的自适应窗口（self.limiter）决定。
+        达到每日用量预算（self.usage）后不再发起分析，剩余条目记入 self.usage.skipped。
+        
+        Args:
+            items: 条目异步迭代器（如 CollectorRunner.stream()）
+            min_score: 最低分数阈值
+            concurrency: worker 数（默认等于自适应窗口上限）
+            queue_size: 待分析队列上限（batch_size > 1 时每个 worker 一次取一批，单次请求分析）
+            total: 已知的条目总数（仅用于进度输出）
+            on_result: 每个条目分析完成后的回调 (item, opp)，包括低分和失败的条目；
+                       失败和提前终止的条目 opp 为 None
+        """
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        outbox: asyncio.Queue = asyncio.Queue()
+        done = object()
+        received = 0
+        assembling = asyncio.Lock()
+        concurrency = concurrency or self.limiter.ceiling
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async def feed():
+                nonlocal received
+                try:
+                    async for item in items:
+                        received += 1
+                        await inbox.put(item)
+                except Exception as e:
+                    print(f"Error reading items: {e}")
+                for _ in range(concurrency):
+                    await inbox.put(done)
+
+            async def take_batch() -> list:
+                """
+                取一批条目：阻塞等第一条，之后最多再等 BAILIAN_BATCH_LINGER 秒凑满；遇到结束标记时附在末尾
+
+                同一时间只有一个 worker 在凑批：多个 worker 同时等在队列上时条目会轮流分给它们，每批只凑到一两条。
+                """
+                async with assembling:
+                    batch = [await inbox.get()]
+                    loop = asyncio.get_running_loop()
+                    deadline = loop.time() + BAILIAN_BATCH_LINGER
+                    while batch[-1] is not done and len(batch) < self.batch_size:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(inbox.get(), remaining))
+                        except asyncio.TimeoutError:
+                            break
+                return batch
+
+            async def work():
+                while True:
+                    batch = await take_batch()
+                    finished_worker = batch[-1] is done
+                    batch = [item for item in batch if item is not done]
+                    exhausted = self.usage.exhausted() if batch else None
+                    if exhausted:
+                        # 预算耗尽：不再发起分析，条目不记为已分析，下次运行重试
+                        if not self.usage.skipped:
+                            print(f"Budget exhausted, skipping remaining items: {exhausted}")
+                        for item in batch:
+                            self.usage.skip(item)
+                            metrics.inc('analyses_total', source=item.get('source', 'unknown'), result='skipped')
+                            await outbox.put(None)
+                    elif batch:
+                        if DEBUG:
+                            for item in batch:
+                                print(f"Analyzing: {item.get('title', '')[:50]}...")
+                        if len(batch) == 1:
+                            opps = [await self.analyze_async(batch[0], session=session, min_score=min_score)]
+                        else:
+                            opps = await self.analyze_batch_async(batch, session=session, min_score=min_score)
+                        for item, opp in zip(batch, opps):
+                            metrics.inc('analyses_total', source=item.get('source', 'unknown'), result=_result(opp, min_score))
+                            rejected = _item_key(item) in self._rejected
+                            self._rejected.discard(_item_key(item))
+                            if on_result:
+                                # 提前终止的结果只有评分：不记为已分析，阈值调低后的下次运行可拿到完整分析
+                                on_result(item, None if rejected else opp)
+                            await outbox.put(opp)
+                    if finished_worker:
+                        return
+
+            tasks = [asyncio.create_task(feed())] + [asyncio.create_task(work()) for _ in range(concurrency)]
+            finished = asyncio.gather(*tasks)
+            finished.add_done_callback(lambda _: outbox.put_nowait(done))
+
+            completed = 0
+            try:
+                while True:
+                    opp = await outbox.get()
+                    if opp is done:
+                        break
+                    completed += 1
+                    print(f"Progress: {completed}/{total or received} ({self.limiter.status()})")
+                    if opp and opp.score >= min_score:
+                        yield opp
+                finished.result()
+            finally:
+                # 消费方提前停止时取消 worker，并取回 gather 的结果，避免 "exception was never retrieved"
+                for task in tasks:
+                    task.cancel()
+                if not finished.done():
+                    finished.cancel()
+                try:
+                    await finished
+                except asyncio.CancelledError:
+                    # 只吞掉上面取消 gather 引起的 CancelledError；消费方自身被取消时继续传播
+                    if asyncio.current_task().cancelling():
+                        raise
+                except Exception:
+                    # worker 的异常在正常结束时已由 finished.result() 抛出，提前停止时不再关心
+                    pass
+
     def batch_analyze(self, items: list, min_score: int = 60) -> list:
         """同步兼容接口：内部调用异步实现"""
         return asyncio.run(self.batch_analyze_async(items, min_score=min_score))
+
+
+def _item_key(item: Dict[str, Any]) -> str:
+    """条目的稳定标识（提前终止记录用；id(item) 在条目回收后会被复用）"""
+    return f"{item.get('source', 'unknown')}:{item.get('id', '')}"
+
+
+def _result(opp: Optional[Opportunity], min_score: int) -> str:
+    """分析结果分类（指标标签）"""
+    if opp is None:
+        return 'failed'
+    return 'opportunity' if opp.score >= min_score else 'below_threshold'
+
+
+def _prompt_version() -> str:
+    """提示词模板版本：系统提示、输出格式、评分标准或提示词构建代码变化时自动变化，旧缓存随之失效"""
+    parts = [SYSTEM_PROMPT, OUTPUT_SCHEMA, SCORING_RUBRIC]
+    for builder in (BailianAnalyzer._build_prompt, BailianAnalyzer._build_batch_prompt, BailianAnalyzer._describe_item):
+        try:
+            parts.append(inspect.getsource(builder))
+        except (OSError, TypeError):
+            parts.append(builder.__code__.co_code.hex())
+    return hashlib.sha256("".join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+PROMPT_VERSION = _prompt_version()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""模型响应缓存 - 内存 LRU + 磁盘（按内容寻址，TTL + 容量上限）"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import LLM_CACHE_DIR, LLM_CACHE_TTL, LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_BYTES
+
+
+class ResponseCache:
+    """
+    两级响应缓存
+
+    键为 模型 + 提示词模板版本 + 生成参数 + 渲染后提示词 的 SHA-256，
+    因此模板或模型一变，旧条目自然不再命中，随 TTL / 容量淘汰。
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_DIR,
+        ttl: float = LLM_CACHE_TTL,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+        self._memory: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self._disk_bytes = sum(size for _, _, size in self._scan())
+
+    @staticmethod
+    def key(model: str, prompt_version: str, temperature: float, max_tokens: int, prompt: str) -> str:
+        material = json.dumps([model, prompt_version, temperature, max_tokens, prompt], ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return entry[1]
+                del self._memory[key]
+
+        try:
+            with open(self._file(key), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (IOError, OSError, ValueError):
+            record = None
+
+        if record is None or now - record.get('created_at', 0) >= self.ttl:
+            self.stats['misses'] += 1
+            return None
+
+        self._remember(key, record['created_at'], record['value'])
+        self.stats['disk_hits'] += 1
+        return record['value']
+
+    def set(self, key: str, value: str):
+        """写入两级缓存，磁盘超出容量时淘汰最旧的条目"""
+        now = time.time()
+        self._remember(key, now, value)
+
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({'created_at': now, 'value': value}, ensure_ascii=False).encode('utf-8')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        try:
+            replaced = os.stat(path).st_size  # 覆盖已有条目时只计增量
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_bytes += len(data) - replaced
+            self.stats['writes'] += 1
+            over_limit = self._disk_bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _remember(self, key: str, created_at: float, value: str):
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _scan(self):
+        """遍历磁盘条目：(路径, 修改时间, 大小)"""
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        """删除过期条目，再按时间从旧到新删到容量的 90% 以下"""
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path, mtime, size in entries:
+            if mtime >= cutoff and total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self.stats['evictions'] += removed
+
+    def summary(self) -> Dict[str, Any]:
+        """命中统计（用于运行总结）"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return dict(self.stats, hit_rate=round(hits / lookups, 3) if lookups else 0.0)
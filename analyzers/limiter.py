@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""自适应并发限制 - AIMD（加性增、乘性减），所有在途模型请求共享一个窗口"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from config import BAILIAN_CONCURRENCY, BAILIAN_CONCURRENCY_MIN, BAILIAN_CONCURRENCY_MAX, BAILIAN_LATENCY_TOLERANCE
+
+# 请求结果
+OK = 'ok'
+THROTTLED = 'throttled'  # 429 / 超时：拥塞信号
+FAILED = 'failed'        # 其他错误：不调整窗口
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 并发窗口
+
+    - 成功且延迟不超过 最低延迟 × latency_tolerance 时，每个窗口的请求把窗口加 1
+    - 429 或超时把窗口乘以 backoff；同一轮拥塞（在上次缩减前发出的请求）只缩减一次
+    - 窗口限定在 [floor, ceiling]
+
+    只在单个事件循环内使用（不加线程锁）。
+    """
+
+    def __init__(
+        self,
+        initial: float = BAILIAN_CONCURRENCY,
+        floor: int = BAILIAN_CONCURRENCY_MIN,
+        ceiling: int = BAILIAN_CONCURRENCY_MAX,
+        latency_tolerance: float = BAILIAN_LATENCY_TOLERANCE,
+        backoff: float = 0.5
+    ):
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.window = min(max(float(initial), self.floor), self.ceiling)
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.latency: Optional[float] = None      # 延迟 EWMA
+        self.min_latency: Optional[float] = None  # 近期最低延迟（缓慢上浮，跟随服务端基线变化）
+        self.stats = {'ok': 0, 'throttled': 0, 'failed': 0, 'cuts': 0, 'peak_window': self.window}
+
+        self._waiters: deque = deque()
+        self._last_cut = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(self.floor, int(self.window))
+
+    async def acquire(self) -> float:
+        """等待一个并发名额，返回开始时间（传给 release）"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return time.monotonic()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 名额已经转交给本请求，归还
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+        return time.monotonic()
+
+    def release(self, started: float, outcome: str = OK):
+        """归还名额，并按结果调整窗口"""
+        now = time.monotonic()
+        self.in_flight -= 1
+        self.stats[outcome] += 1
+
+        if outcome == OK:
+            self._on_success(now - started)
+        elif outcome == THROTTLED and started >= self._last_cut:
+            self.window = max(float(self.floor), self.window * self.backoff)
+            self._last_cut = now
+            self.stats['cuts'] += 1
+
+        self._wake()
+
+    def _on_success(self, latency: float):
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.min_latency = latency if self.min_latency is None else min(latency, self.min_latency * 1.01)
+        if latency <= self.min_latency * self.latency_tolerance:
+            self.window = min(float(self.ceiling), self.window + 1.0 / self.window)
+            self.stats['peak_window'] = max(self.stats['peak_window'], self.window)
+
+    def _wake(self):
+        """把空出的名额直接交给排队的请求"""
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def status(self) -> str:
+        """进度输出用的简短状态"""
+        latency = f"{self.latency:.2f}s" if self.latency is not None else "-"
+        return f"window {self.window:.1f}, in-flight {self.in_flight}, latency {latency}"
+
+    def summary(self) -> Dict[str, Any]:
+        """运行统计（用于运行总结）"""
+        return dict(
+            self.stats,
+            window=round(self.window, 2),
+            peak_window=round(self.stats['peak_window'], 2),
+            latency=round(self.latency, 3) if self.latency is not None else None
+        )
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""模型请求策略 - 可重试状态的抖动重试、Retry-After、熔断器、RPM/TPM 全局预算"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+from config import (
+    BAILIAN_MAX_ATTEMPTS, BAILIAN_RETRY_BASE_DELAY, BAILIAN_RPM, BAILIAN_TPM,
+    BAILIAN_CIRCUIT_THRESHOLD, BAILIAN_CIRCUIT_COOLDOWN, HTTP_MAX_RETRY_AFTER
+)
+from transport import TokenBucket, parse_retry_after
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# 熔断器状态
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class TokenBudget(TokenBucket):
+    """TPM 预算桶：settle 以负数退还多预定的令牌，退还后余额同样不超过 capacity"""
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        wait = super().reserve(tokens)
+        if tokens < 0:
+            with self._lock:
+                self._tokens = min(self.capacity, self._tokens)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败 threshold 次后打开，所有请求等待 cooldown；
+    之后放行一个探测请求，成功则关闭，失败则再次打开并把 cooldown 翻倍（最多 max_cooldown）
+    """
+
+    def __init__(
+        self,
+        threshold: int = BAILIAN_CIRCUIT_THRESHOLD,
+        cooldown: float = BAILIAN_CIRCUIT_COOLDOWN,
+        max_cooldown: float = 300.0
+    ):
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._probe_started = 0.0
+
+    async def wait(self):
+        """熔断打开时等待；冷却结束后第一个调用方成为探测请求"""
+        while self.state != CLOSED:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self._open_until:
+                    await asyncio.sleep(self._open_until - now)
+                    continue
+                self.state = HALF_OPEN
+                self._probe_started = now
+                return
+            # 探测中：其他请求等待结果；探测请求迟迟没有结果（如被取消）时再放一个
+            if now - self._probe_started > max(self._cooldown, 1.0):
+                self._probe_started = now
+                return
+            await asyncio.sleep(0.5)
+
+    def success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            print("Circuit closed, endpoint recovered")
+            self.state = CLOSED
+            self._cooldown = self.base_cooldown
+
+    def failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+            self.state = OPEN
+            self._open_until = time.monotonic() + self._cooldown
+            self.opens += 1
+            print(f"Circuit open after {self.failures} consecutive failures, pausing requests for {self._cooldown:.0f}s")
+            self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+
+
+class RequestPolicy:
+    """
+    所有分析请求共享的请求策略
+
+    - 429/5xx/超时/连接错误重试：有 Retry-After 时按其等待（并暂停所有请求），否则指数退避 + 全抖动
+    - 熔断器：端点明显不可用时暂停所有 worker，而不是每个条目各自耗尽重试
+    - RPM / TPM 令牌桶：请求前按预估 token 预定，完成后按实际用量结算
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = BAILIAN_MAX_ATTEMPTS,
+        base_delay: float = BAILIAN_RETRY_BASE_DELAY,
+        rpm: float = BAILIAN_RPM,
+        tpm: float = BAILIAN_TPM,
+        circuit: Optional[CircuitBreaker] = None,
+        max_retry_after: float = HTTP_MAX_RETRY_AFTER
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_retry_after = max_retry_after
+        self.circuit = circuit or CircuitBreaker()
+        # 令牌桶最多积累 10 秒的预算，避免空闲后瞬间打满一分钟的额度
+        self.requests = TokenBucket(rpm / 60, max(1.0, rpm / 6)) if rpm > 0 else None
+        self.tokens = TokenBudget(tpm / 60, max(1.0, tpm / 6)) if tpm > 0 else None
+        self.stats = {'retries': 0, 'gave_up': 0, 'budget_wait': 0.0, 'paused': 0.0}
+        self._paused_until = 0.0
+
+    async def before_request(self, estimated_tokens: int = 0):
+        """发请求前：等待 Retry-After 暂停、熔断器和 RPM/TPM 预算"""
+        await self.circuit.wait()
+
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            self.stats['paused'] += pause
+            await asyncio.sleep(pause)
+
+        wait = 0.0
+        if self.requests:
+            wait = self.requests.reserve()
+        if self.tokens and estimated_tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            self.stats['budget_wait'] += wait
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """按实际用量修正 TPM 预算（退还多预定的部分或补扣不足；退还不超过桶容量）"""
+        if self.tokens and actual_tokens:
+            self.tokens.reserve(actual_tokens - estimated_tokens)
+
+    def success(self):
+        self.circuit.success()
+
+    def client_error(self):
+        """非可重试的错误状态（如 400/401）：端点仍然可用，不计入熔断"""
+        self.circuit.success()
+
+    def retryable(self, status: Optional[int], headers: Any = None) -> Optional[float]:
+        """
+        记录一次可重试的失败（status 为 None 表示超时/连接错误）
+
+        Returns:
+            服务端要求的等待秒数（Retry-After），没有则 None
+        """
+        retry_after = parse_retry_after(headers.get('Retry-After')) if headers is not None else None
+        if retry_after is not None:
+            retry_after = min(retry_after, self.max_retry_after)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        if status != 429:
+            # 429 说明端点正常但在限流，交给 Retry-After 和自适应并发处理
+            self.circuit.failure()
+        return retry_after
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """第 attempt 次（从 0 开始）失败后的等待时间"""
+        self.stats['retries'] += 1
+        if retry_after is not None:
+            return retry_after + random.uniform(0, 0.5)
+        return random.uniform(0, self.base_delay * (2 ** attempt))
+
+    def summary(self) -> Dict[str, Any]:
+        """运行统计（用于运行总结；budget_wait / paused 为各请求等待时间之和）"""
+        return dict(
+            self.stats,
+            budget_wait=round(self.stats['budget_wait'], 1),
+            paused=round(self.stats['paused'], 1),
+            circuit=self.circuit.state,
+            circuit_opens=self.circuit.opens
+        )
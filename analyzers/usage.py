@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""模型用量统计 - 每次调用的 token / 延迟 / 重试 / 缓存命中，按运行、来源、模型汇总，并执行每日预算"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import metrics
+from config import (
+    USAGE_DIR, BAILIAN_PRICE_INPUT, BAILIAN_PRICE_OUTPUT,
+    BAILIAN_DAILY_TOKEN_BUDGET, BAILIAN_DAILY_COST_BUDGET
+)
+from collectors.cache import JsonFileCache
+
+# daily.json 只保留最近几天的累计（预算只看当天，历史趋势见 runs.jsonl）
+DAILY_KEEP_DAYS = 7
+
+
+def _new_bucket() -> Dict[str, Any]:
+    return {
+        'calls': 0, 'cache_hits': 0, 'failed': 0, 'aborted': 0, 'attempts': 0,
+        'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0, 'latency': 0.0,
+    }
+
+
+class UsageTracker:
+    """
+    用量统计与每日预算
+
+    - record() 记录一次模型调用（或缓存命中）；批量请求的用量平摊到各条目的来源
+    - 每日累计保存在 USAGE_DIR/daily.json（保留最近 DAILY_KEEP_DAYS 天），跨运行生效；达到预算后 exhausted() 返回原因
+    - save() 把本次运行汇总追加到 USAGE_DIR/runs.jsonl，便于跟踪成本和吞吐趋势
+    """
+
+    def __init__(
+        self,
+        path: str = USAGE_DIR,
+        daily_token_budget: int = BAILIAN_DAILY_TOKEN_BUDGET,
+        daily_cost_budget: float = BAILIAN_DAILY_COST_BUDGET,
+        price_input: float = BAILIAN_PRICE_INPUT,
+        price_output: float = BAILIAN_PRICE_OUTPUT
+    ):
+        self.path = path
+        self.daily_token_budget = daily_token_budget
+        self.daily_cost_budget = daily_cost_budget
+        self.price_input = price_input
+        self.price_output = price_output
+
+        self.daily = JsonFileCache(os.path.join(path, 'daily.json'))
+        self.today = datetime.now().strftime('%Y-%m-%d')
+        previous = self.daily.get(self.today) or {}
+        self._previous_tokens = previous.get('tokens', 0)
+        self._previous_cost = previous.get('cost', 0.0)
+
+        self.started_at = datetime.now()
+        self._clock = time.monotonic()
+        self.totals = _new_bucket()
+        self.by_source: Dict[str, Dict[str, Any]] = {}
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+        self.skipped: List[Dict[str, Any]] = []
+        self.in_flight_tokens = 0  # 在途请求的预估 token，计入预算检查，避免并发请求大幅超支
+        self._latencies: List[float] = []
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.price_input + output_tokens * self.price_output) / 1_000_000
+
+    def record(
+        self,
+        model: str,
+        sources: List[str],
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        latency: float = 0.0,
+        attempts: int = 0,
+        cache_hit: bool = False,
+        aborted: bool = False,
+        failed: bool = False
+    ):
+        """
+        记录一次调用
+
+        Args:
+            model: 模型名
+            sources: 本次调用分析的条目来源（批量请求有多个，用量按条目平摊）
+            latency: 各次 HTTP 尝试的耗时之和（不含排队和退避等待）
+            attempts: HTTP 尝试次数（缓存命中为 0）
+        """
+        call = {
+            'calls': 1,
+            'cache_hits': int(cache_hit),
+            'failed': int(failed),
+            'aborted': int(aborted),
+            'attempts': attempts,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cost': self.cost(input_tokens, output_tokens),
+            'latency': latency,
+        }
+        _add(self.totals, call)
+        result = 'cache_hit' if cache_hit else 'failed' if failed else 'aborted' if aborted else 'ok'
+        metrics.inc('llm_calls_total', model=model, result=result)
+        if input_tokens or output_tokens:
+            metrics.inc('llm_tokens_total', input_tokens, model=model, direction='input')
+            metrics.inc('llm_tokens_total', output_tokens, model=model, direction='output')
+        _add(self.by_model.setdefault(model, _new_bucket()), call)
+
+        sources = sources or ['unknown']
+        share = 1.0 / len(sources)
+        for source in sources:
+            _add(self.by_source.setdefault(source, _new_bucket()), call, share)
+
+        if not cache_hit and not failed:
+            self._latencies.append(latency)
+
+    def used_today(self) -> Dict[str, float]:
+        tokens = self._previous_tokens + self.totals['input_tokens'] + self.totals['output_tokens']
+        return {'tokens': tokens, 'cost': self._previous_cost + self.totals['cost']}
+
+    def exhausted(self) -> Optional[str]:
+        """达到每日预算（含在途请求的预估用量）时返回原因，否则 None"""
+        used = self.used_today()
+        tokens = used['tokens'] + self.in_flight_tokens
+        if self.daily_token_budget and tokens >= self.daily_token_budget:
+            return f"daily token budget {self.daily_token_budget} reached ({tokens:.0f})"
+        cost = used['cost'] + self.cost(self.in_flight_tokens, 0)
+        if self.daily_cost_budget and cost >= self.daily_cost_budget:
+            return f"daily cost budget {self.daily_cost_budget} reached ({cost:.4f})"
+        return None
+
+    def skip(self, item: Dict[str, Any]):
+        """记录因预算耗尽而未分析的条目"""
+        self.skipped.append({
+            'id': item.get('id', ''),
+            'source': item.get('source', 'unknown'),
+            'title': item.get('title', ''),
+        })
+
+    def summary(self) -> Dict[str, Any]:
+        """本次运行汇总（可直接序列化为 JSON）"""
+        elapsed = time.monotonic() - self._clock
+        latencies = sorted(self._latencies)
+        requests = len(latencies)
+        return {
+            'started_at': self.started_at.isoformat(),
+            'elapsed': round(elapsed, 1),
+            'totals': _rounded(self.totals),
+            'latency': {
+                'p50': round(latencies[requests // 2], 3) if requests else None,
+                'p95': round(latencies[min(requests - 1, int(requests * 0.95))], 3) if requests else None,
+                'p99': round(latencies[min(requests - 1, int(requests * 0.99))], 3) if requests else None,
+            },
+            'throughput_per_min': round(self.totals['calls'] / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            'by_source': {source: _rounded(bucket) for source, bucket in self.by_source.items()},
+            'by_model': {model: _rounded(bucket) for model, bucket in self.by_model.items()},
+            'today': {key: round(value, 4) for key, value in self.used_today().items()},
+            'budget': {'tokens': self.daily_token_budget, 'cost': self.daily_cost_budget},
+            'skipped': len(self.skipped),
+            'skipped_items': self.skipped,
+        }
+
+    def save(self) -> Dict[str, Any]:
+        """更新每日累计，并把本次汇总追加到 runs.jsonl"""
+        summary = self.summary()
+        self.daily.set(self.today, {
+            'tokens': summary['today']['tokens'],
+            'cost': summary['today']['cost'],
+            'updated_at': datetime.now().isoformat(),
+        })
+        cutoff = (datetime.strptime(self.today, '%Y-%m-%d') - timedelta(days=DAILY_KEEP_DAYS - 1)).strftime('%Y-%m-%d')
+        for day in [day for day in self.daily.data if day < cutoff]:
+            self.daily.pop(day)
+        self.daily.save()
+
+        with open(os.path.join(self.path, 'runs.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+        return summary
+
+
+def _add(bucket: Dict[str, Any], call: Dict[str, Any], share: float = 1.0):
+    for key, value in call.items():
+        bucket[key] += value * share
+
+
+def _rounded(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    calls = bucket['calls']
+    result = {key: round(value, 4) if key == 'cost' else round(value, 2) for key, value in bucket.items()}
+    result['avg_latency'] = round(bucket['latency'] / (calls - bucket['cache_hits']), 3) if calls > bucket['cache_hits'] else None
+    return result
+
+
+def format_usage(summary: Dict[str, Any]) -> str:
+    """用量汇总的可读文本（运行日志用）"""
+    totals = summary['totals']
+    lines = [
+        f"calls={totals['calls']:g} (cache hits {totals['cache_hits']:g}, aborted {totals['aborted']:g}, "
+        f"failed {totals['failed']:g}, attempts {totals['attempts']:g}), "
+        f"tokens in/out={totals['input_tokens']:g}/{totals['output_tokens']:g}, cost={totals['cost']:.4f}, "
+        f"latency p50/p95={summary['latency']['p50']}/{summary['latency']['p95']}s, "
+        f"{summary['throughput_per_min']}/min"
+    ]
+    for source, bucket in sorted(summary['by_source'].items()):
+        lines.append(
+            f"  {source:<16} calls={bucket['calls']:g} tokens={bucket['input_tokens'] + bucket['output_tokens']:g} "
+            f"cost={bucket['cost']:.4f}"
+        )
+    lines.append(f"  today: tokens={summary['today']['tokens']:g} cost={summary['today']['cost']:.4f}")
+    if summary['skipped']:
+        lines.append(f"  skipped {summary['skipped']} items after budget was reached")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+分析器压测：用本地模拟百炼服务驱动 BailianAnalyzer，比较不同条目数和并发设置
+
+报告吞吐（条目/秒）、请求延迟 p50/p95/p99、重试、放弃和丢失的条目。
+
+用法:
+    python3 -m benchmarks.analyzer_load --items 50,200 --concurrency 5,20,adaptive
+    python3 -m benchmarks.analyzer_load --items 200 --rate-429 0.1 --retry-after 1 --rate-5xx 0.05 --json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzers.bailian import BailianAnalyzer
+from analyzers.limiter import AdaptiveLimiter
+from analyzers.policy import RequestPolicy
+from analyzers.usage import UsageTracker
+from benchmarks.mock_bailian import add_arguments, from_arguments, start_in_thread
+
+SOURCES = ['hn', 'product_hunt', '36kr', 'reddit', 'github_trending']
+WORDS = ['agent', 'saas', 'automation', 'open source', 'api', 'workflow', 'indie', 'crm', 'llm', 'analytics']
+
+
+def make_items(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """生成稳定的合成条目"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f"bench_{n}",
+            'title': f"Benchmark item {n}: {' '.join(rng.sample(WORDS, 3))}",
+            'source': SOURCES[n % len(SOURCES)],
+            'url': f"https://example.com/bench/{n}",
+            'description': ' '.join(rng.choice(WORDS) for _ in range(40)),
+            'score': rng.randint(0, 500),
+        }
+        for n in range(count)
+    ]
+
+
+def make_limiter(setting: str) -> AdaptiveLimiter:
+    """'adaptive' 使用默认 AIMD 配置；数字表示固定窗口"""
+    if setting == 'adaptive':
+        return AdaptiveLimiter()
+    window = int(setting)
+    return AdaptiveLimiter(initial=window, floor=window, ceiling=window)
+
+
+async def run_once(url: str, items: List[Dict[str, Any]], setting: str, args: argparse.Namespace, usage_dir: str) -> Dict[str, Any]:
+    analyzer = BailianAnalyzer(
+        api_key='benchmark',
+        cache=False,  # 不使用响应缓存，每个条目都真实请求
+        batch_size=args.batch_size,
+        limiter=make_limiter(setting),
+        policy=RequestPolicy(base_delay=args.retry_base_delay),
+        usage=UsageTracker(usage_dir, daily_token_budget=0, daily_cost_budget=0)
+    )
+    analyzer.endpoint = f"{url}/v1/messages"
+    analyzer.timeout = args.client_timeout
+    analyzer.stream = not args.no_stream
+
+    dropped = 0
+
+    def on_result(item, opp):
+        nonlocal dropped
+        if opp is None:
+            dropped += 1
+
+    started = time.perf_counter()
+    await analyzer.batch_analyze_async(items, min_score=args.min_score, on_result=on_result)
+    elapsed = time.perf_counter() - started
+
+    usage = analyzer.usage.summary()
+    return {
+        'items': len(items),
+        'concurrency': setting,
+        'elapsed': round(elapsed, 2),
+        'items_per_sec': round(len(items) / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency': usage['latency'],
+        'requests': int(usage['totals']['attempts']),
+        'retries': analyzer.policy.stats['retries'],
+        'gave_up': analyzer.policy.stats['gave_up'],
+        'dropped': dropped,
+        'aborted': analyzer.early_aborts,
+        'tokens': int(usage['totals']['input_tokens'] + usage['totals']['output_tokens']),
+        'limiter': analyzer.limiter.summary(),
+    }
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"{'items':>6} {'conc':>9} {'sec':>7} {'items/s':>8} {'p50':>6} {'p95':>6} {'p99':>6} "
+          f"{'reqs':>5} {'retry':>5} {'gave':>5} {'drop':>5} {'abort':>5} {'window':>6}")
+    for result in results:
+        latency = result['latency']
+        print(f"{result['items']:>6} {result['concurrency']:>9} {result['elapsed']:>7.2f} {result['items_per_sec']:>8.2f} "
+              f"{_fmt(latency['p50'])} {_fmt(latency['p95'])} {_fmt(latency['p99'])} "
+              f"{result['requests']:>5} {result['retries']:>5} {result['gave_up']:>5} {result['dropped']:>5} "
+              f"{result['aborted']:>5} {result['limiter']['window']:>6.1f}")
+
+
+def _fmt(value) -> str:
+    return f"{value:>6.2f}" if value is not None else f"{'-':>6}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分析器压测（本地模拟服务）")
+    parser.add_argument('--items', default='50,200', help='条目数，逗号分隔')
+    parser.add_argument('--concurrency', default='5,adaptive', help="并发设置，逗号分隔：固定窗口数字或 adaptive")
+    parser.add_argument('--batch-size', type=int, default=1, help='每次请求的条目数')
+    parser.add_argument('--min-score', type=int, default=60, help='最低分数（流式提前终止的阈值）')
+    parser.add_argument('--no-stream', action='store_true', help='关闭流式提前终止')
+    parser.add_argument('--client-timeout', type=float, default=5.0, help='分析器请求超时（秒），模拟超时按此值 + 1 挂起')
+    parser.add_argument('--retry-base-delay', type=float, default=0.5, help='重试退避基数（秒）')
+    parser.add_argument('--json', metavar='PATH', help='结果另存为 JSON')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    mock = from_arguments(args, timeout_delay=args.client_timeout + 1)
+    url, stop = start_in_thread(mock)
+    print(f"Mock Bailian at {url} (latency {args.latency}, 429 {args.rate_429}, 5xx {args.rate_5xx}, "
+          f"timeout {args.rate_timeout}, malformed {args.rate_malformed})")
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as usage_dir:
+            for count in [int(value) for value in args.items.split(',')]:
+                items = make_items(count)
+                for setting in args.concurrency.split(','):
+                    results.append(asyncio.run(run_once(url, items, setting.strip(), args, usage_dir)))
+    finally:
+        stop()
+
+    print()
+    print_table(results)
+    print(f"\nServer: {mock.stats}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'server': mock.stats, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"Saved {args.json}")
+
+
+if __name__ == '__main__':
+    main()
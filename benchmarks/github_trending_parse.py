@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+GitHub Trending 解析基准：正则快速解析 vs BeautifulSoup
+
+不给页面时使用 tests/fixtures/github_trending 中保存的页面（单元测试也校验它）。
+
+用法:
+    python3 -m benchmarks.github_trending_parse --repeat 20
+    python3 -m benchmarks.github_trending_parse --save benchmarks/fixtures/github_trending
+    python3 -m benchmarks.github_trending_parse benchmarks/fixtures/github_trending/*.html --repeat 20
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from collectors.github_trending import GitHubTrendingCollector
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'github_trending')
+
+
+def save_pages(output_dir: str):
+    """保存当前所有语言 × 时间范围的 Trending 页面，作为基准输入"""
+    os.makedirs(output_dir, exist_ok=True)
+    collector = GitHubTrendingCollector()
+    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+
+    for language in collector.languages:
+        for since in collector.since_ranges:
+            url = f"{collector.base_url}/{language.lower()}" if language else collector.base_url
+            response = requests.get(url, headers=headers, params={'since': since}, timeout=30)
+            path = os.path.join(output_dir, f"{language.lower() or 'all'}_{since}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(response.text)
+            print(f"Saved {path} ({len(response.text) // 1024} KB)")
+
+
+def bench(paths: List[str], repeat: int):
+    """对每个页面分别运行两种解析器，校验结果一致并报告耗时"""
+    collector = GitHubTrendingCollector()
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+
+    print(f"{'page':<28} {'repos':>5} {'bs4 ms':>9} {'fast ms':>9} {'speedup':>8}  match")
+    totals = {'bs4': 0.0, 'fast': 0.0}
+    for name, html in pages:
+        timings = {}
+        results = {}
+        for parser, parse in (('bs4', collector._parse_bs4), ('fast', collector._parse_fast)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                results[parser] = parse(html)
+            timings[parser] = (time.perf_counter() - start) / repeat * 1000
+            totals[parser] += timings[parser]
+
+        match = 'ok' if results['bs4'] == results['fast'] else 'DIFF'
+        print(f"{name:<28} {len(results['fast']):>5} {timings['bs4']:>9.2f} {timings['fast']:>9.2f} "
+              f"{timings['bs4'] / max(timings['fast'], 1e-9):>7.1f}x  {match}")
+
+    if pages:
+        print(f"{'total':<28} {'':>5} {totals['bs4']:>9.2f} {totals['fast']:>9.2f} "
+              f"{totals['bs4'] / max(totals['fast'], 1e-9):>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub Trending 解析基准")
+    parser.add_argument('pages', nargs='*', help='已保存的 Trending HTML 页面')
+    parser.add_argument('--save', metavar='DIR', help='抓取并保存当前页面到目录')
+    parser.add_argument('--repeat', type=int, default=10, help='每个页面重复解析次数')
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+    if args.pages:
+        bench(args.pages, args.repeat)
+    elif not args.save:
+        bench(sorted(glob.glob(os.path.join(FIXTURES, '*.html'))), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
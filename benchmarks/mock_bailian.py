@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+本地模拟百炼服务（Anthropic 兼容 /v1/messages），用于离线压测分析器
+
+支持可配置的延迟分布、429（可带 Retry-After）、5xx、超时、非法 JSON 和固定回答，
+以及流式（SSE）和多条目批量提示词。
+
+用法:
+    python3 -m benchmarks.mock_bailian --port 8765 --latency lognormal:0.8,0.5 --rate-429 0.05 --rate-5xx 0.02
+    BAILIAN_BASE_URL=http://127.0.0.1:8765 python3 main.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+_BATCH_ID = re.compile(r'### 机会 id=(\S+)')
+
+
+def parse_latency(spec: str):
+    """
+    解析延迟分布，返回无参采样函数（秒）
+
+    fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA
+    """
+    kind, _, args = spec.partition(':')
+    values = [float(value) for value in args.split(',') if value]
+    if kind == 'fixed':
+        return lambda: values[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        import math
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockBailian:
+    """模拟服务的配置和统计"""
+
+    def __init__(
+        self,
+        latency: str = 'lognormal:0.8,0.5',
+        rate_429: float = 0.0,
+        retry_after: Optional[float] = None,
+        rate_5xx: float = 0.0,
+        rate_timeout: float = 0.0,
+        timeout_delay: float = 65.0,
+        rate_malformed: float = 0.0,
+        responses: Optional[List[Dict[str, Any]]] = None,
+        seed: Optional[int] = None
+    ):
+        self.sample_latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_5xx = rate_5xx
+        self.rate_timeout = rate_timeout
+        self.timeout_delay = timeout_delay
+        self.rate_malformed = rate_malformed
+        self.responses = responses or []
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'ok': 0, '429': 0, '5xx': 0, 'timeout': 0, 'malformed': 0, 'streamed': 0}
+
+    def analysis(self, key: str) -> Dict[str, Any]:
+        """按提示词哈希确定回答：有固定回答时轮选，否则生成一个"""
+        digest = int(hashlib.md5(key.encode('utf-8')).hexdigest(), 16)
+        if self.responses:
+            return dict(self.responses[digest % len(self.responses)])
+        return {
+            "score": digest % 100,
+            "summary": "模拟回答：适合一人公司快速验证",
+            "description": "模拟描述" * 10,
+            "solo_feasibility": "模拟可行性分析" * 10,
+            "agent_roles": ["内容 Agent", "客服 Agent"],
+            "startup_cost": "<$1k",
+            "time_to_revenue": "30 天",
+            "revenue_model": "订阅",
+            "monthly_potential": "$1-10k",
+            "automation_rate": "90%+",
+            "customer_acquisition": "SEO",
+            "risks": "模拟风险",
+            "action_plan": "模拟第一步",
+            "tags": ["SaaS", "AI"],
+        }
+
+    def completion(self, prompt: str) -> str:
+        ids = _BATCH_ID.findall(prompt)
+        if ids:
+            return json.dumps([dict(self.analysis(item_id), id=item_id) for item_id in ids], ensure_ascii=False)
+        return json.dumps(self.analysis(prompt), ensure_ascii=False)
+
+    def fault(self) -> Optional[str]:
+        """按配置的比例抽取一种故障，None 表示正常"""
+        roll = self.random.random()
+        for name, rate in (('429', self.rate_429), ('5xx', self.rate_5xx),
+                           ('timeout', self.rate_timeout), ('malformed', self.rate_malformed)):
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats['requests'] += 1
+        prompt = body['messages'][0]['content']
+        fault = self.fault()
+
+        if fault == '429':
+            self.stats['429'] += 1
+            headers = {'Retry-After': f"{self.retry_after:g}"} if self.retry_after is not None else {}
+            return web.json_response({'error': {'type': 'rate_limit_error'}}, status=429, headers=headers)
+        if fault == '5xx':
+            self.stats['5xx'] += 1
+            return web.Response(text='upstream error', status=self.random.choice((500, 502, 503)))
+        if fault == 'timeout':
+            self.stats['timeout'] += 1
+            await asyncio.sleep(self.timeout_delay)
+            return web.Response(text='too late', status=504)
+
+        text = 'this is not json {' if fault == 'malformed' else self.completion(prompt)
+        self.stats['malformed' if fault == 'malformed' else 'ok'] += 1
+        usage = {'input_tokens': len(prompt) // 2, 'output_tokens': len(text) // 2}
+        latency = self.sample_latency()
+
+        if not body.get('stream'):
+            await asyncio.sleep(latency)
+            return web.json_response({'content': [{'type': 'text', 'text': text}], 'usage': usage})
+
+        # 流式：首包延迟占 30%，其余均匀分布在各个分片上
+        self.stats['streamed'] += 1
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        chunks = [text[i:i + 16] for i in range(0, len(text), 16)] or ['']
+        await asyncio.sleep(latency * 0.3)
+        try:
+            await _send(response, {'type': 'message_start', 'message': {'usage': {'input_tokens': usage['input_tokens']}}})
+            for chunk in chunks:
+                await _send(response, {'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': chunk}})
+                await asyncio.sleep(latency * 0.7 / len(chunks))
+            await _send(response, {'type': 'message_delta', 'usage': {'output_tokens': usage['output_tokens']}})
+            await _send(response, {'type': 'message_stop'})
+        except ConnectionResetError:
+            pass  # 客户端提前终止
+        return response
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/v1/messages', self.handle)
+        app.router.add_get('/stats', lambda request: web.json_response(self.stats))
+        return app
+
+
+async def _send(response: web.StreamResponse, event: Dict[str, Any]):
+    await response.write(f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode('utf-8'))
+
+
+def start_in_thread(mock: MockBailian, host: str = '127.0.0.1', port: int = 0) -> Tuple[str, Any]:
+    """
+    在后台线程（独立事件循环）中启动模拟服务，避免与被测分析器争用事件循环
+
+    Returns:
+        (base_url, stop)，调用 stop() 关闭服务
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state: Dict[str, Any] = {}
+
+    async def start():
+        runner = web.AppRunner(mock.app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        state['runner'] = runner
+        state['port'] = runner.addresses[0][1]
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name='mock-bailian', daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(state['runner'].cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return f"http://{host}:{state['port']}", stop
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """模拟服务的命令行参数（压测命令复用）"""
+    parser.add_argument('--latency', default='lognormal:0.8,0.5', help='延迟分布 fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='429 比例')
+    parser.add_argument('--retry-after', type=float, default=None, help='429 响应的 Retry-After 秒数（默认不带）')
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help='5xx 比例')
+    parser.add_argument('--rate-timeout', type=float, default=0.0, help='超时（挂起不响应）比例')
+    parser.add_argument('--rate-malformed', type=float, default=0.0, help='非法 JSON 回答比例')
+    parser.add_argument('--responses', help='固定回答 JSON 文件（分析结果对象的数组）')
+    parser.add_argument('--seed', type=int, default=None, help='故障抽样随机种子')
+
+
+def from_arguments(args: argparse.Namespace, timeout_delay: float = 65.0) -> MockBailian:
+    responses = None
+    if args.responses:
+        with open(args.responses, 'r', encoding='utf-8') as f:
+            responses = json.load(f)
+    return MockBailian(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        rate_timeout=args.rate_timeout,
+        timeout_delay=timeout_delay,
+        rate_malformed=args.rate_malformed,
+        responses=responses,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟百炼服务")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    mock = from_arguments(args)
+    print(f"Mock Bailian on http://{args.host}:{args.port}/v1/messages (stats: /stats)")
+    web.run_app(mock.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Opportunity 内存与过滤基准：编码后的 slots 模型 vs 普通 dataclass vs 原始 dict
+
+从合成的 JSONL 历史结果加载 N 个机会，报告常驻内存（tracemalloc）、from_dict / to_dict 耗时，
+以及按分类字段（收入模式 + 启动成本）过滤的耗时。
+
+用法:
+    python3 -m benchmarks.opportunity_memory --items 10000,200000
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import make_dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Opportunity, RevenueModel, StartupCost
+from models.categories import CATEGORICAL_FIELDS
+
+SOURCES = ['hn', 'product_hunt', '36kr', 'reddit', 'github_trending', 'huxiu']
+TAGS = ['SaaS', 'AI', 'Agent', '开发者工具', '电商', '内容', 'API', '自动化', '教育', '营销']
+ROLES = ['内容 Agent', '客服 Agent', '开发 Agent', '营销 Agent', '数据 Agent']
+FREE_TEXT_RATE = 0.05  # 模型没按取值表回答的比例
+
+# 原来的普通 dataclass（分类字段为字符串，实例带 __dict__）
+PlainOpportunity = make_dataclass('PlainOpportunity', [
+    ('id', str), ('title', str), ('source', str), ('url', str),
+    ('score', int, field(default=0)), ('summary', str, field(default='')), ('description', str, field(default='')),
+    ('solo_feasibility', str, field(default='')), ('agent_roles', list, field(default_factory=list)),
+    ('startup_cost', str, field(default='')), ('time_to_revenue', str, field(default='')),
+    ('revenue_model', str, field(default='')), ('monthly_potential', str, field(default='')),
+    ('automation_rate', str, field(default='')), ('customer_acquisition', str, field(default='')),
+    ('risks', str, field(default='')), ('action_plan', str, field(default='')),
+    ('tags', list, field(default_factory=list)), ('source_url', str, field(default='')),
+    ('research_links', list, field(default_factory=list)), ('created_at', datetime, field(default_factory=datetime.now)),
+])
+
+
+def _plain_from_dict(data: Dict[str, Any]):
+    data = dict(data)
+    data['created_at'] = datetime.fromisoformat(data['created_at'])
+    return PlainOpportunity(**data)
+
+
+def make_lines(count: int, seed: int = 0) -> List[str]:
+    """生成稳定的合成历史结果（JSONL 行）"""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    labels = {name: [label for code, label in vocabulary.labels.items() if code] for name, vocabulary in CATEGORICAL_FIELDS.items()}
+    lines = []
+    for n in range(count):
+        record = {
+            'id': str(40000000 + n),
+            'title': f"Show HN: tool {n} for {rng.choice(TAGS)} workflows",
+            'source': rng.choice(SOURCES),
+            'url': f"https://example.com/{n}",
+            'score': rng.randint(0, 100),
+            'summary': '适合一人公司快速验证的小工具' + str(n),
+            'description': '项目介绍' * rng.randint(5, 20),
+            'solo_feasibility': '可行性分析' * rng.randint(5, 15),
+            'agent_roles': rng.sample(ROLES, 2),
+            'risks': '竞争激烈',
+            'action_plan': '先做落地页验证需求',
+            'tags': rng.sample(TAGS, 3),
+            'source_url': f"https://example.com/{n}",
+            'research_links': [f"https://example.com/{n}", f"https://www.google.com/search?q=tool+{n}"],
+            'created_at': (start + timedelta(minutes=n)).isoformat(),
+        }
+        for name, values in labels.items():
+            record[name] = f"视情况而定 {rng.randint(1, 9)}" if rng.random() < FREE_TEXT_RATE else rng.choice(values)
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines
+
+
+def measure(lines: List[str], build: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+    """逐行解析并构建对象：先计时，再在 tracemalloc 下重建一次统计常驻内存（对象留在结果中供后续过滤）"""
+    gc.collect()
+    started = time.perf_counter()
+    objects = [build(json.loads(line)) for line in lines]
+    elapsed = time.perf_counter() - started
+    del objects
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(json.loads(line)) for line in lines]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'objects': objects, 'memory': current, 'load': elapsed}
+
+
+def timed(function: Callable[[], Any], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(count: int) -> List[Dict[str, Any]]:
+    lines = make_lines(count)
+    subscription, under_1k = int(RevenueModel.SUBSCRIPTION), int(StartupCost.UNDER_1K)
+
+    results = []
+    for name, build, to_dict, matches in (
+        ('dict', lambda data: data, dict,
+         lambda o: o['revenue_model'] == '订阅' and o['startup_cost'] == '<$1k'),
+        ('dataclass', _plain_from_dict, lambda o: o.__dict__.copy(),
+         lambda o: o.revenue_model == '订阅' and o.startup_cost == '<$1k'),
+        ('slots+enum', Opportunity.from_dict, Opportunity.to_dict,
+         lambda o: o.revenue_model_code == subscription and o.startup_cost_code == under_1k),
+    ):
+        measured = measure(lines, build)
+        objects = measured.pop('objects')
+        matched = sum(1 for o in objects if matches(o))
+        measured.update({
+            'name': name,
+            'to_dict': timed(lambda: [to_dict(o) for o in objects]),
+            'filter': timed(lambda: [o for o in objects if matches(o)]),
+            'matched': matched,
+        })
+        results.append(measured)
+        del objects
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Opportunity 内存与过滤基准")
+    parser.add_argument('--items', default='10000,100000', help='机会数，逗号分隔')
+    args = parser.parse_args()
+
+    for count in [int(value) for value in args.items.split(',')]:
+        results = run(count)
+        baseline = results[1]['memory']
+        print(f"\n{count} opportunities")
+        print(f"{'model':<12} {'MB':>8} {'B/opp':>7} {'vs dc':>6} {'load s':>8} {'to_dict s':>10} {'filter ms':>10} {'matched':>8}")
+        for result in results:
+            print(f"{result['name']:<12} {result['memory'] / 2 ** 20:>8.1f} {result['memory'] // count:>7} "
+                  f"{result['memory'] / baseline:>6.2f} {result['load']:>8.2f} {result['to_dict']:>10.3f} "
+                  f"{result['filter'] * 1000:>10.1f} {result['matched']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+端到端流水线基准：收集 → 去重 → 分析 → 保存 → 打印 → 飞书 → GitHub Issue → MVP
+
+所有外部服务都在本地替代，不访问网络：
+- 数据源：从响应归档回放（默认生成合成的 HN 归档，也可用 --archive 指定 --record 录下的真实归档）
+- 百炼：benchmarks.mock_bailian（独立进程，CPU 不计入被测进程）
+- GitHub API：本地模拟服务；飞书：PATH 中的假 openclaw 命令；MVP 输出到临时目录
+
+每个阶段报告墙钟时间、CPU 时间和峰值内存（tracemalloc），结果保存为 JSON，可用 --baseline 对比上一次结果。
+
+用法:
+    python3 -m benchmarks.pipeline --items 50,500,5000
+    python3 -m benchmarks.pipeline --items 500 --baseline data/benchmarks/pipeline_abc1234.json
+    python3 -m benchmarks.pipeline --archive data/archive --replay-at 2026-10-18 --items 30
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aiohttp import web
+
+import transport
+from config import HN_API_URL, DATA_DIR
+from analyzers.bailian import BailianAnalyzer
+from analyzers.usage import UsageTracker
+from benchmarks.mock_bailian import start_in_thread
+from collectors import HNCollector, CollectorRunner
+from processors import dedupe
+from storage import SeenStore, ResponseArchive
+import main as pipeline
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ren', 'tor', 'vex', 'zu', 'pan', 'dri', 'sol', 'qua', 'nex', 'bo', 'fi', 'gar', 'hul']
+STAGES = ['collect', 'dedupe', 'analyze', 'save_results', 'print_results',
+          'send_to_feishu', 'create_github_issues', 'generate_mvps']
+
+
+def build_hn_archive(path: str, count: int, seed: int = 0) -> ResponseArchive:
+    """生成合成的 HN 归档：topstories.json + count 条外链故事"""
+    rng = random.Random(seed)
+    archive = ResponseArchive(path)
+    headers = {'Content-Type': 'application/json; charset=utf-8'}
+    ids = list(range(40_000_000, 40_000_000 + count))
+    archive.record('GET', f"{HN_API_URL}/topstories.json", 200, headers, json.dumps(ids).encode('utf-8'))
+    now = int(time.time())
+    for item_id in ids:
+        words = [''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(7)]
+        story = {
+            'id': item_id,
+            'type': 'story',
+            'by': f"user{rng.randint(1, 5000)}",
+            'time': now - rng.randint(0, 48 * 3600),
+            'title': f"Show HN: {' '.join(words)}",
+            'url': f"https://example.com/{words[0]}/{item_id}",
+            'score': rng.randint(1, 800),
+            'descendants': rng.randint(0, 400),
+            'kids': [rng.randint(1, 10 ** 8) for _ in range(rng.randint(0, 30))],
+        }
+        archive.record('GET', f"{HN_API_URL}/item/{item_id}.json", 200, headers,
+                       json.dumps(story).encode('utf-8'))
+    return archive
+
+
+class MockGitHub:
+    """模拟 GitHub Issue 创建接口"""
+
+    def __init__(self):
+        self.created = 0
+
+    async def create_issue(self, request: web.Request) -> web.Response:
+        await request.json()
+        self.created += 1
+        owner, repo = request.match_info['owner'], request.match_info['repo']
+        return web.json_response({'html_url': f"https://github.com/{owner}/{repo}/issues/{self.created}"}, status=201)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/repos/{owner}/{repo}/issues', self.create_issue)
+        return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_bailian_process(latency: str) -> Tuple[str, subprocess.Popen]:
+    """在独立进程中启动模拟百炼服务，等待端口可连接"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.mock_bailian', '--port', str(port), '--latency', latency, '--seed', '0'],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return f"http://127.0.0.1:{port}", process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Mock Bailian did not start")
+
+
+def fake_openclaw(bin_dir: str):
+    """PATH 中放一个什么都不做的 openclaw，send_to_feishu 走完整流程但不真正发送"""
+    path = os.path.join(bin_dir, 'openclaw')
+    with open(path, 'w') as f:
+        f.write("#!/bin/sh\nexit 0\n")
+    os.chmod(path, 0o755)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+
+
+class StageRecorder:
+    """按阶段记录墙钟时间、CPU 时间和 Python 峰值内存"""
+
+    def __init__(self, trace_memory: bool = True, verbose: bool = False):
+        self.trace_memory = trace_memory
+        self.verbose = verbose
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        result: Dict[str, Any] = {}
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            with output:
+                yield result
+        finally:
+            result['wall'] = round(time.perf_counter() - wall, 4)
+            result['cpu'] = round(time.process_time() - cpu, 4)
+            if self.trace_memory:
+                result['peak_mb'] = round((tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20, 2)
+            self.stages[name] = result
+
+
+def run_size(count: int, args: argparse.Namespace, bailian_url: str, github_url: str, workdir: str) -> Dict[str, Any]:
+    """以 count 条输入跑一遍完整流水线"""
+    os.makedirs(workdir)
+    if args.archive:
+        transport.use_archive('replay', args.replay_at, ResponseArchive(args.archive))
+        runner = pipeline.build_collector_runner(hn_limit=count, ph_limit=count)
+    else:
+        transport.use_archive('replay', archive=build_hn_archive(os.path.join(workdir, 'archive'), count))
+        runner = CollectorRunner(default_deadline=600).register('hn', HNCollector.fetch_async, limit=count)
+
+    analyzer = BailianAnalyzer(
+        api_key='benchmark',
+        cache=False,
+        batch_size=args.batch_size,
+        usage=UsageTracker(os.path.join(workdir, 'usage'), daily_token_budget=0, daily_cost_budget=0)
+    )
+    analyzer.endpoint = f"{bailian_url}/v1/messages"
+    seen_store = SeenStore(os.path.join(workdir, 'research.db'))
+    recorder = StageRecorder(trace_memory=not args.no_tracemalloc, verbose=args.verbose)
+
+    with recorder.stage('collect') as stage:
+        items, _ = asyncio.run(runner.run_async())
+        stage['count'] = len(items)
+    with recorder.stage('dedupe') as stage:
+        items = dedupe(items)
+        stage['count'] = len(items)
+    with recorder.stage('analyze') as stage:
+        try:
+            opportunities = asyncio.run(analyzer.batch_analyze_async(
+                items, min_score=args.min_score, on_result=seen_store.record
+            ))
+        finally:
+            seen_store.close()
+        opportunities.sort(key=lambda opp: opp.score, reverse=True)
+        stage['count'] = len(opportunities)
+        stage['requests'] = int(analyzer.usage.summary()['totals']['attempts'])
+    with recorder.stage('save_results') as stage:
+        pipeline.save_results(opportunities, output_dir=workdir, store_path=os.path.join(workdir, 'research.db'))
+        stage['count'] = len(opportunities)
+    with recorder.stage('print_results') as stage:
+        pipeline.print_results(opportunities)
+        stage['count'] = min(5, len(opportunities))
+    with recorder.stage('send_to_feishu') as stage:
+        pipeline.send_to_feishu(opportunities, user_id='ou_benchmark')
+        stage['count'] = min(10, len(opportunities))
+    with recorder.stage('create_github_issues') as stage:
+        pipeline.create_github_issues(opportunities, token='benchmark', api_url=github_url)
+        stage['count'] = min(3, len(opportunities))
+    with recorder.stage('generate_mvps') as stage:
+        pipeline.generate_mvps(opportunities, output_dir=os.path.join(workdir, 'mvps'))
+        stage['count'] = min(2, len(opportunities))
+
+    total = {
+        'wall': round(sum(stage['wall'] for stage in recorder.stages.values()), 4),
+        'cpu': round(sum(stage['cpu'] for stage in recorder.stages.values()), 4),
+    }
+    if not args.no_tracemalloc:
+        total['peak_mb'] = max(stage['peak_mb'] for stage in recorder.stages.values())
+    return {'items': count, 'stages': recorder.stages, 'total': total}
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float, min_wall: float) -> List[str]:
+    """与基线对比，返回超出容差的阶段（墙钟时间或峰值内存）"""
+    previous = {run['items']: run['stages'] for run in baseline.get('results', [])}
+    regressions = []
+    for run in results:
+        for name, stage in run['stages'].items():
+            before = previous.get(run['items'], {}).get(name)
+            if not before:
+                continue
+            if before['wall'] >= min_wall and stage['wall'] > before['wall'] * (1 + tolerance):
+                regressions.append(f"{run['items']:>6} {name:<22} wall {before['wall']:.3f}s -> {stage['wall']:.3f}s")
+            if before.get('peak_mb', 0) >= 1 and stage.get('peak_mb', 0) > before['peak_mb'] * (1 + tolerance):
+                regressions.append(f"{run['items']:>6} {name:<22} peak {before['peak_mb']:.1f}MB -> {stage['peak_mb']:.1f}MB")
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"{'items':>6} {'stage':<22} {'count':>6} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}")
+    for run in results:
+        for name in STAGES:
+            stage = run['stages'][name]
+            peak = f"{stage['peak_mb']:>8.2f}" if 'peak_mb' in stage else f"{'-':>8}"
+            print(f"{run['items']:>6} {name:<22} {stage.get('count', ''):>6} {stage['wall']:>8.3f} {stage['cpu']:>8.3f} {peak}")
+        peak = f"{run['total']['peak_mb']:>8.2f}" if 'peak_mb' in run['total'] else f"{'-':>8}"
+        print(f"{run['items']:>6} {'total':<22} {'':>6} {run['total']['wall']:>8.3f} {run['total']['cpu']:>8.3f} {peak}")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端流水线基准（本地替代所有外部服务）")
+    parser.add_argument('--items', default='50,500,5000', help='输入条目数，逗号分隔')
+    parser.add_argument('--latency', default='fixed:0.05', help='模拟百炼延迟分布（见 benchmarks.mock_bailian）')
+    parser.add_argument('--batch-size', type=int, default=1, help='每次模型请求分析的条目数')
+    parser.add_argument('--min-score', type=int, default=60, help='最低分数')
+    parser.add_argument('--archive', help='使用已录制的响应归档目录（默认生成合成 HN 归档）')
+    parser.add_argument('--replay-at', help='配合 --archive：回放日期 YYYY-MM-DD')
+    parser.add_argument('--no-tracemalloc', action='store_true', help='不统计峰值内存（tracemalloc 会拖慢 CPU 密集阶段）')
+    parser.add_argument('--json', metavar='PATH', help='结果 JSON 路径（默认 data/benchmarks/pipeline_<commit>.json）')
+    parser.add_argument('--baseline', metavar='PATH', help='对比的基线 JSON，超出容差时退出码为 1')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='允许的相对退化（默认 25%%）')
+    parser.add_argument('--min-wall', type=float, default=0.05, help='基线墙钟时间低于该值的阶段不参与对比（秒）')
+    parser.add_argument('--verbose', action='store_true', help='显示各阶段自身的输出')
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    bailian_url, bailian = start_bailian_process(args.latency)
+    github = MockGitHub()
+    github_url, stop_github = start_in_thread(github)
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            fake_openclaw(tmp)
+            for count in [int(value) for value in args.items.split(',')]:
+                print(f"Running pipeline with {count} items...")
+                results.append(run_size(count, args, bailian_url, github_url, os.path.join(tmp, str(count))))
+    finally:
+        transport.use_archive('off')
+        stop_github()
+        bailian.terminate()
+        bailian.wait()
+
+    print()
+    print_table(results)
+
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'args': vars(args),
+        'results': results,
+    }
+    path = args.json or os.path.join(DATA_DIR, 'benchmarks', f"pipeline_{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved {path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_wall)
+        if regressions:
+            print(f"\nRegressions vs {args.baseline} (> {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions vs {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
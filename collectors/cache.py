@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""收集器本地缓存 - JSON 文件持久化"""
+
+import json
+import os
+import threading
+from typing import Any, Dict
+
+
+class JsonFileCache:
+    """以单个 JSON 文件持久化的键值缓存（原子写入，线程安全）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.data.get(key, default)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self.data[key] = value
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.data.pop(key, default)
+
+    def save(self):
+        """写入临时文件后替换，避免中途崩溃留下半个文件"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
@@ -1,11 +1,10 @@
 #!/usr/bin/env python3
 """中国科技媒体收集器 (36 氪、虎嗅等)"""
 
-import feedparser
-import requests
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
-import time
+
+from collectors.feed_cache import fetch_feed
 
 
 class ChineseMediaCollector:
@@ -48,9 +47,9 @@ class ChineseMediaCollector:
         
         for source, url in ChineseMediaCollector.RSS_FEEDS.items():
             try:
-                feed = feedparser.parse(url)
+                entries = fetch_feed(url)
                 
-                for entry in feed.entries[:limit // len(ChineseMediaCollector.RSS_FEEDS)]:
+                for entry in entries[:limit // len(ChineseMediaCollector.RSS_FEEDS)]:
                     # 解析时间
                     try:
                         published = datetime(*entry.published_parsed[:6])
@@ -76,9 +75,6 @@ class ChineseMediaCollector:
                         'tags': [tag.get('term', '') for tag in entry.get('tags', [])[:5]]
                     })
                 
-                # 限流
-                time.sleep(1)
-                
             except Exception as e:
                 print(f"Error fetching {source}: {e}")
         
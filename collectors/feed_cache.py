@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""RSS 条件请求缓存 - ETag / Last-Modified + 304"""
+
+import hashlib
+import os
+import time
+from typing import List, Dict, Any
+
+import feedparser
+
+import transport
+from config import CACHE_DIR
+from collectors.cache import JsonFileCache
+
+FEED_CACHE_DIR = os.path.join(CACHE_DIR, "feeds")
+
+# 缓存的条目字段（下游收集器只用到这些）
+ENTRY_FIELDS = ('id', 'title', 'link', 'summary', 'author', 'published', 'published_parsed', 'tags')
+
+
+def _serialize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """将 feedparser 条目转换为可 JSON 序列化的字典"""
+    data = {}
+    for key in ENTRY_FIELDS:
+        if key not in entry:
+            continue
+        value = entry[key]
+        if key == 'published_parsed':
+            value = list(value) if value else None
+        elif key == 'tags':
+            value = [{'term': tag.get('term', '')} for tag in value or []]
+        data[key] = value
+    return data
+
+
+def fetch_feed(url: str, timeout: int = 15) -> List[Dict[str, Any]]:
+    """
+    条件请求获取 RSS 条目
+
+    未变化的源（304）只花一次很小的请求，直接返回上次解析好的条目，不再解析。
+    记录归档时不发条件请求头（保证归档里是完整响应），回放时不写缓存。
+
+    Args:
+        url: RSS 地址
+        timeout: 请求超时（秒）
+
+    Returns:
+        条目列表（FeedParserDict，支持属性访问）
+    """
+    cache = JsonFileCache(os.path.join(FEED_CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json'))
+
+    mode = transport.archive_mode()
+    headers = {'User-Agent': 'ResearchAgent/1.0'}
+    if mode == 'off' and cache.get('entries') is not None:
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache.get('etag')
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache.get('last_modified')
+
+    response = transport.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and mode == 'off' and cache.get('entries') is not None:
+        entries = cache.get('entries')
+    else:
+        response.raise_for_status()
+        feed = feedparser.parse(
+            response.content,
+            response_headers={key.lower(): value for key, value in response.headers.items()}
+        )
+        entries = [_serialize_entry(entry) for entry in feed.entries]
+        if mode == 'replay':
+            return [feedparser.FeedParserDict(entry) for entry in entries]
+
+        cache.set('url', url)
+        cache.set('etag', response.headers.get('ETag', ''))
+        cache.set('last_modified', response.headers.get('Last-Modified', ''))
+        cache.set('fetched_at', time.time())
+        cache.set('entries', entries)
+        cache.save()
+
+    return [feedparser.FeedParserDict(entry) for entry in entries]
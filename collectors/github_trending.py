@@ -1,124 +1,215 @@
 #!/usr/bin/env python3
 """GitHub Trending 收集器 - 热门开源项目"""
 
-import requests
+import html as htmllib
+import re
+import transport
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from datetime import datetime
 
 
+# 轻量解析用的正则（只扫描需要的片段，不构建 DOM）
+_ARTICLE_SPLIT = re.compile(r'<article\b')
+_ARTICLE_CLASS = re.compile(r'^[^>]*class="[^"]*\bBox-row\b')
+_REPO_LINK = re.compile(r'<h2\b[^>]*class="[^"]*\bh3\b[^"]*"[^>]*>.*?<a\b[^>]*?\bhref="([^"]*)"', re.DOTALL)
+_DESCRIPTION = re.compile(r'<p\b[^>]*class="[^"]*\bcol-9\b[^"]*"[^>]*>(.*?)</p>', re.DOTALL)
+_STARS = re.compile(r'<a\b[^>]*href="[^"]*/stargazers[^"]*"[^>]*>(.*?)</a>', re.DOTALL)
+_FORKS = re.compile(r'<a\b[^>]*href="[^"]*/forks[^"]*"[^>]*>(.*?)</a>', re.DOTALL)
+_LANGUAGE = re.compile(r'<span\b[^>]*itemprop="programmingLanguage"[^>]*>(.*?)</span>', re.DOTALL)
+_TAG = re.compile(r'<[^>]*>')
+
+
+def _text(fragment: str) -> str:
+    """等价于 BeautifulSoup 的 get_text(strip=True)：去标签、逐段 strip 后拼接"""
+    parts = (htmllib.unescape(part).strip() for part in _TAG.split(fragment))
+    return ''.join(part for part in parts if part)
+
+
 class GitHubTrendingCollector:
     """GitHub Trending 项目收集器"""
-    
-    def __init__(self):
+
+    def __init__(self, parser: str = 'fast'):
         self.base_url = "https://github.com/trending"
         self.languages = ["", "Python", "JavaScript", "TypeScript"]  # 空字符串表示全部
-    
+        self.since_ranges = ["daily", "weekly", "monthly"]
+        self.parser = parser  # 'fast'（正则）或 'bs4'
+
     def fetch(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         获取 GitHub Trending 项目
-        
+
+        并发抓取所有语言 × 时间范围的页面，按 full_name 去重合并。
+
         Args:
             limit: 获取数量
-            
+
         Returns:
             项目列表
         """
-        items = []
-        
-        # 获取默认语言列表的 Trending
-        try:
-            trending_items = self._fetch_trending(limit)
-            items.extend(trending_items)
-        except Exception as e:
-            print(f"GitHub Trending error: {e}")
-        
-        print(f"Got {len(items)} GitHub Trending items")
+        pages = [(language, since) for language in self.languages for since in self.since_ranges]
+
+        with ThreadPoolExecutor(max_workers=len(pages)) as executor:
+            results = list(executor.map(lambda page: self._fetch_trending(*page), pages))
+
+        # 按各页排名交错合并，保证每个语言/时间范围都有覆盖
+        merged: Dict[str, Dict[str, Any]] = {}
+        depth = max((len(repos) for repos in results), default=0)
+        for rank in range(depth):
+            for (language, since), repos in zip(pages, results):
+                if rank >= len(repos):
+                    continue
+                repo = repos[rank]
+                entry = merged.get(repo['full_name'])
+                if entry is None:
+                    entry = merged[repo['full_name']] = dict(repo, trending=[])
+                entry['trending'].append(f"{language or 'all'}/{since}")
+
+        items = [self._to_item(repo) for repo in list(merged.values())[:limit]]
+        print(f"Got {len(items)} GitHub Trending items ({len(pages)} pages)")
         return items
-    
-    def _fetch_trending(self, limit: int) -> List[Dict[str, Any]]:
-        """抓取 GitHub Trending 页面"""
+
+    def _fetch_trending(self, language: str = "", since: str = "daily") -> List[Dict[str, Any]]:
+        """抓取并解析一个 GitHub Trending 页面"""
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
-        
-        response = requests.get(self.base_url, headers=headers, timeout=30)
-        
+        url = f"{self.base_url}/{language.lower()}" if language else self.base_url
+
+        try:
+            response = transport.get(url, headers=headers, params={'since': since}, timeout=30)
+        except Exception as e:
+            print(f"GitHub Trending error ({language or 'all'}/{since}): {e}")
+            return []
+
         if response.status_code != 200:
-            print(f"  GitHub Trending: HTTP {response.status_code}")
+            print(f"  GitHub Trending ({language or 'all'}/{since}): HTTP {response.status_code}")
+            return []
+
+        return self.parse(response.text)
+
+    def parse(self, html: str) -> List[Dict[str, Any]]:
+        """解析 Trending 页面，快速解析失败时回退到 BeautifulSoup"""
+        if self.parser == 'fast':
+            repos = self._parse_fast(html)
+            if repos or 'Box-row' not in html:
+                return repos
+        try:
+            return self._parse_bs4(html)
+        except ImportError:
+            print("  BeautifulSoup not installed, skipping page")
             return []
-        
-        items = []
-        html = response.text
-        
-        # 简单解析 HTML
+
+    def _parse_fast(self, html: str) -> List[Dict[str, Any]]:
+        """正则快速解析：按 <article> 切片，每片只做几次定向匹配"""
+        repos = []
+
+        for chunk in _ARTICLE_SPLIT.split(html)[1:]:
+            if not _ARTICLE_CLASS.match(chunk):
+                continue
+            chunk = chunk.split('</article>', 1)[0]
+
+            link = _REPO_LINK.search(chunk)
+            if not link:
+                continue
+            full_name = htmllib.unescape(link.group(1)).strip('/')
+            if len(full_name.split('/')) != 2:
+                continue
+
+            description = _DESCRIPTION.search(chunk)
+            stars = _STARS.search(chunk)
+            forks = _FORKS.search(chunk)
+            language = _LANGUAGE.search(chunk)
+
+            repos.append({
+                'full_name': full_name,
+                'description': _text(description.group(1))[:500] if description else '',
+                'stars': self._parse_number(_text(stars.group(1)) if stars else '0'),
+                'forks': self._parse_number(_text(forks.group(1)) if forks else '0'),
+                'language': _text(language.group(1)) if language else ''
+            })
+
+        return repos
+
+    def _parse_bs4(self, html: str) -> List[Dict[str, Any]]:
+        """BeautifulSoup 完整解析（原实现，作为回退和基准）"""
         from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
-        
-        articles = soup.find_all('article', class_='Box-row')
-        
-        for article in articles[:limit]:
+
+        repos = []
+        for article in soup.find_all('article', class_='Box-row'):
             try:
                 # 获取项目标题
                 title_elem = article.find('h2', class_='h3').find('a')
                 if not title_elem:
                     continue
-                
+
                 full_name = title_elem.get('href', '').strip('/')
-                name_parts = full_name.split('/')
-                
-                if len(name_parts) != 2:
+                if len(full_name.split('/')) != 2:
                     continue
-                
-                author, name = name_parts
-                
+
                 # 获取描述
                 desc_elem = article.find('p', class_='col-9')
                 description = desc_elem.get_text(strip=True)[:500] if desc_elem else ''
-                
+
                 # 获取 star 数
                 star_elem = article.find('a', href=lambda x: x and '/stargazers' in x)
                 stars_text = star_elem.get_text(strip=True) if star_elem else '0'
-                stars = self._parse_number(stars_text)
-                
+
                 # 获取 fork 数
                 fork_elem = article.find('a', href=lambda x: x and '/forks' in x)
                 forks_text = fork_elem.get_text(strip=True) if fork_elem else '0'
-                forks = self._parse_number(forks_text)
-                
+
                 # 获取语言
                 lang_elem = article.find('span', itemprop='programmingLanguage')
                 language = lang_elem.get_text(strip=True) if lang_elem else ''
-                
-                items.append({
-                    'id': f"github_{full_name.replace('/', '_')}",
-                    'title': f"{name} - {description[:100] if description else 'GitHub Trending Project'}",
-                    'source': 'github_trending',
-                    'url': f"https://github.com/{full_name}",
-                    'score': stars,  # 用 star 数作为评分参考
-                    'description': f"**{name}** by @{author}\n\n{description}\n\n⭐ {stars} | 🍴 {forks} | 💻 {language or 'Unknown'}",
-                    'author': author,
-                    'created_at': datetime.now().isoformat(),
-                    'metadata': {
-                        'full_name': full_name,
-                        'stars': stars,
-                        'forks': forks,
-                        'language': language
-                    }
+
+                repos.append({
+                    'full_name': full_name,
+                    'description': description,
+                    'stars': self._parse_number(stars_text),
+                    'forks': self._parse_number(forks_text),
+                    'language': language
                 })
-                
+
             except Exception as e:
                 print(f"  Parse error: {e}")
                 continue
-        
-        return items
-    
+
+        return repos
+
+    def _to_item(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        """将解析结果转换为收集器格式"""
+        full_name = repo['full_name']
+        author, name = full_name.split('/')
+        description = repo['description']
+        stars = repo['stars']
+
+        return {
+            'id': f"github_{full_name.replace('/', '_')}",
+            'title': f"{name} - {description[:100] if description else 'GitHub Trending Project'}",
+            'source': 'github_trending',
+            'url': f"https://github.com/{full_name}",
+            'score': stars,  # 用 star 数作为评分参考
+            'description': f"**{name}** by @{author}\n\n{description}\n\n⭐ {stars} | 🍴 {repo['forks']} | 💻 {repo['language'] or 'Unknown'}",
+            'author': author,
+            'created_at': datetime.now().isoformat(),
+            'metadata': {
+                'full_name': full_name,
+                'stars': stars,
+                'forks': repo['forks'],
+                'language': repo['language'],
+                'trending': repo.get('trending', [])
+            }
+        }
+
     def _parse_number(self, text: str) -> int:
         """解析数字（处理 k, M 等单位）"""
         text = text.replace(',', '').strip()
-        
+
         if not text:
             return 0
-        
+
         try:
             if 'k' in text.lower():
                 return int(float(text.lower().replace('k', '')) * 1000)
@@ -134,7 +225,7 @@ class GitHubTrendingCollector:
 if __name__ == '__main__':
     collector = GitHubTrendingCollector()
     items = collector.fetch(limit=5)
-    
+
     print(f"\nGot {len(items)} items\n")
     for i, item in enumerate(items[:3], 1):
         print(f"{i}. {item['title'][:60]}...")
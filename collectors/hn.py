@@ -1,105 +1,236 @@
 #!/usr/bin/env python3
 """Hacker News 收集器"""
 
-import requests
+import asyncio
+import os
 import time
-from typing import List, Dict, Any
-from config import HN_API_URL
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+
+import aiohttp
+
+import transport
+from config import HN_API_URL, HN_CONCURRENCY, CACHE_DIR
+from collectors.cache import JsonFileCache
+
+HN_CACHE_PATH = os.path.join(CACHE_DIR, "hn_items.json")
+HN_CACHE_RETENTION = 7 * 24 * 3600  # 不再上榜的条目保留 7 天
+HN_CACHED_FIELDS = ('id', 'type', 'title', 'url', 'score', 'by', 'time', 'descendants')
+
+# 新鲜度分级：(故事年龄上限, 缓存有效期)，单位秒
+HN_FRESHNESS_TIERS = [
+    (2 * 3600, 5 * 60),        # 2 小时内的新故事：5 分钟
+    (12 * 3600, 30 * 60),      # 12 小时内：30 分钟
+    (48 * 3600, 3 * 3600),     # 2 天内：3 小时
+    (float('inf'), 24 * 3600), # 更老：1 天
+]
 
 
 class HNCollector:
     """Hacker News 文章收集器"""
-    
+
     @staticmethod
     def fetch(limit: int = 30) -> List[Dict[str, Any]]:
         """
         获取 HN 热门新闻
-        
+
         Args:
             limit: 获取数量
-            
+
         Returns:
             文章列表
         """
-        try:
-            # 获取热门新闻 ID 列表
-            response = requests.get(
-                f"{HN_API_URL}/topstories.json",
-                timeout=10
-            )
-            response.raise_for_status()
-            top_ids = response.json()[:limit]
-            
-            # 获取文章详情（带限流）
-            items = []
-            for i, item_id in enumerate(top_ids):
-                try:
-                    # 限流：每 10 个请求延迟 1 秒
-                    if i > 0 and i % 10 == 0:
-                        time.sleep(1)
-                    
-                    item_response = requests.get(
-                        f"{HN_API_URL}/item/{item_id}.json",
-                        timeout=5
-                    )
-                    if item_response.status_code == 200:
-                        item = item_response.json()
-                        if item and item.get('type') == 'story' and item.get('url'):
-                            items.append({
-                                'id': str(item['id']),
-                                'title': item.get('title', ''),
-                                'url': item.get('url', ''),
-                                'score': item.get('score', 0),
-                                'by': item.get('by', ''),
-                                'time': item.get('time', 0),
-                                'descendants': item.get('descendants', 0),
-                                'source': 'hn'
-                            })
-                except Exception as e:
-                    print(f"Error fetching item {item_id}: {e}")
-                    continue
-            
-            return items
-            
-        except Exception as e:
-            print(f"Error fetching HN: {e}")
-            return []
-    
+        return asyncio.run(HNCollector.fetch_async(limit=limit))
+
     @staticmethod
     def fetch_new(limit: int = 30) -> List[Dict[str, Any]]:
         """获取最新新闻"""
+        return asyncio.run(HNCollector.fetch_async(limit=limit, feed='newstories'))
+
+    @staticmethod
+    async def fetch_async(
+        limit: int = 30,
+        feed: str = 'topstories',
+        concurrency: Optional[int] = None,
+        incremental: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        并发获取 HN 文章（共享 keep-alive 连接池，按主机限速见 HTTP_RATE_LIMITS）
+
+        Args:
+            limit: 获取数量
+            feed: 列表类型，topstories 或 newstories
+            concurrency: 最大并发请求数，默认 HN_CONCURRENCY
+            incremental: 增量模式，只重新抓取新增/变化/过期的条目
+
+        Returns:
+            文章列表（顺序与 HN 列表一致）
+        """
+        ranked = [
+            (rank, item)
+            async for rank, item in HNCollector._iter_ranked(limit, feed, concurrency, incremental)
+        ]
+        return [item for _, item in sorted(ranked, key=lambda pair: pair[0])]
+
+    @staticmethod
+    async def iter_async(
+        limit: int = 30,
+        feed: str = 'topstories',
+        concurrency: Optional[int] = None,
+        incremental: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """流式获取 HN 文章：每条抓到即产出（缓存命中的条目最先产出），参数同 fetch_async"""
+        async for _, item in HNCollector._iter_ranked(limit, feed, concurrency, incremental):
+            yield item
+
+    @staticmethod
+    async def _iter_ranked(
+        limit: int,
+        feed: str,
+        concurrency: Optional[int],
+        incremental: bool
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """按到达顺序产出 (在 HN 列表中的排名, 文章)"""
+        concurrency = concurrency or HN_CONCURRENCY
+        include_descendants = feed == 'topstories'
+
+        connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
         try:
-            response = requests.get(
-                f"{HN_API_URL}/newstories.json",
-                timeout=10
-            )
-            response.raise_for_status()
-            new_ids = response.json()[:limit]
-            
-            items = []
-            for item_id in new_ids:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                ids = await transport.get_json_async(session, f"{HN_API_URL}/{feed}.json", timeout=10)
+                ids = (ids or [])[:limit]
+                ranks = {item_id: rank for rank, item_id in enumerate(ids)}
+
+                cache = None
+                to_fetch = ids
+                if incremental:
+                    cache, to_fetch, hits = await HNCollector._plan_incremental(session, ids)
+                    for item_id, raw in hits.items():
+                        item = HNCollector._to_item(raw, include_descendants)
+                        if item:
+                            yield ranks[item_id], item
+
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def fetch_one(item_id: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+                    async with semaphore:
+                        try:
+                            return item_id, await transport.get_json_async(
+                                session, f"{HN_API_URL}/item/{item_id}.json", timeout=5
+                            )
+                        except Exception as e:
+                            print(f"Error fetching item {item_id}: {e}")
+                            return item_id, None
+
+                fetched: Dict[int, Optional[Dict[str, Any]]] = {}
+                tasks = [asyncio.ensure_future(fetch_one(item_id)) for item_id in to_fetch]
                 try:
-                    item_response = requests.get(
-                        f"{HN_API_URL}/item/{item_id}.json",
-                        timeout=5
-                    )
-                    if item_response.status_code == 200:
-                        item = item_response.json()
-                        if item and item.get('type') == 'story' and item.get('url'):
-                            items.append({
-                                'id': str(item['id']),
-                                'title': item.get('title', ''),
-                                'url': item.get('url', ''),
-                                'score': item.get('score', 0),
-                                'by': item.get('by', ''),
-                                'time': item.get('time', 0),
-                                'source': 'hn'
-                            })
-                except Exception:
-                    continue
-            
-            return items
-            
+                    for next_done in asyncio.as_completed(tasks):
+                        item_id, raw = await next_done
+                        fetched[item_id] = raw
+                        if not raw and cache is not None and str(item_id) in cache.get('items', {}):
+                            # 抓取失败时沿用旧缓存
+                            raw = cache.get('items')[str(item_id)]['raw']
+                        item = HNCollector._to_item(raw, include_descendants)
+                        if item:
+                            yield ranks[item_id], item
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    if cache is not None:
+                        HNCollector._save_incremental(cache, ids, fetched)
         except Exception as e:
-            print(f"Error fetching HN new: {e}")
-            return []
+            print(f"Error fetching HN {feed}: {e}")
+
+    @staticmethod
+    async def _plan_incremental(
+        session: aiohttp.ClientSession,
+        ids: List[int]
+    ) -> Tuple[JsonFileCache, List[int], Dict[int, Dict[str, Any]]]:
+        """
+        增量抓取计划：高水位以上的新条目、updates.json 中变化的条目、按新鲜度分级过期的缓存条目需要抓取
+
+        Returns:
+            (缓存, 需要抓取的 ID, 可直接使用的缓存条目)
+        """
+        cache = JsonFileCache(HN_CACHE_PATH)
+        cached: Dict[str, Dict[str, Any]] = cache.get('items', {})
+        high_water = cache.get('max_item_id', 0)
+        now = time.time()
+
+        try:
+            updates = await transport.get_json_async(session, f"{HN_API_URL}/updates.json", timeout=10) or {}
+            changed = set(updates.get('items', []))
+        except Exception as e:
+            print(f"Error fetching HN updates: {e}")
+            changed = set()
+
+        new_ids, changed_ids, stale_ids, hits = [], [], [], {}
+        for item_id in ids:
+            entry = cached.get(str(item_id))
+            if item_id > high_water or entry is None:
+                new_ids.append(item_id)
+            elif item_id in changed:
+                changed_ids.append(item_id)
+            elif not HNCollector._is_fresh(entry, now):
+                stale_ids.append(item_id)
+            else:
+                hits[item_id] = entry['raw']
+
+        print(f"HN incremental: {len(new_ids)} new, {len(changed_ids)} changed, "
+              f"{len(stale_ids)} stale, {len(hits)} cached")
+
+        cache.set('items', cached)
+        return cache, new_ids + changed_ids + stale_ids, hits
+
+    @staticmethod
+    def _save_incremental(cache: JsonFileCache, ids: List[int], fetched: Dict[int, Optional[Dict[str, Any]]]):
+        """写回抓到的条目、更新高水位并清理过期缓存"""
+        cached: Dict[str, Dict[str, Any]] = cache.get('items', {})
+        now = time.time()
+
+        for item_id, raw in fetched.items():
+            if raw:
+                cached[str(item_id)] = {'raw': HNCollector._trim(raw), 'fetched_at': now}
+
+        # 清理：不在当前列表且超过保留期的条目
+        current = {str(item_id) for item_id in ids}
+        for key in [key for key, entry in cached.items()
+                    if key not in current and now - entry['fetched_at'] > HN_CACHE_RETENTION]:
+            del cached[key]
+
+        cache.set('items', cached)
+        cache.set('max_item_id', max([cache.get('max_item_id', 0)] + list(ids)))
+        cache.save()
+
+    @staticmethod
+    def _is_fresh(entry: Dict[str, Any], now: float) -> bool:
+        """按故事年龄分级判断缓存是否仍然新鲜：越新的故事变化越快，越频繁重查"""
+        age = now - entry['raw'].get('time', 0)
+        for max_age, ttl in HN_FRESHNESS_TIERS:
+            if age < max_age:
+                return now - entry['fetched_at'] < ttl
+        return False
+
+    @staticmethod
+    def _trim(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """只缓存 _to_item 用到的字段（去掉 kids 等大字段）"""
+        return {key: raw[key] for key in HN_CACHED_FIELDS if key in raw}
+
+    @staticmethod
+    def _to_item(raw: Optional[Dict[str, Any]], include_descendants: bool = True) -> Optional[Dict[str, Any]]:
+        """将 HN API 返回的条目转换为收集器格式，非外链故事返回 None"""
+        if not raw or raw.get('type') != 'story' or not raw.get('url'):
+            return None
+
+        item = {
+            'id': str(raw['id']),
+            'title': raw.get('title', ''),
+            'url': raw.get('url', ''),
+            'score': raw.get('score', 0),
+            'by': raw.get('by', ''),
+            'time': raw.get('time', 0),
+        }
+        if include_descendants:
+            item['descendants'] = raw.get('descendants', 0)
+        item['source'] = 'hn'
+        return item
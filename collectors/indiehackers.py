@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
 """IndieHackers 收集器 - 一人公司/独立开发者案例"""
 
-import requests
-from typing import List, Dict, Any
+import html
+import os
+import re
+import time
+import transport
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from config import CACHE_DIR, IH_CACHE_TTL, IH_CONCURRENCY
+from collectors.cache import JsonFileCache
+
+IH_CACHE_PATH = os.path.join(CACHE_DIR, "indiehackers_products.json")
 
 
 class IndieHackersCollector:
     """IndieHackers 产品/收入案例收集器（API + 备用）"""
     
+    def __init__(self):
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+    
     def fetch(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         获取 IndieHackers 上的产品案例
@@ -33,38 +48,21 @@ class IndieHackersCollector:
     def _fetch_api(self, limit: int) -> List[Dict[str, Any]]:
         """尝试从 IndieHackers 获取真实数据"""
         try:
-            # 使用公开的产品列表页面
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            
             # 尝试获取热门产品
-            response = requests.get(
+            response = transport.get(
                 'https://www.indiehackers.com/products',
-                headers=headers,
+                headers=self.headers,
                 timeout=15
             )
             
             if response.status_code == 200:
-                # 简单解析 HTML 获取产品链接
-                import re
-                pattern = r'href="(/products/[^"]+)"'
-                matches = re.findall(pattern, response.text)
-                
-                for href in matches[:limit]:
-                    # 获取产品详情
-                    product_url = f'https://www.indiehackers.com{href}'
-                    items.append({
-                        'id': f"ih_{href.split('/')[-1]}",
-                        'title': f'IndieHackers Product: {href.split("/")[-1]}',
-                        'source': 'indiehackers',
-                        'url': product_url,
-                        'score': 0,
-                        'description': f'Independent developer product from IndieHackers community',
-                        'author': 'unknown',
-                        'created_at': ''
-                    })
+                # 简单解析 HTML 获取产品 slug（去重，保持顺序）
+                slugs = []
+                for href in re.findall(r'href="/products/([^"/?#]+)', response.text):
+                    if href not in slugs:
+                        slugs.append(href)
                 
+                items = self._enrich(slugs[:limit])
                 if items:
                     return items
         except Exception as e:
@@ -72,6 +70,107 @@ class IndieHackersCollector:
         
         return []
     
+    def _enrich(self, slugs: List[str]) -> List[Dict[str, Any]]:
+        """并发抓取产品详情页（带磁盘缓存），只保留拿到真实名称的产品"""
+        cache = JsonFileCache(IH_CACHE_PATH)
+        now = time.time()
+        # 记录 / 回放归档时绕过缓存，详情页都经过传输层；回放不写缓存
+        mode = transport.archive_mode()
+        
+        def load(slug: str) -> Optional[Dict[str, Any]]:
+            cached = cache.get(slug)
+            if mode == 'off' and cached and now - cached.get('fetched_at', 0) < IH_CACHE_TTL:
+                return cached
+            product = self._fetch_product(slug)
+            if product is not None and mode != 'replay':
+                product['fetched_at'] = now
+                cache.set(slug, product)
+            return product
+        
+        with ThreadPoolExecutor(max_workers=IH_CONCURRENCY) as executor:
+            products = list(executor.map(load, slugs))
+        if mode != 'replay':
+            cache.save()
+        
+        items = []
+        for slug, product in zip(slugs, products):
+            if not product or not product.get('name'):
+                continue
+            
+            description = product['tagline']
+            if product['revenue']:
+                description = f"{description}\n\n💰 收入：{product['revenue']}"
+            
+            items.append({
+                'id': f"ih_{slug}",
+                'title': f"{product['name']} - {product['tagline']}"[:200] if product['tagline'] else product['name'],
+                'source': 'indiehackers',
+                'url': f'https://www.indiehackers.com/products/{slug}',
+                'score': 0,
+                'description': description[:500],
+                'author': 'unknown',
+                'created_at': '',
+                'metadata': {'revenue': product['revenue']}
+            })
+        
+        return items
+    
+    def _fetch_product(self, slug: str) -> Optional[Dict[str, Any]]:
+        """
+        抓取单个产品页，提取名称、简介和收入
+        
+        Returns:
+            产品信息；请求失败返回 None（不写缓存，下次重试）
+        """
+        try:
+            response = transport.get(
+                f'https://www.indiehackers.com/products/{slug}',
+                headers=self.headers,
+                timeout=15
+            )
+        except Exception as e:
+            print(f"  IndieHackers product {slug}: {e}")
+            return None
+        
+        if response.status_code != 200:
+            print(f"  IndieHackers product {slug}: HTTP {response.status_code}")
+            # 429/5xx 是临时错误，不缓存；其它（如 404）缓存空结果，避免每次重试
+            if response.status_code == 429 or response.status_code >= 500:
+                return None
+            return {'name': '', 'tagline': '', 'revenue': ''}
+        
+        page = response.text
+        name = self._meta(page, 'og:title')
+        if not name:
+            match = re.search(r'<title[^>]*>(.*?)</title>', page, re.DOTALL)
+            name = html.unescape(match.group(1)).strip() if match else ''
+        name = re.sub(r'\s*[|\-–]\s*Indie Hackers\s*$', '', name, flags=re.IGNORECASE)
+        
+        tagline = self._meta(page, 'og:description') or self._meta(page, 'description')
+        
+        revenue = re.search(
+            r'\$\s?[\d,.]+\s?[kKmM]?\s*(?:/\s*mo(?:nth)?\b|MRR\b|per month|a month)',
+            re.sub(r'<[^>]+>', ' ', page)
+        )
+        
+        return {
+            'name': name[:100],
+            'tagline': tagline[:300],
+            'revenue': ' '.join(revenue.group().split()) if revenue else ''
+        }
+    
+    @staticmethod
+    def _meta(page: str, key: str) -> str:
+        """读取 <meta property/name="key" content="..."> 的内容"""
+        for pattern in (
+            rf'<meta[^>]+(?:property|name)="{re.escape(key)}"[^>]*content="([^"]*)"',
+            rf'<meta[^>]+content="([^"]*)"[^>]*(?:property|name)="{re.escape(key)}"',
+        ):
+            match = re.search(pattern, page)
+            if match:
+                return html.unescape(match.group(1)).strip()
+        return ''
+    
     def _get_fallback_cases(self, limit: int) -> List[Dict[str, Any]]:
         """
         备用：返回一些知名的 IndieHackers 成功案例
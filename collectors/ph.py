@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 """Product Hunt 收集器 - 每日热门产品"""
 
-import feedparser
-import requests
+import transport
 from typing import List, Dict, Any
 import os
 
+from collectors.feed_cache import fetch_feed
+
 
 class PHCollector:
     """Product Hunt 产品收集器（RSS + API）"""
@@ -48,7 +49,7 @@ class PHCollector:
             }
             """ % limit
             
-            response = requests.post(
+            response = transport.post(
                 "https://api.producthunt.com/v2/api/graphql",
                 headers={"Authorization": f"Bearer {token}"},
                 json={"query": query},
@@ -78,10 +79,10 @@ class PHCollector:
     def _fetch_rss(limit: int) -> List[Dict[str, Any]]:
         """RSS 备用方案"""
         try:
-            feed = feedparser.parse("https://www.producthunt.com/feed")
+            entries = fetch_feed("https://www.producthunt.com/feed")
             
             items = []
-            for entry in feed.entries[:limit]:
+            for entry in entries[:limit]:
                 items.append({
                     'id': f"ph_{entry.id}" if hasattr(entry, 'id') else entry.link,
                     'title': entry.title[:200],
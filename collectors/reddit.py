@@ -1,21 +1,26 @@
 #!/usr/bin/env python3
 """Reddit 收集器 - r/entrepreneur 和 r/SaaS"""
 
-import requests
-from typing import List, Dict, Any
+import transport
+from typing import List, Dict, Any, Iterator, Optional
 
 
 class RedditCollector:
     """Reddit 创业/SaaS 讨论收集器"""
     
-    def __init__(self):
-        self.subreddits = ['entrepreneur', 'SaaS']  # 先只用两个最相关的
+    def __init__(self, subreddits: Optional[List[str]] = None):
+        self.subreddits = subreddits or ['entrepreneur', 'SaaS']  # 先只用两个最相关的
         self.headers = {'User-Agent': 'ResearchAgent/1.0'}
+        self.page_size = 100  # Reddit 单页上限
+        self.max_pages = 10
     
     def fetch(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         获取 Reddit 热门讨论
         
+        所有 subreddit 合并为一个 r/a+b+c 列表按游标翻页，凑够 limit 条合格帖子即停止；
+        每个 subreddit 的配额在抓取后按帖子所属 subreddit 计算。
+        
         Args:
             limit: 获取数量
             
@@ -23,51 +28,70 @@ class RedditCollector:
             帖子列表
         """
         items = []
-        per_sub = limit // len(self.subreddits)
+        quota = -(-limit // len(self.subreddits))  # 每个 subreddit 最多 ceil(limit / n) 条
+        counts: Dict[str, int] = {}
         
-        for subreddit in self.subreddits:
-            try:
-                sub_items = self._fetch_subreddit(subreddit, per_sub)
-                items.extend(sub_items)
-            except Exception as e:
-                print(f"Reddit r/{subreddit} error: {e}")
+        try:
+            for post_data in self._iter_posts(self.subreddits):
+                item = self._to_item(post_data)
+                if not item:
+                    continue
+                
+                subreddit = post_data.get('subreddit', '').lower()
+                if counts.get(subreddit, 0) >= quota:
+                    continue
+                counts[subreddit] = counts.get(subreddit, 0) + 1
+                
+                items.append(item)
+                if len(items) >= limit:
+                    break
+        except Exception as e:
+            print(f"Reddit error: {e}")
         
         print(f"Got {len(items)} Reddit items")
         return items
     
-    def _fetch_subreddit(self, subreddit: str, limit: int) -> List[Dict[str, Any]]:
-        """获取指定 subreddit 的热门帖子"""
-        url = f'https://www.reddit.com/r/{subreddit}/hot.json?limit={limit}'
-        
-        response = requests.get(url, headers=self.headers, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"  r/{subreddit}: HTTP {response.status_code}")
-            return []
-        
-        data = response.json()
-        items = []
+    def _iter_posts(self, subreddits: List[str]) -> Iterator[Dict[str, Any]]:
+        """按 after 游标逐页获取合并列表中的帖子（惰性生成，调用方停止迭代即不再请求）"""
+        url = f"https://www.reddit.com/r/{'+'.join(subreddits)}/hot.json"
+        after = None
         
-        for post in data.get('data', {}).get('children', []):
-            post_data = post.get('data', {})
+        for _ in range(self.max_pages):
+            params = {'limit': self.page_size, 'raw_json': 1}
+            if after:
+                params['after'] = after
             
-            # 跳过置顶帖、广告、视频
-            if post_data.get('stickied') or post_data.get('is_video') or post_data.get('over_18'):
-                continue
+            response = transport.get(url, headers=self.headers, params=params, timeout=30)
             
-            # 至少要有标题
-            if not post_data.get('title'):
-                continue
+            if response.status_code != 200:
+                print(f"  r/{'+'.join(subreddits)}: HTTP {response.status_code}")
+                return
             
-            items.append({
-                'id': f"reddit_{post_data.get('id', '')}",
-                'title': post_data.get('title', '')[:200],
-                'source': f'reddit_r/{subreddit}',
-                'url': f"https://www.reddit.com{post_data.get('permalink', '')}",
-                'score': post_data.get('score', 0),
-                'description': (post_data.get('selftext', '')[:500] if post_data.get('selftext') else ''),
-                'author': post_data.get('author', 'unknown'),
-                'created_at': post_data.get('created_utc', '')
-            })
+            data = response.json().get('data', {})
+            for post in data.get('children', []):
+                yield post.get('data', {})
+            
+            after = data.get('after')
+            if not after:
+                return
+    
+    def _to_item(self, post_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """将帖子转换为收集器格式，不合格的帖子返回 None"""
+        # 跳过置顶帖、广告、视频
+        if post_data.get('stickied') or post_data.get('is_video') or post_data.get('over_18'):
+            return None
         
-        return items
+        # 至少要有标题
+        if not post_data.get('title'):
+            return None
+        
+        return {
+            'id': f"reddit_{post_data.get('id', '')}",
+            'title': post_data.get('title', '')[:200],
+            'source': f"reddit_r/{post_data.get('subreddit', '')}",
+            'url': f"https://www.reddit.com{post_data.get('permalink', '')}",
+            'score': post_data.get('score', 0),
+            'description': (post_data.get('selftext', '')[:500] if post_data.get('selftext') else ''),
+            'author': post_data.get('author', 'unknown'),
+            'created_at': post_data.get('created_utc', '')
+        }
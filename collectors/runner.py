@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""收集器并发调度 - 所有数据源同时运行，每个源独立超时"""
+
+import asyncio
+import inspect
+import threading
+import time
+from contextlib import aclosing  # Python 3.10+
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+
+import metrics
+from config import COLLECT_DEADLINE
+
+_DONE = object()  # stream() 结束标记
+
+
+@dataclass
+class CollectorSource:
+    """一个已注册的数据源"""
+
+    name: str
+    fetch: Callable[..., Any]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    deadline: float = COLLECT_DEADLINE
+
+
+def _run_in_thread(fn: Callable[..., Any], kwargs: Dict[str, Any], name: str) -> asyncio.Future:
+    """
+    在守护线程中运行同步收集器，结果回填到事件循环的 Future
+
+    超时的线程不会被等待，也不会阻塞进程退出。
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter: Callable[[Any], None], value: Any):
+        if not future.done():
+            setter(value)
+
+    def target():
+        try:
+            result = fn(**kwargs)
+        except BaseException as e:
+            callback, value = future.set_exception, e
+        else:
+            callback, value = future.set_result, result
+        try:
+            loop.call_soon_threadsafe(resolve, callback, value)
+        except RuntimeError:
+            # 事件循环已关闭：该数据源早已超时被放弃
+            pass
+
+    threading.Thread(target=target, name=f"collector-{name}", daemon=True).start()
+    return future
+
+
+class CollectorRunner:
+    """并发运行所有数据源：同步收集器进线程，异步收集器（协程/异步生成器）在事件循环上运行"""
+
+    def __init__(self, default_deadline: float = COLLECT_DEADLINE):
+        self.default_deadline = default_deadline
+        self.sources: List[CollectorSource] = []
+        self.report: List[Dict[str, Any]] = []
+
+    def register(self, name: str, fetch: Callable[..., Any], deadline: Optional[float] = None, **kwargs):
+        """
+        注册数据源
+
+        Args:
+            name: 数据源名称（用于报告）
+            fetch: 收集函数，同步函数、协程函数或异步生成器函数均可
+            deadline: 该数据源的超时时间（秒）
+            **kwargs: 调用 fetch 时传入的参数
+        """
+        self.sources.append(CollectorSource(
+            name=name,
+            fetch=fetch,
+            kwargs=kwargs,
+            deadline=deadline or self.default_deadline
+        ))
+        return self
+
+    async def run_async(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        并发运行所有数据源
+
+        Returns:
+            (按注册顺序合并的条目列表, 每个数据源的耗时/结果报告)
+        """
+        buckets: List[List[Dict[str, Any]]] = [[] for _ in self.sources]
+        report = await asyncio.gather(*(
+            self._run_source(source, bucket.append) for source, bucket in zip(self.sources, buckets)
+        ))
+
+        items = [item for bucket in buckets for item in bucket]
+        self.report = list(report)
+        return items, self.report
+
+    def run(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """同步兼容接口：内部调用异步实现"""
+        return asyncio.run(self.run_async())
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        并发运行所有数据源，条目一到达就产出
+
+        异步生成器数据源逐条产出，其余数据源完成时整批产出。结束后 self.report 为数据源报告。
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._run_source(source, queue.put_nowait)) for source in self.sources]
+        finished = asyncio.gather(*tasks)
+        finished.add_done_callback(lambda _: queue.put_nowait(_DONE))
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                yield item
+            self.report = finished.result()
+        finally:
+            # 消费方提前停止时取消剩余数据源，并取回 gather 的结果，避免 "exception was never retrieved"
+            for task in tasks:
+                task.cancel()
+            if not finished.done():
+                finished.cancel()
+            try:
+                await finished
+            except asyncio.CancelledError:
+                # 只吞掉上面取消 gather 引起的 CancelledError；消费方自身被取消时继续传播
+                if asyncio.current_task().cancelling():
+                    raise
+
+    async def _run_source(self, source: CollectorSource, emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """运行单个数据源，条目逐个交给 emit；超时或异常时保留已产出的条目"""
+        start = time.perf_counter()
+        entry = {'source': source.name, 'status': 'ok', 'items': 0, 'elapsed': 0.0, 'error': ''}
+        count = 0
+
+        def push(item: Dict[str, Any]):
+            nonlocal count
+            count += 1
+            emit(item)
+
+        async def drain():
+            if inspect.isasyncgenfunction(source.fetch):
+                async with aclosing(source.fetch(**source.kwargs)) as stream:
+                    async for item in stream:
+                        push(item)
+                return
+
+            if inspect.iscoroutinefunction(source.fetch):
+                result = await source.fetch(**source.kwargs)
+            else:
+                result = await _run_in_thread(source.fetch, source.kwargs, source.name)
+            for item in result or []:
+                push(item)
+
+        with metrics.span('collect', source=source.name) as span:
+            try:
+                await asyncio.wait_for(drain(), timeout=source.deadline)
+            except asyncio.TimeoutError:
+                entry['status'] = 'timeout'
+                entry['error'] = f"deadline {source.deadline:g}s exceeded"
+            except Exception as e:
+                entry['status'] = 'error'
+                entry['error'] = str(e)[:200]
+            span.update(status=entry['status'], items=count)
+
+        entry['items'] = count
+        entry['elapsed'] = round(time.perf_counter() - start, 3)
+        metrics.inc('items_collected_total', count, source=source.name)
+        metrics.inc('collector_runs_total', source=source.name, status=entry['status'])
+        return entry
+
+
+def format_report(report: List[Dict[str, Any]]) -> str:
+    """格式化数据源报告，用于日志输出"""
+    lines = []
+    for entry in report:
+        line = f"{entry['source']:<14} {entry['status']:<8} {entry['items']:>4} items  {entry['elapsed']:>7.2f}s"
+        if entry['error']:
+            line += f"  ({entry['error']})"
+        lines.append(line)
+    return "\n".join(lines)
@@ -12,9 +12,39 @@ BAILIAN_API_KEY = os.getenv("BAILIAN_API_KEY", "")
 BAILIAN_MODEL = os.getenv("BAILIAN_MODEL", "qwen3-coder-plus")
 BAILIAN_BASE_URL = os.getenv("BAILIAN_BASE_URL", "https://coding.dashscope.aliyuncs.com/apps/anthropic")
 BAILIAN_TIMEOUT = int(os.getenv("BAILIAN_TIMEOUT", "60"))  # 秒
+BAILIAN_BATCH_SIZE = int(os.getenv("BAILIAN_BATCH_SIZE", "1"))  # 每次请求分析的条目数，1 表示逐条分析
+BAILIAN_BATCH_LINGER = float(os.getenv("BAILIAN_BATCH_LINGER", "0.5"))  # 凑批最多等待秒数
+BAILIAN_STREAM = os.getenv("BAILIAN_STREAM", "true").lower() == "true"  # 流式输出，评分明显低于阈值时提前终止
+BAILIAN_ABORT_MARGIN = int(os.getenv("BAILIAN_ABORT_MARGIN", "10"))  # 评分低于 min_score - 该值才提前终止
 # Coding Plan 使用 Anthropic 兼容 API
 BAILIAN_ENDPOINT = f"{BAILIAN_BASE_URL}/v1/messages"
 
+# 模型请求自适应并发（AIMD）：延迟正常时窗口加性增长，遇到 429/超时减半
+BAILIAN_CONCURRENCY = float(os.getenv("BAILIAN_CONCURRENCY", "5"))  # 初始窗口
+BAILIAN_CONCURRENCY_MIN = int(os.getenv("BAILIAN_CONCURRENCY_MIN", "1"))
+BAILIAN_CONCURRENCY_MAX = int(os.getenv("BAILIAN_CONCURRENCY_MAX", "32"))
+BAILIAN_LATENCY_TOLERANCE = float(os.getenv("BAILIAN_LATENCY_TOLERANCE", "2.0"))  # 延迟超过最低延迟的几倍时停止增长
+
+# 模型请求策略：重试、熔断和全局预算
+BAILIAN_MAX_ATTEMPTS = int(os.getenv("BAILIAN_MAX_ATTEMPTS", "4"))  # 每个请求最多尝试次数
+BAILIAN_RETRY_BASE_DELAY = float(os.getenv("BAILIAN_RETRY_BASE_DELAY", "2"))  # 秒，指数退避 + 全抖动
+BAILIAN_RPM = float(os.getenv("BAILIAN_RPM", "0"))  # 每分钟请求数上限，0 表示不限
+BAILIAN_TPM = float(os.getenv("BAILIAN_TPM", "0"))  # 每分钟 token 上限（输入 + 输出），0 表示不限
+BAILIAN_CIRCUIT_THRESHOLD = int(os.getenv("BAILIAN_CIRCUIT_THRESHOLD", "5"))  # 连续失败多少次后熔断
+BAILIAN_CIRCUIT_COOLDOWN = float(os.getenv("BAILIAN_CIRCUIT_COOLDOWN", "30"))  # 秒，熔断后首次探测前的等待，每次探测失败翻倍
+
+# 模型用量与成本：单价按每百万 token 计（Coding Plan 包月时保持 0，只统计 token）
+BAILIAN_PRICE_INPUT = float(os.getenv("BAILIAN_PRICE_INPUT", "0"))
+BAILIAN_PRICE_OUTPUT = float(os.getenv("BAILIAN_PRICE_OUTPUT", "0"))
+BAILIAN_DAILY_TOKEN_BUDGET = int(os.getenv("BAILIAN_DAILY_TOKEN_BUDGET", "0"))  # 每日 token 上限，0 表示不限
+BAILIAN_DAILY_COST_BUDGET = float(os.getenv("BAILIAN_DAILY_COST_BUDGET", "0"))  # 每日费用上限，0 表示不限
+
+# 模型响应缓存（键包含模型 + 提示词模板版本，任一变化即失效）
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1000"))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
 # 配置验证
 def validate_config():
     """验证必需的配置参数"""
@@ -34,16 +64,70 @@ FEISHU_USER_ID = os.getenv("FEISHU_USER_ID", "")
 
 # 数据源配置
 HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+HN_CONCURRENCY = int(os.getenv("HN_CONCURRENCY", "20"))  # 最大并发连接数
+HN_INCREMENTAL = os.getenv("HN_INCREMENTAL", "true").lower() == "true"  # 增量抓取（本地缓存 + updates.json）
+HN_RATE_LIMIT = float(os.getenv("HN_RATE_LIMIT", "100"))  # 每秒最多请求数，0 表示不限速
 PH_RSS_URL = "https://www.producthunt.com/rss"
+IH_CONCURRENCY = int(os.getenv("IH_CONCURRENCY", "5"))  # IndieHackers 产品页并发数
+IH_CACHE_TTL = float(os.getenv("IH_CACHE_TTL_HOURS", "72")) * 3600  # 产品详情缓存有效期
+COLLECT_DEADLINE = float(os.getenv("COLLECT_DEADLINE", "60"))  # 每个数据源的默认超时（秒）
+
+# 共享 HTTP 传输层：每个主机的限速（每秒请求数），可用 HTTP_RATE_LIMITS="host=rate,host=rate" 覆盖
+HTTP_RATE_LIMITS = {
+    "hacker-news.firebaseio.com": HN_RATE_LIMIT,
+    "www.producthunt.com": 1.0,
+    "api.producthunt.com": 1.0,
+    "36kr.com": 1.0,
+    "www.huxiu.com": 1.0,
+    "www.tmtpost.com": 1.0,
+    "www.indiehackers.com": 2.0,
+    "www.reddit.com": 0.5,
+    "github.com": 2.0,
+    "api.github.com": 1.0,
+}
+for _pair in filter(None, os.getenv("HTTP_RATE_LIMITS", "").split(",")):
+    _host, _, _rate = _pair.partition("=")
+    HTTP_RATE_LIMITS[_host.strip()] = float(_rate)
+HTTP_DEFAULT_RATE = float(os.getenv("HTTP_DEFAULT_RATE", "5"))  # 未配置主机的限速
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))  # 每个主机的 keep-alive 连接数
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))  # 429/503 重试次数
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "60"))  # Retry-After 最长等待（秒）
+
+# 跨数据源去重：SimHash 汉明距离阈值（<= 该值视为同一条；取值 0-63，大于 3 时索引分段随之增加，候选变多）
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
 
 # 本地配置
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 LOG_DIR = os.path.join(BASE_DIR, "logs")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+LLM_CACHE_DIR = os.path.join(CACHE_DIR, "llm")
+USAGE_DIR = os.path.join(DATA_DIR, "usage")
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+METRICS_DIR = os.path.join(DATA_DIR, "metrics")
+# Prometheus 文本文件路径（可指向 node_exporter textfile collector 目录）
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", os.path.join(METRICS_DIR, "research_agent.prom"))
 
 # 创建目录
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+# 本地存储（SQLite）
+STORE_PATH = os.path.join(DATA_DIR, "research.db")
+SEEN_TTL_DAYS = float(os.getenv("SEEN_TTL_DAYS", "30"))  # 已分析条目多少天后重新分析，0 表示永不
+
+# 本地预筛模型：用历史分析结果训练，跳过明显低分的条目（python -m processors.prefilter train 重新训练）
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+PREFILTER_MODEL_PATH = os.path.join(DATA_DIR, "prefilter.npz")
+PREFILTER_MAX_MISS = float(os.getenv("PREFILTER_MAX_MISS", "0.05"))  # 验证集上允许误杀的高分条目比例
+PREFILTER_MIN_SAMPLES = int(os.getenv("PREFILTER_MIN_SAMPLES", "200"))  # 训练所需的最少历史条目
+PREFILTER_BATCH_SIZE = int(os.getenv("PREFILTER_BATCH_SIZE", "32"))  # 流式预筛每批最多条目数
+PREFILTER_LINGER = float(os.getenv("PREFILTER_LINGER", "0.2"))  # 流式预筛凑批最多等待秒数
+
+# 原始响应归档：off | record（记录收集器收到的响应）| replay（从归档离线回放，不访问网络）
+ARCHIVE_MODE = os.getenv("ARCHIVE_MODE", "off").lower()
+ARCHIVE_REPLAY_AT = os.getenv("ARCHIVE_REPLAY_AT", "")  # 回放时间点 YYYY-MM-DD，空表示最新
 
 # 调试模式
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
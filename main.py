@@ -13,22 +13,27 @@
 
 import os
 import sys
-import json
 import asyncio
 import argparse
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from mvp_generator import MVPGenerator
-from config import DEBUG, DATA_DIR, LOG_DIR, BAILIAN_API_KEY, FEISHU_USER_ID, validate_config, GITHUB_TOKEN, GITHUB_REPO
-from collectors import HNCollector, PHCollector, ChineseMediaCollector, GitHubTrendingCollector
+from config import DEBUG, DATA_DIR, LOG_DIR, BAILIAN_API_KEY, FEISHU_USER_ID, validate_config, GITHUB_TOKEN, GITHUB_REPO, HN_INCREMENTAL, PREFILTER_ENABLED, STORE_PATH
+from collectors import HNCollector, PHCollector, ChineseMediaCollector, GitHubTrendingCollector, CollectorRunner
+from collectors.runner import format_report
 from collectors.indiehackers import IndieHackersCollector
 from collectors.reddit import RedditCollector
 from analyzers import BailianAnalyzer
+from analyzers.usage import format_usage
+from processors import Deduplicator, dedupe, Prefilter
+from storage import SeenStore, OpportunityStore, ResultWriter
 from models import Opportunity
+import metrics
+import transport
 
 
 def setup_logging():
@@ -52,39 +57,115 @@ def setup_logging():
 def collect_data(hn_limit: int = 10, ph_limit: int = 5, twitter_limit: int = 20, 
                  media_hours: int = 48, crunchbase_limit: int = 10) -> List[dict]:
     """收集数据"""
+    items, _ = asyncio.run(collect_data_async(
+        hn_limit=hn_limit, ph_limit=ph_limit, media_hours=media_hours
+    ))
+    return items
+
+
+def build_collector_runner(hn_limit: int = 10, ph_limit: int = 5, media_hours: int = 48,
+                           stream: bool = False) -> CollectorRunner:
+    """注册所有数据源；stream=True 时 HN 使用逐条产出的流式接口"""
+    runner = CollectorRunner()
+    # Hacker News
+    hn_fetch = HNCollector.iter_async if stream else HNCollector.fetch_async
+    # 记录 / 回放时不使用增量缓存：缓存命中的条目不经过传输层，既不会被记录，回放时也就找不到
+    incremental = HN_INCREMENTAL and transport.archive_mode() == 'off'
+    runner.register('hn', hn_fetch, limit=hn_limit, incremental=incremental)
+    # Product Hunt
+    runner.register('ph', PHCollector.fetch, limit=ph_limit)
+    # Chinese Media (36Kr, Huxiu, etc.)
+    runner.register('chinese_media', ChineseMediaCollector.fetch, hours=media_hours, limit=20)
+    # IndieHackers (solo founder stories)
+    runner.register('indiehackers', IndieHackersCollector().fetch, limit=15)
+    return runner
+
+
+async def collect_data_async(hn_limit: int = 10, ph_limit: int = 5,
+                             media_hours: int = 48) -> Tuple[List[dict], List[dict]]:
+    """并发收集所有数据源，返回 (条目, 数据源报告)"""
     import logging
     logger = logging.getLogger(__name__)
     
-    items = []
+    runner = build_collector_runner(hn_limit=hn_limit, ph_limit=ph_limit, media_hours=media_hours)
     
-    # Hacker News
-    logger.info(f"Fetching HN (limit={hn_limit})...")
-    hn_items = HNCollector.fetch(limit=hn_limit)
-    logger.info(f"Got {len(hn_items)} HN items")
-    items.extend(hn_items)
-    
-    # Product Hunt
-    logger.info(f"Fetching PH (limit={ph_limit})...")
-    ph_items = PHCollector.fetch(limit=ph_limit)
-    logger.info(f"Got {len(ph_items)} PH items")
-    items.extend(ph_items)
+    logger.info(f"Fetching {len(runner.sources)} sources concurrently (hn_limit={hn_limit}, ph_limit={ph_limit})...")
+    items, report = await runner.run_async()
+    logger.info(f"Collected {len(items)} items:\n{format_report(report)}")
     
+    return items, report
+
+
+async def run_pipeline_async(hn_limit: int = 10, ph_limit: int = 5, media_hours: int = 48,
+                             min_score: int = 60, reanalyze: bool = False,
+                             batch_size: Optional[int] = None, prefilter: bool = PREFILTER_ENABLED,
+                             save: bool = True) -> List[Opportunity]:
+    """
+    流式流水线：收集 → 去重 → 跳过已分析 → 本地预筛 → 分析 → 结果
     
-    # Chinese Media (36Kr, Huxiu, etc.)
-    logger.info(f"Fetching Chinese Media (hours={media_hours})...")
-    media_items = ChineseMediaCollector.fetch(hours=media_hours, limit=20)
-    logger.info(f"Got {len(media_items)} Chinese media items")
-    items.extend(media_items)
+    第一条条目到达即开始分析，收集与分析重叠进行；save=True 时每个机会产出即写入
+    本次运行的 JSONL 和机会存储（中途失败也保留已完成的结果）。返回按分数排序的机会列表。
+    """
+    import logging
+    logger = logging.getLogger(__name__)
     
+    if not BAILIAN_API_KEY:
+        logger.error("BAILIAN_API_KEY not configured")
+        return []
     
-    # IndieHackers (solo founder stories)
-    logger.info(f"Fetching IndieHackers (limit=15)...")
-    ih_collector = IndieHackersCollector()
-    ih_items = ih_collector.fetch(limit=15)
-    logger.info(f"Got {len(ih_items)} IndieHackers items")
-    items.extend(ih_items)
+    runner = build_collector_runner(hn_limit=hn_limit, ph_limit=ph_limit, media_hours=media_hours, stream=True)
+    analyzer = BailianAnalyzer() if batch_size is None else BailianAnalyzer(batch_size=batch_size)
+    deduplicator = Deduplicator()
+    seen_store = SeenStore()
+    prefilter_model = Prefilter.load() if prefilter else None
+    # 与 SeenStore 共用连接：两者写同一个 research.db，分开的连接会互相锁住
+    store = OpportunityStore(conn=seen_store.conn) if save else None
+    writer = ResultWriter(store=store) if save else None
+    
+    items = deduplicator.stream(runner.stream())
+    if not reanalyze:
+        items = seen_store.stream(items)
+    if prefilter_model:
+        items = prefilter_model.stream(items, min_score=min_score)
+    
+    logger.info(f"Streaming {len(runner.sources)} sources into analyzer (min_score={min_score})...")
+    opportunities = []
+    finished = False
+    try:
+        async for opp in analyzer.analyze_stream(items, min_score=min_score, on_result=seen_store.record):
+            logger.info(f"Opportunity [{opp.source}] {opp.score}: {opp.title[:60]}")
+            opportunities.append(opp)
+            if writer:
+                writer.write(opp)
+        finished = True
+    finally:
+        try:
+            if writer:
+                writer.close(finished=finished)
+                store.close()
+        finally:
+            seen_store.close()
+            usage = analyzer.usage.save()
+    
+    logger.info(f"Collection report:\n{format_report(runner.report)}")
+    if transport.archive_stats():
+        logger.info(f"Response archive ({transport.archive_mode()}): {transport.archive_stats()}")
+    logger.info(f"Skipped {deduplicator.duplicates} cross-source duplicates, "
+                f"{seen_store.skipped} already analyzed items")
+    if prefilter_model:
+        logger.info(f"Prefilter skipped {prefilter_model.dropped} likely low-score items")
+    if analyzer.cache:
+        logger.info(f"LLM cache: {analyzer.cache.summary()}")
+    logger.info(f"LLM concurrency: {analyzer.limiter.summary()}")
+    logger.info(f"LLM requests: {analyzer.policy.summary()}")
+    if analyzer.early_aborts:
+        logger.info(f"Early-aborted {analyzer.early_aborts} low-score analyses")
+    logger.info(f"LLM usage:\n{format_usage(usage)}")
+    logger.info(f"Found {len(opportunities)} opportunities")
+    if writer and writer.count:
+        logger.info(f"Saved {writer.count} results to {writer.path}")
     
-    return items
+    return sorted(opportunities, key=lambda x: x.score, reverse=True)
 
 
 def analyze_items(items: List[dict], min_score: int = 60) -> List[Opportunity]:
@@ -92,8 +173,9 @@ def analyze_items(items: List[dict], min_score: int = 60) -> List[Opportunity]:
     return asyncio.run(analyze_items_async(items, min_score=min_score))
 
 
-async def analyze_items_async(items: List[dict], min_score: int = 60) -> List[Opportunity]:
-    """异步分析项目"""
+async def analyze_items_async(items: List[dict], min_score: int = 60, reanalyze: bool = False,
+                              prefilter: bool = PREFILTER_ENABLED) -> List[Opportunity]:
+    """异步分析项目（跳过已分析过的条目，除非 reanalyze=True；有预筛模型时跳过明显低分的条目）"""
     import logging
     logger = logging.getLogger(__name__)
     
@@ -102,52 +184,59 @@ async def analyze_items_async(items: List[dict], min_score: int = 60) -> List[Op
         return []
     
     analyzer = BailianAnalyzer()
+    seen_store = SeenStore()
     
-    logger.info(f"Analyzing {len(items)} items (min_score={min_score})...")
-    opportunities = await analyzer.batch_analyze_async(items, min_score=min_score)
-    logger.info(f"Found {len(opportunities)} opportunities")
+    unique_items = dedupe(items)
+    logger.info(f"De-duplicated {len(items)} -> {len(unique_items)} items")
+    items = unique_items
+    
+    if not reanalyze:
+        items, skipped = seen_store.filter_new(items)
+        logger.info(f"Skipped {len(skipped)} already analyzed items")
+    
+    prefilter_model = Prefilter.load() if prefilter else None
+    if prefilter_model:
+        items, dropped = prefilter_model.split(items, min_score=min_score)
+        logger.info(f"Prefilter skipped {len(dropped)} likely low-score items")
+    
+    try:
+        logger.info(f"Analyzing {len(items)} items (min_score={min_score})...")
+        opportunities = await analyzer.batch_analyze_async(items, min_score=min_score, on_result=seen_store.record)
+        logger.info(f"Found {len(opportunities)} opportunities")
+    finally:
+        seen_store.close()
+        usage = analyzer.usage.save()
+    
+    if analyzer.cache:
+        logger.info(f"LLM cache: {analyzer.cache.summary()}")
+    logger.info(f"LLM concurrency: {analyzer.limiter.summary()}")
+    logger.info(f"LLM requests: {analyzer.policy.summary()}")
+    if analyzer.early_aborts:
+        logger.info(f"Early-aborted {analyzer.early_aborts} low-score analyses")
+    logger.info(f"LLM usage:\n{format_usage(usage)}")
     
     return opportunities
 
 
-def save_results(opportunities: List[Opportunity]):
-    """保存结果"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # 保存 JSON
-    json_file = os.path.join(DATA_DIR, f"opportunities_{timestamp}.json")
-    with open(json_file, 'w', encoding='utf-8') as f:
-        try:
-            json.dump([opp.to_dict() for opp in opportunities], f, ensure_ascii=False, indent=2)
-        except (TypeError, ValueError) as e:
-            print(f"JSON serialization error: {e}")
-            # 尝试简化数据
-            simple_data = []
-            for opp in opportunities:
-                try:
-                    simple_data.append({
-                        'id': opp.id,
-                        'title': opp.title,
-                        'score': opp.score
-                    })
-                except Exception:
-                    continue
-            json.dump(simple_data, f, ensure_ascii=False, indent=2)
-    
-    # 保存最新结果
-    latest_file = os.path.join(DATA_DIR, "latest.json")
+def save_results(opportunities: List[Opportunity], output_dir: str = DATA_DIR, store_path: str = STORE_PATH):
+    """保存结果：写入本次运行的 JSONL、切换 latest.jsonl，并写入机会存储（历史查询用）"""
+    store = OpportunityStore(store_path)
     try:
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            json.dump([opp.to_dict() for opp in opportunities], f, ensure_ascii=False, indent=2)
-    except (IOError, OSError) as e:
-        print(f"Error saving latest.json: {e}")
+        with ResultWriter(output_dir, store=store) as writer:
+            for opp in opportunities:
+                writer.write(opp)
+    finally:
+        store.close()
     
-    print(f"Saved to {json_file}")
+    if writer.count:
+        print(f"Saved {writer.count} results to {writer.path}")
+    else:
+        print("No results to save")
 
 
-def send_to_feishu(opportunities: List[Opportunity]):
+def send_to_feishu(opportunities: List[Opportunity], user_id: str = FEISHU_USER_ID):
     """发送到飞书（通过 OpenClaw CLI）"""
-    if not FEISHU_USER_ID:
+    if not user_id:
         print("FEISHU_USER_ID not configured, skipping Feishu notification")
         return
     
@@ -160,14 +249,16 @@ def send_to_feishu(opportunities: List[Opportunity]):
             cmd = [
                 "openclaw", "message", "send",
                 "--channel", "feishu",
-                "--target", f"user:{FEISHU_USER_ID}",
+                "--target", f"user:{user_id}",
                 "--message", msg,
                 "--silent"
             ]
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
             if result.returncode == 0:
+                metrics.inc('notifications_total', channel='feishu', status='sent')
                 print(f"✅ Sent to Feishu: {opp.title[:50]}...")
             else:
+                metrics.inc('notifications_total', channel='feishu', status='failed')
                 print(f"⚠️  Send failed: {result.stderr[:100]}")
         
         print(f"✅ Sent Top {min(10, len(opportunities))} opportunities to Feishu")
@@ -176,18 +267,17 @@ def send_to_feishu(opportunities: List[Opportunity]):
         print(f"Error sending to Feishu: {e}")
 
 
-def create_github_issues(opportunities: List[Opportunity]):
+def create_github_issues(opportunities: List[Opportunity], token: str = GITHUB_TOKEN,
+                         api_url: str = "https://api.github.com"):
     """自动创建 GitHub Issue"""
-    if not GITHUB_TOKEN:
+    if not token:
         print("⚠️  GITHUB_TOKEN not configured, skipping GitHub issues")
         print("   Configure: echo 'ghp_xxx' > ~/.github_token")
         return
     
-    import requests
-    
-    url = f"https://api.github.com/repos/{GITHUB_REPO}/issues"
+    url = f"{api_url}/repos/{GITHUB_REPO}/issues"
     headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
+        "Authorization": f"token {token}",
         "Accept": "application/vnd.github.v3+json"
     }
     
@@ -230,8 +320,10 @@ https://github.com/{GITHUB_REPO}/blob/main/opportunities/{opp.created_at.strftim
                 "labels": ["opportunity", "researching", "ai"]
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = transport.post(url, headers=headers, json=data, timeout=30, archive=False)
             
+            metrics.inc('notifications_total', channel='github',
+                        status='sent' if response.status_code == 201 else 'failed')
             if response.status_code == 201:
                 issue_url = response.json().get('html_url', '')
                 print(f"✅ Created Issue: {issue_url}")
@@ -247,11 +339,11 @@ https://github.com/{GITHUB_REPO}/blob/main/opportunities/{opp.created_at.strftim
 
 
 
-def generate_mvps(opportunities: List[Opportunity]):
+def generate_mvps(opportunities: List[Opportunity], output_dir: Optional[str] = None):
     """为 Top 机会生成 MVP"""
     print("\n🚀 Generating MVPs...")
     
-    generator = MVPGenerator()
+    generator = MVPGenerator(output_dir)
     generated = 0
     
     for opp in opportunities[:2]:  # 只为 Top 2 生成 MVP
@@ -333,6 +425,12 @@ def main():
     parser.add_argument('--hn-limit', type=int, default=30, help='HN 获取数量')
     parser.add_argument('--ph-limit', type=int, default=20, help='PH 获取数量')
     parser.add_argument('--min-score', type=int, default=60, help='最低分数')
+    parser.add_argument('--reanalyze', action='store_true', help='忽略已分析记录，重新分析所有条目')
+    parser.add_argument('--no-prefilter', action='store_true', help='不使用本地预筛模型，所有条目都交给大模型')
+    parser.add_argument('--batch-size', type=int, default=None, help='每次模型请求分析的条目数（默认 BAILIAN_BATCH_SIZE）')
+    parser.add_argument('--record', action='store_true', help='记录收集器收到的原始响应到 data/archive')
+    parser.add_argument('--replay', nargs='?', const='latest', metavar='DATE',
+                        help='从归档离线回放（不访问数据源），可指定日期 YYYY-MM-DD，默认最新')
     parser.add_argument('--indie-mode', action='store_true', help='一人公司模式：专注 Indie Hacker/微 SaaS/自动化机会')
     
     args = parser.parse_args()
@@ -356,6 +454,13 @@ def main():
         print("2. 填写你的阿里百炼 API Key")
         sys.exit(1)
     
+    # 响应归档
+    if args.replay:
+        transport.use_archive('replay', args.replay)
+        logger.info(f"Replaying archived responses ({args.replay}); use --reanalyze to re-score already analyzed items")
+    elif args.record:
+        transport.use_archive('record')
+    
     # 测试模式
     if args.test:
         logger.info("Test mode: fetching sample data...")
@@ -366,17 +471,34 @@ def main():
         return
     
     # 正常运行
-    items = collect_data(hn_limit=args.hn_limit, ph_limit=args.ph_limit)
-    opportunities = asyncio.run(analyze_items_async(items, min_score=args.min_score))
-    
-    if opportunities:
-        save_results(opportunities)
-        print_results(opportunities)
-        send_to_feishu(opportunities)
-        create_github_issues(opportunities)
-        generate_mvps(opportunities)
-    else:
-        print("未发现符合条件的机会")
+    try:
+        with metrics.span('pipeline') as span:
+            opportunities = asyncio.run(run_pipeline_async(
+                hn_limit=args.hn_limit, ph_limit=args.ph_limit, min_score=args.min_score,
+                reanalyze=args.reanalyze, batch_size=args.batch_size,
+                prefilter=PREFILTER_ENABLED and not args.no_prefilter
+            ))
+            span['opportunities'] = len(opportunities)
+        
+        if opportunities:
+            # 结果已在流水线中逐条写入（JSONL + 机会存储）
+            with metrics.span('print_results'):
+                print_results(opportunities)
+            if transport.archive_mode() == 'replay':
+                print("Replay run: skipping Feishu notification and GitHub issues")
+            else:
+                with metrics.span('send_to_feishu'):
+                    send_to_feishu(opportunities)
+                with metrics.span('create_github_issues'):
+                    create_github_issues(opportunities)
+            with metrics.span('generate_mvps'):
+                generate_mvps(opportunities)
+        else:
+            print("未发现符合条件的机会")
+    finally:
+        paths = metrics.save()
+        logger.info(f"Stage timings:\n{metrics.format_stages(metrics.report())}")
+        logger.info(f"Metrics written to {paths['prometheus']} and {paths['report']}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+运行指标与追踪 - 收集器、分析器、存储和通知共用
+
+- 计数器（采集条目、分析结果、重试、429、缓存命中、通知……）和延迟直方图（HTTP / 模型请求）
+- span：各阶段的耗时（可嵌套，异步任务中同样适用）
+- save() 导出 Prometheus 文本文件（node_exporter textfile collector 可直接采集）和 JSON 运行报告
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import METRICS_DIR, METRICS_TEXTFILE
+
+PREFIX = 'research_agent'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_SPANS = 10000  # JSON 报告中保留的 span 上限
+
+# 已知指标的说明（Prometheus HELP）
+DESCRIPTIONS = {
+    'items_collected_total': '收集到的条目数',
+    'collector_runs_total': '数据源运行次数（按结果）',
+    'http_request_seconds': 'HTTP 请求耗时（共享传输层）',
+    'http_responses_total': 'HTTP 响应数（按状态码）',
+    'http_throttled_total': '限流响应（429/503）',
+    'llm_request_seconds': '模型请求耗时（单次尝试，不含排队）',
+    'llm_responses_total': '模型接口响应数（按状态码）',
+    'llm_retries_total': '模型请求重试次数',
+    'llm_gave_up_total': '重试耗尽后放弃的模型请求',
+    'llm_calls_total': '模型调用数（按结果，含缓存命中）',
+    'llm_tokens_total': '模型 token 用量',
+    'analyses_total': '条目分析结果',
+    'seen_skipped_total': '已分析过而跳过的条目',
+    'store_writes_total': '写入本地存储的记录数',
+    'archive_records_total': '写入响应归档的响应数',
+    'notifications_total': '发送的通知（按渠道和结果）',
+    'span_duration_seconds': '本次运行各阶段耗时（同名 span 累加）',
+    'span_count': '本次运行各阶段的 span 数',
+    'last_run_timestamp_seconds': '最近一次运行结束时间',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+class Histogram:
+    """固定桶直方图（累积计数按 Prometheus 约定在导出时计算）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((f"{bound:g}", total))
+        result.append(('+Inf', self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶上界估计分位数"""
+        if not self.count:
+            return None
+        target, total = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= target:
+                return bound
+        return float('inf')
+
+
+class Metrics:
+    """线程安全的计数器 / 仪表 / 直方图 / span 记录"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+        self._clock = time.perf_counter()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.spans: List[Dict[str, Any]] = []
+        self._span_totals: Dict[str, List[float]] = {}
+        self._span_ids = 0
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """计数器加 value"""
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def gauge(self, name: str, value: float, **labels):
+        """设置仪表值"""
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """直方图记录一个观测值（秒）"""
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """
+        记录一个阶段的耗时；产出的 dict 可在阶段内补充属性（如 count、status）
+
+        异常时 status 为 error 并继续抛出。
+        """
+        with self._lock:
+            self._span_ids += 1
+            span_id = self._span_ids
+        parent = _current_span.get()
+        token = _current_span.set(span_id)
+        span = dict(attrs)
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield span
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            _current_span.reset(token)
+            duration = time.perf_counter() - start
+            span.setdefault('status', status)
+            with self._lock:
+                if len(self.spans) < MAX_SPANS:
+                    self.spans.append({
+                        'id': span_id,
+                        'parent': parent,
+                        'name': name,
+                        'start': round(start - self._clock, 4),
+                        'duration': round(duration, 4),
+                        'attrs': span,
+                    })
+                totals = self._span_totals.setdefault(name, [0.0, 0])
+                totals[0] += duration
+                totals[1] += 1
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（exposition format 0.0.4）"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str):
+            full = f"{PREFIX}_{name}"
+            if name in DESCRIPTIONS:
+                lines.append(f"# HELP {full} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                full = header(name, 'counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}{_format_labels(labels)} {value}")
+            gauges = {name: dict(series) for name, series in self.gauges.items()}
+            for name, (total, count) in self._span_totals.items():
+                gauges.setdefault('span_duration_seconds', {})[(('span', name),)] = round(total, 4)
+                gauges.setdefault('span_count', {})[(('span', name),)] = count
+            gauges['last_run_timestamp_seconds'] = {(): round(time.time(), 3)}
+            for name, series in sorted(gauges.items()):
+                full = header(name, 'gauge')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}{_format_labels(labels)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                full = header(name, 'histogram')
+                for labels, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{full}_bucket{_format_labels(labels, ('le', bound))} {count}")
+                    lines.append(f"{full}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{full}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> Dict[str, Any]:
+        """JSON 运行报告"""
+        def series(values: Dict[Labels, Any]) -> List[Dict[str, Any]]:
+            return [{'labels': dict(labels), 'value': value} for labels, value in sorted(values.items())]
+
+        with self._lock:
+            histograms = {
+                name: [
+                    {
+                        'labels': dict(labels),
+                        'count': histogram.count,
+                        'sum': round(histogram.sum, 4),
+                        'p50': histogram.quantile(0.5),
+                        'p95': histogram.quantile(0.95),
+                        'p99': histogram.quantile(0.99),
+                        'buckets': dict(histogram.cumulative()),
+                    }
+                    for labels, histogram in sorted(values.items())
+                ]
+                for name, values in self.histograms.items()
+            }
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'duration': round(time.perf_counter() - self._clock, 3),
+                'stages': {
+                    name: {'duration': round(total, 4), 'count': count}
+                    for name, (total, count) in self._span_totals.items()
+                },
+                'counters': {name: series(values) for name, values in sorted(self.counters.items())},
+                'gauges': {name: series(values) for name, values in sorted(self.gauges.items())},
+                'histograms': histograms,
+                'spans': list(self.spans),
+            }
+
+    def save(self, path: str = METRICS_DIR, textfile: str = METRICS_TEXTFILE) -> Dict[str, str]:
+        """
+        导出指标：Prometheus 文本文件（原子替换）和 runs/ 下的 JSON 运行报告
+
+        Returns:
+            {'prometheus': 文本文件路径, 'report': 报告路径}
+        """
+        os.makedirs(os.path.join(path, 'runs'), exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(textfile)), exist_ok=True)
+
+        tmp_path = f"{textfile}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, textfile)
+
+        report_path = os.path.join(path, 'runs', f"run_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return {'prometheus': textfile, 'report': report_path}
+
+
+def format_stages(report: Dict[str, Any]) -> str:
+    """各阶段耗时的可读文本（运行日志用）"""
+    return "\n".join(
+        f"{name:<22} {stage['duration']:>8.2f}s  x{stage['count']}"
+        for name, stage in report['stages'].items()
+    )
+
+
+# 进程内共享的默认实例
+_default = Metrics()
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    _default.inc(name, value, **labels)
+
+
+def gauge(name: str, value: float, **labels):
+    _default.gauge(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    _default.observe(name, value, **labels)
+
+
+def span(name: str, **attrs):
+    return _default.span(name, **attrs)
+
+
+def report() -> Dict[str, Any]:
+    return _default.report()
+
+
+def save(path: str = METRICS_DIR, textfile: str = METRICS_TEXTFILE) -> Dict[str, str]:
+    return _default.save(path, textfile)
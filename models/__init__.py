@@ -1,3 +1,9 @@
 from .opportunity import Opportunity
+from .categories import (
+    StartupCost, TimeToRevenue, RevenueModel, MonthlyPotential, AutomationRate, CustomerAcquisition,
+)
 
-__all__ = ["Opportunity"]
+__all__ = [
+    "Opportunity",
+    "StartupCost", "TimeToRevenue", "RevenueModel", "MonthlyPotential", "AutomationRate", "CustomerAcquisition",
+]
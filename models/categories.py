@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+评分标准中的分类字段（启动成本、见钱时间、收入模式……）的整数编码
+
+模型按 OUTPUT_SCHEMA 给出的取值编码为小整数，按类别过滤只需比较整数；
+不在取值表里的自由文本（以及列表等非字符串值）编码为 OTHER，原值由 Opportunity 另行保留。
+"""
+
+from enum import IntEnum
+from typing import Dict
+
+# 所有分类字段共用的编码：0 为未填写，OTHER 为取值表外的自由文本
+UNKNOWN = 0
+OTHER = 99
+
+
+class StartupCost(IntEnum):
+    UNKNOWN = 0
+    UNDER_1K = 1
+    FROM_1K_TO_5K = 2
+    FROM_5K_TO_20K = 3
+    OVER_20K = 4
+    OTHER = 99
+
+
+class TimeToRevenue(IntEnum):
+    UNKNOWN = 0
+    UNDER_7_DAYS = 1
+    DAYS_30 = 2
+    DAYS_90 = 3
+    OVER_90_DAYS = 4
+    OTHER = 99
+
+
+class RevenueModel(IntEnum):
+    UNKNOWN = 0
+    SUBSCRIPTION = 1
+    ONE_TIME = 2
+    AFFILIATE = 3
+    ADS = 4
+    API = 5
+    OTHER = 99
+
+
+class MonthlyPotential(IntEnum):
+    UNKNOWN = 0
+    FROM_1K_TO_10K = 1
+    FROM_10K_TO_50K = 2
+    OVER_50K = 3
+    OTHER = 99
+
+
+class AutomationRate(IntEnum):
+    UNKNOWN = 0
+    PERCENT_50 = 1
+    PERCENT_70 = 2
+    PERCENT_90_PLUS = 3
+    OTHER = 99
+
+
+class CustomerAcquisition(IntEnum):
+    UNKNOWN = 0
+    SEO = 1
+    SOCIAL_MEDIA = 2
+    PAID_ADS = 3
+    AFFILIATE = 4
+    PRODUCT_HUNT = 5
+    OTHER = 99
+
+
+def _normalize(text: str) -> str:
+    return ''.join(text.split()).lower()
+
+
+class Vocabulary:
+    """一个分类字段的取值表：标准写法 → 编码（匹配时忽略空白和大小写）"""
+
+    def __init__(self, codes: type, labels: Dict[IntEnum, str]):
+        self.codes = codes
+        self.labels = {int(code): label for code, label in labels.items()}
+        self.labels[UNKNOWN] = ''
+        self._exact = {label: int(code) for code, label in labels.items()}
+        self._lookup = {_normalize(label): int(code) for code, label in labels.items()}
+
+    def encode(self, text) -> int:
+        """
+        文本 → 编码；空字符串为 UNKNOWN，无法识别的文本为 OTHER（原文由调用方保留）
+
+        模型有时给出列表或数字，这些非字符串值一律为 OTHER，由调用方原样保留。
+        """
+        if not isinstance(text, str):
+            return OTHER
+        if not text:
+            return UNKNOWN
+        code = self._exact.get(text)
+        if code is None:
+            code = self._lookup.get(_normalize(text))
+        return code if code is not None else OTHER
+
+    def decode(self, code: int) -> str:
+        return self.labels[code]
+
+
+STARTUP_COST = Vocabulary(StartupCost, {
+    StartupCost.UNDER_1K: '<$1k',
+    StartupCost.FROM_1K_TO_5K: '$1-5k',
+    StartupCost.FROM_5K_TO_20K: '$5-20k',
+    StartupCost.OVER_20K: '>$20k',
+})
+
+TIME_TO_REVENUE = Vocabulary(TimeToRevenue, {
+    TimeToRevenue.UNDER_7_DAYS: '<7 天',
+    TimeToRevenue.DAYS_30: '30 天',
+    TimeToRevenue.DAYS_90: '90 天',
+    TimeToRevenue.OVER_90_DAYS: '>90 天',
+})
+
+REVENUE_MODEL = Vocabulary(RevenueModel, {
+    RevenueModel.SUBSCRIPTION: '订阅',
+    RevenueModel.ONE_TIME: '一次性',
+    RevenueModel.AFFILIATE: '联盟',
+    RevenueModel.ADS: '广告',
+    RevenueModel.API: 'API 收费',
+})
+
+MONTHLY_POTENTIAL = Vocabulary(MonthlyPotential, {
+    MonthlyPotential.FROM_1K_TO_10K: '$1-10k',
+    MonthlyPotential.FROM_10K_TO_50K: '$10-50k',
+    MonthlyPotential.OVER_50K: '$50k+',
+})
+
+AUTOMATION_RATE = Vocabulary(AutomationRate, {
+    AutomationRate.PERCENT_50: '50%',
+    AutomationRate.PERCENT_70: '70%',
+    AutomationRate.PERCENT_90_PLUS: '90%+',
+})
+
+CUSTOMER_ACQUISITION = Vocabulary(CustomerAcquisition, {
+    CustomerAcquisition.SEO: 'SEO',
+    CustomerAcquisition.SOCIAL_MEDIA: '社交媒体',
+    CustomerAcquisition.PAID_ADS: '付费广告',
+    CustomerAcquisition.AFFILIATE: '联盟',
+    CustomerAcquisition.PRODUCT_HUNT: 'Product Hunt',
+})
+
+# Opportunity 上的分类字段 → 取值表
+CATEGORICAL_FIELDS = {
+    'startup_cost': STARTUP_COST,
+    'time_to_revenue': TIME_TO_REVENUE,
+    'revenue_model': REVENUE_MODEL,
+    'monthly_potential': MONTHLY_POTENTIAL,
+    'automation_rate': AUTOMATION_RATE,
+    'customer_acquisition': CUSTOMER_ACQUISITION,
+}
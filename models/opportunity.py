@@ -1,14 +1,34 @@
 #!/usr/bin/env python3
 """机会数据模型 - 一人公司视角"""
 
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass, field, InitVar
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
+from .categories import (
+    CATEGORICAL_FIELDS, OTHER, STARTUP_COST, TIME_TO_REVENUE, REVENUE_MODEL, MONTHLY_POTENTIAL, AUTOMATION_RATE, CUSTOMER_ACQUISITION,
+)
 
-@dataclass
+_intern = sys.intern
+
+
+def _keep(value):
+    """取值表外的原值：字符串驻留，其他类型（列表、数字等）原样保留"""
+    return _intern(value) if value.__class__ is str else value
+
+
+@dataclass(slots=True)
 class Opportunity:
-    """产品机会（一人公司 + Agent 军团视角）"""
+    """
+    产品机会（一人公司 + Agent 军团视角）
+
+    分类字段（startup_cost 等）按评分标准的取值存为整数编码 <字段>_code，
+    按类别过滤时直接比较整数；字段本身读写仍是字符串，取值表外的原值另存。
+
+    分类字段是 InitVar + 属性，dataclasses.fields() / asdict() 看到的是 <字段>_code
+    和 _other_text 而不是分类字段本身；序列化请用 to_dict()。slots=True 需要 Python 3.10+。
+    """
     
     id: str
     title: str
@@ -21,12 +41,12 @@ class Opportunity:
     # 一人公司专属字段
     solo_feasibility: str = ""
     agent_roles: List[str] = field(default_factory=list)
-    startup_cost: str = ""
-    time_to_revenue: str = ""
-    revenue_model: str = ""
-    monthly_potential: str = ""
-    automation_rate: str = ""
-    customer_acquisition: str = ""
+    startup_cost: InitVar[str] = ""
+    time_to_revenue: InitVar[str] = ""
+    revenue_model: InitVar[str] = ""
+    monthly_potential: InitVar[str] = ""
+    automation_rate: InitVar[str] = ""
+    customer_acquisition: InitVar[str] = ""
     risks: str = ""
     action_plan: str = ""
     
@@ -35,8 +55,75 @@ class Opportunity:
     source_url: str = ""
     research_links: List[str] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
+
+    # 分类字段的编码（models.categories 中的 IntEnum）
+    startup_cost_code: int = field(init=False, repr=False)
+    time_to_revenue_code: int = field(init=False, repr=False)
+    revenue_model_code: int = field(init=False, repr=False)
+    monthly_potential_code: int = field(init=False, repr=False)
+    automation_rate_code: int = field(init=False, repr=False)
+    customer_acquisition_code: int = field(init=False, repr=False)
+    # 编码为 OTHER 的字段 → 原值；大多数机会没有，为 None
+    _other_text: Optional[Dict[str, str]] = field(init=False, repr=False, default=None)
+
+    def __post_init__(self, startup_cost, time_to_revenue, revenue_model, monthly_potential, automation_rate, customer_acquisition):
+        codes = (
+            STARTUP_COST.encode(startup_cost),
+            TIME_TO_REVENUE.encode(time_to_revenue),
+            REVENUE_MODEL.encode(revenue_model),
+            MONTHLY_POTENTIAL.encode(monthly_potential),
+            AUTOMATION_RATE.encode(automation_rate),
+            CUSTOMER_ACQUISITION.encode(customer_acquisition),
+        )
+        (self.startup_cost_code, self.time_to_revenue_code, self.revenue_model_code,
+         self.monthly_potential_code, self.automation_rate_code, self.customer_acquisition_code) = codes
+        if OTHER in codes:
+            values = (startup_cost, time_to_revenue, revenue_model, monthly_potential, automation_rate, customer_acquisition)
+            self._other_text = {
+                name: _keep(value)
+                for (name, _), code, value in zip(_CATEGORIES, codes, values) if code == OTHER
+            }
+        # 来源、标签、角色在历史结果中大量重复，驻留后共用同一个字符串对象
+        if self.source.__class__ is str:
+            self.source = _intern(self.source)
+        if self.tags:
+            self.tags = [_intern(tag) if tag.__class__ is str else tag for tag in self.tags]
+        if self.agent_roles:
+            self.agent_roles = [_intern(role) if role.__class__ is str else role for role in self.agent_roles]
+
+    def _text(self, name: str, vocabulary) -> str:
+        code = getattr(self, f"{name}_code")
+        if code == OTHER:
+            return self._other_text[name]
+        return vocabulary.decode(code)
+
+    def _set_text(self, name: str, vocabulary, value):
+        code = vocabulary.encode(value)
+        setattr(self, f"{name}_code", code)
+        other = self._other_text
+        if code == OTHER:
+            if other is None:
+                other = self._other_text = {}
+            other[name] = _keep(value)
+        elif other is not None and name in other:
+            del other[name]
+            if not other:
+                self._other_text = None
     
     def to_dict(self) -> dict:
+        other = self._other_text
+        if other is None:
+            # 常见情况：全部在取值表内，直接查表
+            categories = {
+                "startup_cost": STARTUP_COST.labels[self.startup_cost_code],
+                "time_to_revenue": TIME_TO_REVENUE.labels[self.time_to_revenue_code],
+                "revenue_model": REVENUE_MODEL.labels[self.revenue_model_code],
+                "monthly_potential": MONTHLY_POTENTIAL.labels[self.monthly_potential_code],
+                "automation_rate": AUTOMATION_RATE.labels[self.automation_rate_code],
+                "customer_acquisition": CUSTOMER_ACQUISITION.labels[self.customer_acquisition_code],
+            }
+        else:
+            categories = {name: self._text(name, vocabulary) for name, vocabulary in _CATEGORIES}
         return {
             "id": self.id,
             "title": self.title,
@@ -47,12 +134,7 @@ class Opportunity:
             "description": self.description,
             "solo_feasibility": self.solo_feasibility,
             "agent_roles": self.agent_roles,
-            "startup_cost": self.startup_cost,
-            "time_to_revenue": self.time_to_revenue,
-            "revenue_model": self.revenue_model,
-            "monthly_potential": self.monthly_potential,
-            "automation_rate": self.automation_rate,
-            "customer_acquisition": self.customer_acquisition,
+            **categories,
             "risks": self.risks,
             "action_plan": self.action_plan,
             "tags": self.tags,
@@ -61,6 +143,42 @@ class Opportunity:
             "created_at": self.created_at.isoformat()
         }
     
+    @classmethod
+    def from_dict(cls, data: dict) -> "Opportunity":
+        """
+        由 to_dict() 的结果还原（created_at 为 ISO 字符串），未知键忽略
+
+        缺少 id / title / source / url 时与构造函数一样抛出 TypeError。
+        """
+        get = data.get
+        missing = [key for key in ("id", "title", "source", "url") if key not in data]
+        if missing:
+            raise TypeError(f"Opportunity.from_dict() missing required fields: {', '.join(missing)}")
+        created_at = get("created_at")
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            source=data["source"],
+            url=data["url"],
+            score=get("score", 0),
+            summary=get("summary", ""),
+            description=get("description", ""),
+            solo_feasibility=get("solo_feasibility", ""),
+            agent_roles=get("agent_roles") or [],
+            startup_cost=get("startup_cost", ""),
+            time_to_revenue=get("time_to_revenue", ""),
+            revenue_model=get("revenue_model", ""),
+            monthly_potential=get("monthly_potential", ""),
+            automation_rate=get("automation_rate", ""),
+            customer_acquisition=get("customer_acquisition", ""),
+            risks=get("risks", ""),
+            action_plan=get("action_plan", ""),
+            tags=get("tags") or [],
+            source_url=get("source_url", ""),
+            research_links=get("research_links") or [],
+            created_at=datetime.fromisoformat(created_at) if created_at else datetime.now()
+        )
+    
     def to_message(self) -> str:
         """生成飞书消息（一人公司格式）"""
         emoji = {
@@ -105,3 +223,25 @@ class Opportunity:
 ---
 生成时间：{self.created_at.strftime("%Y-%m-%d %H:%M")}
 """.strip()
+
+
+
+
+_CATEGORIES = tuple(CATEGORICAL_FIELDS.items())
+
+
+def _category_property(name: str, vocabulary) -> property:
+    """分类字段的字符串视图：读时解码，写时重新编码"""
+    def get_text(self) -> str:
+        return self._text(name, vocabulary)
+
+    def set_text(self, value: str):
+        self._set_text(name, vocabulary, value)
+
+    return property(get_text, set_text)
+
+
+# InitVar 的默认值留在类上，替换为字符串属性
+for _name, _vocabulary in _CATEGORIES:
+    setattr(Opportunity, _name, _category_property(_name, _vocabulary))
+del _name, _vocabulary
@@ -237,7 +237,7 @@ console.log('✅ All tests passed');
         """提交到 Git"""
         try:
             # 检查是否在 Git 仓库中
-            one_company_dir = os.path.expanduser("~/Code/one-company-lab")
+            one_company_dir = os.path.dirname(self.output_dir)  # 默认 ~/Code/one-company-lab
             
             if not os.path.exists(os.path.join(one_company_dir, '.git')):
                 print(f"   ⚠️  one-company-lab is not a git repo, skipping commit")
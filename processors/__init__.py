@@ -0,0 +1,11 @@
+"""Processors package"""
+
+from .dedup import Deduplicator, dedupe, canonicalize_url
+from .prefilter import Prefilter
+
+__all__ = [
+    'Deduplicator',
+    'dedupe',
+    'canonicalize_url',
+    'Prefilter'
+]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""跨数据源去重 - URL 规范化 + SimHash 近似重复检测"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterable, AsyncIterator
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+from config import DEDUP_MAX_DISTANCE
+
+# 追踪参数（精确匹配或前缀匹配）
+TRACKING_PARAMS = {
+    'ref_src', 'ref_url', 'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', 'spm', 'share_token', '_hsenc', '_hsmi', 'mkt_tok',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hmsr', 'hmpl', 'hmcu', 'hmkw', 'hmci')
+
+# ref 在不少站点有实际含义（如 git 分支），只在已知用它追踪的站点、或取值为已知来源站时去掉
+REF_TRACKING_HOSTS = {'producthunt.com', 'indiehackers.com', 'amazon.com', 'medium.com', 'dev.to'}
+REF_SOURCES = {'producthunt', 'hackernews', 'hn', 'indiehackers', 'reddit', 'betalist', 'theresanaiforthat'}
+
+# 通过查询参数跳转的重定向器：主机 -> 目标参数名
+# （REDIRECTOR_PATHS 中的主机只在该路径上跳转，如 google.com/search?q= 是真实搜索而不是跳转）
+REDIRECTORS = {
+    'google.com': 'q',
+    'l.facebook.com': 'u',
+    'lm.facebook.com': 'u',
+    'out.reddit.com': 'url',
+    'link.zhihu.com': 'target',
+    'link.juejin.cn': 'target',
+    'weibo.cn': 'u',
+    'href.li': '',
+}
+REDIRECTOR_PATHS = {'google.com': '/url'}
+
+_LATIN_TOKEN = re.compile(r'[a-z0-9]+(?:[.+#-][a-z0-9]+)*')
+_CJK_RUN = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf]+')
+_STOPWORDS = {'the', 'a', 'an', 'of', 'for', 'to', 'and', 'in', 'on', 'with', 'is', 'show', 'hn', 'ask'}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化 URL：解开已知重定向器、统一 scheme/主机、去掉追踪参数和片段、排序查询参数
+
+    Args:
+        url: 原始 URL
+
+    Returns:
+        规范化后的 URL（无法解析时原样返回）
+    """
+    if not url:
+        return ''
+    try:
+        for _ in range(3):  # 嵌套重定向最多解三层
+            parts = urlsplit(url.strip())
+            host = (parts.hostname or '').lower()
+            bare = host[4:] if host.startswith('www.') else host
+            if bare not in REDIRECTORS or REDIRECTOR_PATHS.get(bare, parts.path) != parts.path:
+                break
+            key = REDIRECTORS[bare]
+            if not key:
+                target = unquote(parts.query or parts.path.lstrip('/'))
+            else:
+                target = dict(parse_qsl(parts.query)).get(key, '')
+            if not target.startswith(('http://', 'https://')):
+                break
+            url = target
+
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or '').lower()
+        for prefix in ('www.', 'm.', 'mobile.'):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+                break
+        if parts.port and parts.port not in (80, 443):
+            host = f"{host}:{parts.port}"
+
+        ref_tracking = host in REF_TRACKING_HOSTS
+        query = sorted(
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking(key.lower(), value, ref_tracking)
+        )
+        path = re.sub(r'/{2,}', '/', parts.path).rstrip('/') or '/'
+        return urlunsplit(('https', host, path, urlencode(query), ''))
+    except ValueError:
+        return url
+
+
+def _is_tracking(key: str, value: str, ref_tracking: bool) -> bool:
+    if key == 'ref':
+        return ref_tracking or value.lower() in REF_SOURCES
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def _tokens(text: str) -> List[str]:
+    """分词：拉丁文按单词，中文按相邻字 bigram"""
+    text = text.lower()
+    tokens = [token for token in _LATIN_TOKEN.findall(text) if token not in _STOPWORDS]
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(title: str, description: str = '') -> int:
+    """64 位 SimHash（标题权重 3，描述前 300 字权重 1）"""
+    weights: Counter = Counter()
+    for token in _tokens(title):
+        weights[token] += 3
+    for token in _tokens(description[:300]):
+        weights[token] += 1
+    if not weights:
+        return 0
+
+    vector = [0] * 64
+    for token, weight in weights.items():
+        value = _token_hash(token)
+        for bit in range(64):
+            vector[bit] += weight if value >> bit & 1 else -weight
+
+    result = 0
+    for bit in range(64):
+        if vector[bit] > 0:
+            result |= 1 << bit
+    return result
+
+
+class Deduplicator:
+    """
+    增量去重器：先按规范化 URL 精确匹配，再按 SimHash 汉明距离近似匹配
+
+    SimHash 分段建索引，避免两两比较：分成 max_distance + 1 段（至少 BANDS 段）时，
+    距离不超过 max_distance 的两个指纹至少有一段完全相同（抽屉原理）。默认距离 3 为 4 段 16 位。
+    """
+
+    BANDS = 4
+
+    def __init__(self, max_distance: int = DEDUP_MAX_DISTANCE):
+        if not 0 <= max_distance < 64:
+            raise ValueError(f"max_distance must be in [0, 63], got {max_distance}")
+        self.max_distance = max_distance
+        count = max(self.BANDS, max_distance + 1)
+        bounds = [64 * i // count for i in range(count + 1)]
+        self._slices = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self.by_url: Dict[str, Dict[str, Any]] = {}
+        self.bands: List[Dict[int, List[Tuple[int, Dict[str, Any]]]]] = [{} for _ in self._slices]
+        self.duplicates = 0
+
+    def add(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        加入一个条目
+
+        Returns:
+            新条目返回该条目（已补充 canonical_url / sources）；重复条目合并进已有条目并返回 None
+        """
+        canonical = canonicalize_url(item.get('url', ''))
+        item['canonical_url'] = canonical
+        item.setdefault('sources', [self._signal(item)])
+
+        existing = self.by_url.get(canonical) if canonical else None
+        fingerprint = simhash(item.get('title', ''), item.get('description', ''))
+        if existing is None and fingerprint:
+            existing = self._find_similar(fingerprint)
+
+        if existing is not None:
+            self._merge(existing, item)
+            self.duplicates += 1
+            return None
+
+        if canonical:
+            self.by_url[canonical] = item
+        if fingerprint:
+            for band, index in zip(self._bands(fingerprint), self.bands):
+                index.setdefault(band, []).append((fingerprint, item))
+        return item
+
+    def _bands(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> shift) & mask for shift, mask in self._slices]
+
+    def _find_similar(self, fingerprint: int) -> Optional[Dict[str, Any]]:
+        for band, index in zip(self._bands(fingerprint), self.bands):
+            for other_fingerprint, other in index.get(band, []):
+                if bin(fingerprint ^ other_fingerprint).count('1') <= self.max_distance:
+                    return other
+        return None
+
+    @staticmethod
+    def _signal(item: Dict[str, Any]) -> Dict[str, Any]:
+        """一个数据源对条目的信号"""
+        return {
+            'source': item.get('source', 'unknown'),
+            'id': item.get('id', ''),
+            'url': item.get('url', ''),
+            'score': item.get('score', 0),
+        }
+
+    @staticmethod
+    def _merge(target: Dict[str, Any], duplicate: Dict[str, Any]):
+        """把重复条目的来源信号合并进保留的条目，描述取更长的一份"""
+        known = {(signal['source'], signal['id']) for signal in target['sources']}
+        for signal in duplicate.get('sources', []):
+            if (signal['source'], signal['id']) not in known:
+                target['sources'].append(signal)
+        if len(duplicate.get('description', '')) > len(target.get('description', '')):
+            target['description'] = duplicate['description']
+
+    async def stream(self, items: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """流式去重：只产出首次出现的条目"""
+        async for item in items:
+            if self.add(item) is not None:
+                yield item
+
+
+def dedupe(items: List[Dict[str, Any]], max_distance: int = DEDUP_MAX_DISTANCE) -> List[Dict[str, Any]]:
+    """批量去重，保持首次出现的顺序"""
+    deduplicator = Deduplicator(max_distance=max_distance)
+    return [item for item in items if deduplicator.add(item) is not None]
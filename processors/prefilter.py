@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+本地预筛模型 - 用历史分析结果训练，在调用大模型前跳过明显低分的条目
+
+特征哈希（标题/描述词、来源）+ 数值信号（热度、评论数、star 数、跨源次数），
+纯 NumPy 稀疏逻辑回归，预测"大模型评分 >= 阈值"的概率。
+
+重新训练：python -m processors.prefilter train
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import zlib
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterable, AsyncIterator
+
+import numpy as np
+
+from config import (
+    PREFILTER_MODEL_PATH, PREFILTER_MAX_MISS, PREFILTER_MIN_SAMPLES, PREFILTER_BATCH_SIZE, PREFILTER_LINGER, STORE_PATH
+)
+from processors.dedup import _tokens
+
+HASH_BITS = 18
+NUMERIC_FEATURES = ('score', 'descendants', 'stars', 'sources')
+
+
+def _hash(feature: str) -> Tuple[int, float]:
+    """特征哈希：低位作列号，最高位作符号（减少碰撞偏差）"""
+    value = zlib.crc32(feature.encode('utf-8'))
+    return value & ((1 << HASH_BITS) - 1), (1.0 if value >> 31 else -1.0)
+
+
+def _numeric(item: Dict[str, Any]) -> List[float]:
+    """数值信号（取 log1p），顺序同 NUMERIC_FEATURES"""
+    metadata = item.get('metadata') or {}
+    return [
+        float(np.log1p(max(0, item.get('score') or 0))),
+        float(np.log1p(max(0, item.get('descendants') or 0))),
+        float(np.log1p(max(0, metadata.get('stars') or 0))),
+        float(len(item.get('sources') or [])),
+    ]
+
+
+def _features(item: Dict[str, Any]) -> Dict[int, float]:
+    """文本和来源的哈希特征（文本部分 L2 归一化）"""
+    features: Dict[int, float] = {}
+    terms = [f"t:{token}" for token in _tokens(item.get('title', ''))]
+    terms += [f"d:{token}" for token in _tokens((item.get('description') or '')[:500])]
+    if terms:
+        norm = 1.0 / np.sqrt(len(terms))
+        for term in terms:
+            column, sign = _hash(term)
+            features[column] = features.get(column, 0.0) + sign * norm
+
+    sources = {item.get('source', 'unknown')} | {signal['source'] for signal in item.get('sources') or []}
+    for source in sources:
+        column, sign = _hash(f"src:{source}")
+        features[column] = features.get(column, 0.0) + sign
+    return features
+
+
+class Prefilter:
+    """
+    预筛器：预测概率低于 cutoff 的条目直接跳过
+
+    cutoff 在训练时按验证集标定：最多误杀 PREFILTER_MAX_MISS 比例的高分条目。
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: float,
+        threshold: int,
+        cutoff: float,
+        numeric_mean: np.ndarray,
+        numeric_std: np.ndarray,
+        metrics: Optional[Dict[str, Any]] = None
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.cutoff = cutoff
+        self.numeric_mean = numeric_mean
+        self.numeric_std = numeric_std
+        self.metrics = metrics or {}
+        self.dropped = 0
+        self._warned = False
+
+    @staticmethod
+    def _matrix(items: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """稀疏 COO 表示：(行号, 列号, 值)，以及未标准化的数值特征矩阵"""
+        rows, cols, vals = [], [], []
+        for row, item in enumerate(items):
+            for column, value in _features(item).items():
+                rows.append(row)
+                cols.append(column)
+                vals.append(value)
+        numeric = np.array([_numeric(item) for item in items], dtype=np.float64).reshape(len(items), len(NUMERIC_FEATURES))
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(vals, dtype=np.float64), numeric
+
+    @staticmethod
+    def _logits(matrix, weights: np.ndarray, bias: float, numeric: np.ndarray, n: int) -> np.ndarray:
+        rows, cols, vals, _ = matrix
+        hashed = np.bincount(rows, weights=vals * weights[cols], minlength=n)
+        return hashed + numeric @ weights[1 << HASH_BITS:] + bias
+
+    def predict_proba(self, items: List[Dict[str, Any]]) -> np.ndarray:
+        """一次向量化计算一批条目"评分 >= threshold"的概率"""
+        if not items:
+            return np.zeros(0)
+        matrix = self._matrix(items)
+        numeric = (matrix[3] - self.numeric_mean) / self.numeric_std
+        return _sigmoid(self._logits(matrix, self.weights, self.bias, numeric, len(items)))
+
+    def _active(self, min_score: int) -> bool:
+        """运行阈值低于训练阈值时预筛不安全，直接放行"""
+        if min_score >= self.threshold:
+            return True
+        if not self._warned:
+            print(f"Prefilter trained for min_score>={self.threshold}, disabled for min_score={min_score}")
+            self._warned = True
+        return False
+
+    def split(self, items: List[Dict[str, Any]], min_score: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        拆分条目
+
+        Returns:
+            (需要大模型分析的条目, 预筛跳过的条目)
+        """
+        if not items or not self._active(min_score):
+            return list(items), []
+        keep_mask = self.predict_proba(items) >= self.cutoff
+        kept = [item for item, keep in zip(items, keep_mask) if keep]
+        dropped = [item for item, keep in zip(items, keep_mask) if not keep]
+        self.dropped += len(dropped)
+        return kept, dropped
+
+    async def stream(
+        self,
+        items: AsyncIterable[Dict[str, Any]],
+        min_score: int,
+        batch_size: int = PREFILTER_BATCH_SIZE,
+        linger: float = PREFILTER_LINGER
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式预筛：攒够 batch_size 条或第一条到达后等待 linger 秒，整批一次向量化打分
+
+        上游由后台任务读入有界队列，凑批等待不会中断上游的异步生成器。上游出错时立即抛出
+        （已入队但未打分的条目丢弃）；结束或提前停止时等待后台任务退出并关闭上游。
+        """
+        if not self._active(min_score):
+            try:
+                async for item in items:
+                    yield item
+            finally:
+                await _aclose(items)
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size)
+        done = object()
+        error: List[BaseException] = []
+
+        async def pump():
+            try:
+                async for item in items:
+                    await queue.put(item)
+            except Exception as e:
+                error.append(e)
+            await queue.put(done)
+
+        task = asyncio.create_task(pump())
+        loop = asyncio.get_running_loop()
+        try:
+            finished = False
+            while not finished:
+                batch = [await queue.get()]
+                deadline = loop.time() + linger
+                while batch[-1] is not done and len(batch) < batch_size and not error:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                if error:
+                    raise error[0]
+                finished = batch[-1] is done
+                kept, _ = self.split([item for item in batch if item is not done], min_score)
+                for item in kept:
+                    yield item
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                # 只吞掉上面取消 pump 引起的 CancelledError；消费方自身被取消时继续传播
+                if asyncio.current_task().cancelling():
+                    raise
+            finally:
+                await _aclose(items)
+
+    @classmethod
+    def train(
+        cls,
+        rows: List[Tuple[Dict[str, Any], int]],
+        threshold: int = 60,
+        max_miss: float = PREFILTER_MAX_MISS,
+        epochs: int = 300,
+        learning_rate: float = 0.05,
+        l2: float = 1e-4
+    ) -> 'Prefilter':
+        """
+        训练并标定
+
+        约 1/5 条目（按 id 哈希固定划分）留作验证集，用于标定 cutoff 和计算指标。
+
+        Args:
+            rows: (条目, 大模型评分) 列表，通常来自 SeenStore.training_rows()
+            threshold: 高分阈值（与运行时 --min-score 对应）
+            max_miss: 验证集上允许误杀的高分条目比例
+        """
+        if len(rows) < 2:
+            raise ValueError(f"Not enough samples: {len(rows)}")
+        items = [item for item, _ in rows]
+        labels = np.array([score >= threshold for _, score in rows], dtype=np.float64)
+        if labels.min() == labels.max():
+            raise ValueError(f"Need samples both above and below {threshold}")
+
+        holdout = np.array([zlib.crc32(f"{item.get('source')}:{item.get('id')}".encode('utf-8')) % 5 == 0 for item in items])
+        if holdout.all() or not holdout.any() or labels[holdout].max() == 0:
+            holdout = np.arange(len(items)) % 5 == 0
+        if labels[holdout].max() == 0:
+            raise ValueError("No high-score samples in validation split")
+        train_idx, valid_idx = np.flatnonzero(~holdout), np.flatnonzero(holdout)
+
+        train_items = [items[i] for i in train_idx]
+        matrix = cls._matrix(train_items)
+        mean = matrix[3].mean(axis=0)
+        std = matrix[3].std(axis=0) + 1e-6
+        numeric = (matrix[3] - mean) / std
+        y = labels[train_idx]
+
+        # 类别加权：高分条目通常较少
+        positive = y.mean()
+        sample_weight = np.where(y == 1, 0.5 / max(positive, 1e-6), 0.5 / max(1 - positive, 1e-6)) / len(y)
+
+        n_features = (1 << HASH_BITS) + len(NUMERIC_FEATURES)
+        weights = np.zeros(n_features)
+        bias = 0.0
+        rows_, cols, vals, _ = matrix
+        # Adam
+        m, v = np.zeros(n_features), np.zeros(n_features)
+        m_b = v_b = 0.0
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            error = (_sigmoid(cls._logits(matrix, weights, bias, numeric, len(y))) - y) * sample_weight
+            grad = np.bincount(cols, weights=vals * error[rows_], minlength=n_features)
+            grad[1 << HASH_BITS:] += numeric.T @ error
+            grad += l2 * weights
+            grad_b = error.sum()
+
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad * grad
+            weights -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+            m_b = beta1 * m_b + (1 - beta1) * grad_b
+            v_b = beta2 * v_b + (1 - beta2) * grad_b * grad_b
+            bias -= learning_rate * (m_b / (1 - beta1 ** step)) / (np.sqrt(v_b / (1 - beta2 ** step)) + eps)
+
+        model = cls(weights, float(bias), threshold, 0.0, mean, std)
+        probabilities = model.predict_proba([items[i] for i in valid_idx])
+        valid_labels = labels[valid_idx]
+
+        # cutoff：高分条目概率的 max_miss 分位数，且不超过 0.5（只跳过"明显"低分的条目）
+        model.cutoff = float(min(0.5, np.quantile(probabilities[valid_labels == 1], max_miss, method='lower')))
+        model.metrics = _evaluate(probabilities, valid_labels, model.cutoff)
+        model.metrics.update(samples=len(items), train=len(train_idx), threshold=threshold, cutoff=round(model.cutoff, 4))
+        return model
+
+    def save(self, path: str = PREFILTER_MODEL_PATH):
+        """保存模型（原子替换）"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            weights=self.weights,
+            bias=self.bias,
+            threshold=self.threshold,
+            cutoff=self.cutoff,
+            numeric_mean=self.numeric_mean,
+            numeric_std=self.numeric_std,
+            hash_bits=HASH_BITS,
+            metrics=json.dumps(self.metrics)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = PREFILTER_MODEL_PATH) -> Optional['Prefilter']:
+        """加载模型，不存在或特征版本不匹配时返回 None"""
+        try:
+            with np.load(path) as data:
+                if int(data['hash_bits']) != HASH_BITS or len(data['numeric_mean']) != len(NUMERIC_FEATURES):
+                    print(f"Prefilter model {path} is outdated, retrain with: python -m processors.prefilter train")
+                    return None
+                return cls(
+                    data['weights'],
+                    float(data['bias']),
+                    int(data['threshold']),
+                    float(data['cutoff']),
+                    data['numeric_mean'],
+                    data['numeric_std'],
+                    json.loads(str(data['metrics']))
+                )
+        except (IOError, OSError, KeyError, ValueError):
+            return None
+
+
+async def _aclose(items: AsyncIterable[Any]):
+    """关闭上游异步生成器（普通异步可迭代对象没有 aclose，跳过）"""
+    aclose = getattr(items, 'aclose', None)
+    if aclose is not None:
+        await aclose()
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def _evaluate(probabilities: np.ndarray, labels: np.ndarray, cutoff: float) -> Dict[str, Any]:
+    """
+    以大模型评分为基准评估"跳过"决策
+
+    precision: 被跳过的条目中确实低分的比例
+    recall: 低分条目中被跳过的比例（即省下的调用）
+    miss_rate: 高分条目中被误跳过的比例
+    """
+    dropped = probabilities < cutoff
+    low = labels == 0
+    true_drops = int((dropped & low).sum())
+    return {
+        'validation': int(len(labels)),
+        'skip_rate': round(float(dropped.mean()), 3) if len(labels) else 0.0,
+        'precision': round(true_drops / dropped.sum(), 3) if dropped.any() else 1.0,
+        'recall': round(true_drops / low.sum(), 3) if low.any() else 0.0,
+        'miss_rate': round(float((dropped & ~low).sum() / max(1, (~low).sum())), 3),
+    }
+
+
+def format_metrics(metrics: Dict[str, Any]) -> str:
+    """指标的可读文本"""
+    return (
+        f"samples={metrics.get('samples')} (train {metrics.get('train')}, validation {metrics.get('validation')}), "
+        f"threshold={metrics.get('threshold')}, cutoff={metrics.get('cutoff')}\n"
+        f"skip precision={metrics.get('precision')}, recall={metrics.get('recall')}, "
+        f"high-score miss rate={metrics.get('miss_rate')}, skip rate={metrics.get('skip_rate')}"
+    )
+
+
+def train_from_store(
+    store_path: str = STORE_PATH,
+    model_path: str = PREFILTER_MODEL_PATH,
+    threshold: int = 60,
+    min_samples: int = PREFILTER_MIN_SAMPLES
+) -> Prefilter:
+    """从已分析条目存储训练并保存模型"""
+    from storage.seen import SeenStore
+
+    store = SeenStore(store_path)
+    try:
+        rows = store.training_rows()
+    finally:
+        store.close()
+    if len(rows) < min_samples:
+        raise ValueError(f"Need at least {min_samples} analyzed items, store has {len(rows)}")
+
+    model = Prefilter.train(rows, threshold=threshold)
+    model.save(model_path)
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="本地预筛模型")
+    parser.add_argument('command', choices=['train', 'report'], help='train: 从存储重新训练；report: 查看当前模型指标')
+    parser.add_argument('--min-score', type=int, default=60, help='高分阈值（与 main.py --min-score 一致）')
+    parser.add_argument('--store', default=STORE_PATH, help='已分析条目存储路径')
+    parser.add_argument('--model', default=PREFILTER_MODEL_PATH, help='模型文件路径')
+    parser.add_argument('--min-samples', type=int, default=PREFILTER_MIN_SAMPLES, help='最少训练样本数')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        try:
+            model = train_from_store(args.store, args.model, threshold=args.min_score, min_samples=args.min_samples)
+        except ValueError as e:
+            print(f"Training failed: {e}")
+            raise SystemExit(1)
+        print(f"Saved {args.model}")
+    else:
+        model = Prefilter.load(args.model)
+        if model is None:
+            print(f"No prefilter model at {args.model}")
+            raise SystemExit(1)
+    print(format_metrics(model.metrics))
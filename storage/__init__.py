@@ -0,0 +1,14 @@
+"""Storage package"""
+
+from .seen import SeenStore, item_key
+from .archive import ResponseArchive
+from .opportunities import OpportunityStore
+from .results import ResultWriter
+
+__all__ = [
+    'SeenStore',
+    'ResponseArchive',
+    'OpportunityStore',
+    'ResultWriter',
+    'item_key'
+]
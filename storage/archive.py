@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+原始响应归档 - 记录收集器收到的每个 HTTP 响应，离线回放
+
+- 响应体按 SHA-256 内容寻址、gzip 压缩存放，相同内容只存一份（长期运行的主要节省来源）
+- SQLite 索引：请求键（方法 + 完整 URL + 请求体哈希）→ 时间、状态码、少量响应头、内容哈希
+- 回放时按请求键取指定时间点之前最近的一次响应
+
+查看：python -m storage.archive stats
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import metrics
+from config import ARCHIVE_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_key TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    status INTEGER NOT NULL,
+    headers_json TEXT NOT NULL,
+    body_sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_key_time ON responses(request_key, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_responses_time ON responses(fetched_at);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+"""
+
+# 回放时需要的响应头（其余丢弃）
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Content-Language')
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """请求键：方法 + 完整 URL（含查询参数）+ 请求体哈希"""
+    key = f"{method.upper()} {url}"
+    if body:
+        key += f" #{hashlib.sha256(body).hexdigest()[:16]}"
+    return key
+
+
+def parse_replay_at(value: Optional[str]) -> Optional[float]:
+    """回放时间点：YYYY-MM-DD（当天结束）或 ISO 时间；空或 latest 表示最新"""
+    if not value or value == 'latest':
+        return None
+    if len(value) == 10:
+        return (datetime.strptime(value, '%Y-%m-%d') + timedelta(days=1)).timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+class ResponseArchive:
+    """内容寻址的响应归档（线程安全）"""
+
+    def __init__(self, path: str = ARCHIVE_DIR):
+        self.path = path
+        os.makedirs(os.path.join(path, 'blobs'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, 'index.db'), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.stats = {'recorded': 0, 'deduplicated': 0, 'replayed': 0, 'missed': 0}
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.path, 'blobs', sha256[:2], f"{sha256}.gz")
+
+    def _store_blob(self, body: bytes) -> str:
+        sha256 = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            known = self.conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        if known:
+            self.stats['deduplicated'] += 1
+            return sha256
+
+        path = self._blob_path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = gzip.compress(body, compresslevel=6)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, size, stored_size) VALUES (?, ?, ?)",
+                (sha256, len(body), len(data))
+            )
+        return sha256
+
+    def record(self, method: str, url: str, status: int, headers: Any, body: bytes, request_body: Optional[bytes] = None):
+        """
+        记录一次响应
+
+        304 不单独存内容：复用同一请求最近一次 200 的内容，回放时得到完整响应。
+        """
+        key = request_key(method, url, request_body)
+        if status == 304:
+            previous = self._latest(key, None, status=200)
+            if previous is None:
+                return
+            sha256, kept = previous[2], previous[1]
+            status, size = 200, previous[3]
+        else:
+            sha256 = self._store_blob(body)
+            kept = {name: headers[name] for name in KEPT_HEADERS if headers.get(name)}
+            size = len(body)
+
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO responses (request_key, method, url, fetched_at, status, headers_json, body_sha256, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, method.upper(), url, time.time(), status, json.dumps(kept), sha256, size)
+            )
+            self.conn.commit()
+        self.stats['recorded'] += 1
+        metrics.inc('archive_records_total')
+
+    def _latest(self, key: str, before: Optional[float], status: Optional[int] = None) -> Optional[Tuple[int, Dict[str, str], str, int]]:
+        query = "SELECT status, headers_json, body_sha256, size FROM responses WHERE request_key = ?"
+        params: List[Any] = [key]
+        if before is not None:
+            query += " AND fetched_at < ?"
+            params.append(before)
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY fetched_at DESC LIMIT 1"
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2], row[3]
+
+    def lookup(self, method: str, url: str, request_body: Optional[bytes] = None,
+               before: Optional[float] = None) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """
+        回放：取 before 时间点之前最近的一次响应
+
+        Returns:
+            (状态码, 响应头, 响应体)，没有记录返回 None
+        """
+        found = self._latest(request_key(method, url, request_body), before)
+        if found is None:
+            self.stats['missed'] += 1
+            return None
+        status, headers, sha256, _ = found
+        with gzip.open(self._blob_path(sha256), 'rb') as f:
+            body = f.read()
+        self.stats['replayed'] += 1
+        return status, headers, body
+
+    def summary(self) -> Dict[str, Any]:
+        """归档规模和去重效果"""
+        with self._lock:
+            responses, logical = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            blobs, raw, stored = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+            days = self.conn.execute(
+                "SELECT date(fetched_at, 'unixepoch', 'localtime') AS day, COUNT(*) FROM responses GROUP BY day ORDER BY day"
+            ).fetchall()
+        return {
+            'responses': responses,
+            'unique_bodies': blobs,
+            'logical_bytes': logical,
+            'stored_bytes': stored,
+            'dedup_ratio': round(logical / raw, 2) if raw else 0.0,
+            'compression_ratio': round(raw / stored, 2) if stored else 0.0,
+            'days': dict(days),
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="原始响应归档")
+    parser.add_argument('command', choices=['stats', 'list'], help='stats: 规模和去重效果；list: 列出某天的请求')
+    parser.add_argument('--day', help='list 的日期 YYYY-MM-DD（默认今天）')
+    parser.add_argument('--path', default=ARCHIVE_DIR, help='归档目录')
+    args = parser.parse_args()
+
+    archive = ResponseArchive(args.path)
+    if args.command == 'stats':
+        print(json.dumps(archive.summary(), ensure_ascii=False, indent=2))
+    else:
+        day = args.day or datetime.now().strftime('%Y-%m-%d')
+        rows = archive.conn.execute(
+            """
+            SELECT datetime(fetched_at, 'unixepoch', 'localtime'), status, size, url FROM responses
+            WHERE date(fetched_at, 'unixepoch', 'localtime') = ? ORDER BY fetched_at
+            """,
+            (day,)
+        ).fetchall()
+        for fetched_at, status, size, url in rows:
+            print(f"{fetched_at}  {status}  {size:>8}  {url}")
+        print(f"{len(rows)} responses on {day}")
+    archive.close()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+机会存储 - 历次运行的分析结果（SQLite，按分数 / 来源 / 时间 / 标签建索引）
+
+查询：python -m storage.opportunities top --since 2026-09-01 --limit 20
+导入：python -m storage.opportunities import   # 一次性导入 data/opportunities_*.json(l)
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import metrics
+from config import STORE_PATH, DATA_DIR
+from models.opportunity import Opportunity
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS opportunities (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    data_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_opportunities_score ON opportunities(score, created_at);
+CREATE INDEX IF NOT EXISTS idx_opportunities_created ON opportunities(created_at);
+CREATE INDEX IF NOT EXISTS idx_opportunities_source_score ON opportunities(source, score, created_at);
+CREATE INDEX IF NOT EXISTS idx_opportunities_source_created ON opportunities(source, created_at);
+-- 标签表冗余分数和时间，按标签查询前 N 时不必回表过滤
+CREATE TABLE IF NOT EXISTS opportunity_tags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    key TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_opportunity_tags_score ON opportunity_tags(tag, score, created_at);
+CREATE INDEX IF NOT EXISTS idx_opportunity_tags_key ON opportunity_tags(key);
+"""
+
+# 累计写入多少条后关闭时重新 ANALYZE（查询规划依赖统计信息选择分数或时间索引）
+ANALYZE_EVERY = 1000
+
+
+def opportunity_key(opp: Opportunity) -> str:
+    """同一来源的同一条目只保留最近一次分析"""
+    return f"{opp.source}:{opp.id}"
+
+
+def _timestamp(value: Optional[str], end: bool = False) -> Optional[float]:
+    """YYYY-MM-DD（end=True 时取当天结束）或 ISO 时间"""
+    if not value:
+        return None
+    if len(value) == 10:
+        day = datetime.strptime(value, '%Y-%m-%d')
+        return (day + timedelta(days=1) if end else day).timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+class OpportunityStore:
+    """历史机会的索引存储，替代逐个扫描 data/ 下的 JSON 文件"""
+
+    def __init__(self, path: str = STORE_PATH, conn: Optional[sqlite3.Connection] = None):
+        """
+        Args:
+            path: SQLite 文件路径
+            conn: 复用已打开的连接（如同一数据库上的 SeenStore.conn）；两个连接同时写同一文件时，
+                  先开启的写事务未提交前另一个会等到 database is locked。复用的连接由调用方关闭
+        """
+        if conn is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            conn = sqlite3.connect(path)
+            self._owns_conn = True
+        else:
+            self._owns_conn = False
+        self.conn = conn
+        self.conn.executescript(SCHEMA)
+        self._written = 0
+
+    def upsert(self, opportunities: Iterable[Opportunity], serialized: Optional[List[str]] = None) -> int:
+        """
+        批量写入（单个事务）；已有记录只在新结果不早于旧结果时覆盖，标签随之替换
+
+        Args:
+            serialized: 与 opportunities 一一对应的 to_dict() JSON（调用方已序列化时传入，避免重复序列化）
+
+        Returns:
+            写入的条数
+        """
+        latest: Dict[str, tuple] = {}
+        for index, opp in enumerate(opportunities):
+            key = opportunity_key(opp)
+            data_json = serialized[index] if serialized is not None else json.dumps(opp.to_dict(), ensure_ascii=False, default=str)
+            row = (
+                key, str(opp.id), opp.source, opp.title, opp.url, int(opp.score),
+                opp.created_at.timestamp(), data_json
+            )
+            if key not in latest or row[6] >= latest[key][0][6]:
+                latest[key] = (row, [tag for tag in dict.fromkeys(opp.tags or []) if tag])
+        if not latest:
+            return 0
+
+        # 已有记录的时间：新结果不早于它才覆盖
+        existing: Dict[str, float] = {}
+        keys = list(latest)
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            existing.update(self.conn.execute(
+                f"SELECT key, created_at FROM opportunities WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        winners = [(row, tags) for key, (row, tags) in latest.items() if existing.get(key, row[6]) <= row[6]]
+        if not winners:
+            return 0
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO opportunities (key, id, source, title, url, score, created_at, data_json) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row for row, _ in winners]
+            )
+            replaced = [(row[0],) for row, _ in winners if row[0] in existing]
+            if replaced:
+                self.conn.executemany("DELETE FROM opportunity_tags WHERE key = ?", replaced)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO opportunity_tags (tag, key, score, created_at) VALUES (?, ?, ?, ?)",
+                [(tag, row[0], row[5], row[6]) for row, tags in winners for tag in tags]
+            )
+        self._written += len(winners)
+        metrics.inc('store_writes_total', len(winners), store='opportunities')
+        return len(winners)
+
+    def top(
+        self,
+        limit: int = 10,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        source: Optional[str] = None,
+        tag: Optional[str] = None,
+        min_score: Optional[int] = None
+    ) -> List[Opportunity]:
+        """
+        按分数取前 N 个机会
+
+        Args:
+            since / until: 日期范围 YYYY-MM-DD（含 until 当天）或 ISO 时间
+            source: 只看某个来源
+            tag: 只看带某个标签的（不区分大小写）
+        """
+        if tag:
+            # 先在标签表上按 (tag, score) 索引取前 N，再回表
+            query = "SELECT o.data_json FROM opportunity_tags t JOIN opportunities o ON o.key = t.key WHERE t.tag = ?"
+            params: List[Any] = [tag]
+            table = 't.'
+        else:
+            query = "SELECT data_json FROM opportunities WHERE 1 = 1"
+            params = []
+            table = ''
+        start, end = _timestamp(since), _timestamp(until, end=True)
+        if start is not None:
+            query += f" AND {table}created_at >= ?"
+            params.append(start)
+        if end is not None:
+            query += f" AND {table}created_at < ?"
+            params.append(end)
+        if source:
+            query += " AND source = ?" if not tag else " AND o.source = ?"
+            params.append(source)
+        if min_score is not None:
+            query += f" AND {table}score >= ?"
+            params.append(min_score)
+        query += f" ORDER BY {table}score DESC, {table}created_at DESC LIMIT ?"
+        params.append(limit)
+        return [Opportunity.from_dict(json.loads(row[0])) for row in self.conn.execute(query, params)]
+
+    def stats(self) -> Dict[str, Any]:
+        """总数、时间范围、各来源数量、最常见标签"""
+        total, first, last = self.conn.execute(
+            "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM opportunities"
+        ).fetchone()
+        sources = self.conn.execute(
+            "SELECT source, COUNT(*) FROM opportunities GROUP BY source ORDER BY COUNT(*) DESC"
+        ).fetchall()
+        tags = self.conn.execute(
+            "SELECT tag, COUNT(*) FROM opportunity_tags GROUP BY tag ORDER BY COUNT(*) DESC LIMIT 10"
+        ).fetchall()
+        return {
+            'total': total,
+            'first': datetime.fromtimestamp(first).isoformat(timespec='seconds') if first else None,
+            'last': datetime.fromtimestamp(last).isoformat(timespec='seconds') if last else None,
+            'sources': dict(sources),
+            'top_tags': dict(tags),
+        }
+
+    def import_json(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        一次性导入历史结果文件（旧版的 JSON 数组或 JSONL），可重复执行
+
+        Returns:
+            {'files': 文件数, 'records': 读到的记录数, 'written': 新写入或更新的条数}
+        """
+        summary = {'files': 0, 'records': 0, 'written': 0}
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if path.endswith('.jsonl'):
+                        records = [json.loads(line) for line in f if line.strip()]
+                    else:
+                        records = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            opportunities = []
+            for record in records if isinstance(records, list) else []:
+                try:
+                    opportunities.append(Opportunity.from_dict(record))
+                except (TypeError, ValueError) as e:
+                    print(f"Skipping record in {path}: {e}")
+            summary['files'] += 1
+            summary['records'] += len(opportunities)
+            summary['written'] += self.upsert(opportunities)
+        return summary
+
+    def _has_stats(self) -> bool:
+        try:
+            return self.conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'opportunities' LIMIT 1").fetchone() is not None
+        except sqlite3.OperationalError:
+            return False
+
+    def close(self):
+        if self._written >= ANALYZE_EVERY or not self._has_stats():
+            self.conn.execute("ANALYZE")
+        if self._owns_conn:
+            self.conn.close()
+
+
+def _print_table(opportunities: List[Opportunity]):
+    for opp in opportunities:
+        print(f"{opp.score:>3}  {opp.created_at.strftime('%Y-%m-%d')}  {opp.source:<14} {opp.title[:70]}")
+        if opp.tags:
+            print(f"{'':>21}{', '.join(opp.tags)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="机会存储查询")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    top_parser = subparsers.add_parser('top', help='按分数取前 N 个机会')
+    top_parser.add_argument('--limit', type=int, default=10)
+    top_parser.add_argument('--since', help='开始日期 YYYY-MM-DD')
+    top_parser.add_argument('--until', help='结束日期 YYYY-MM-DD（含当天）')
+    top_parser.add_argument('--source', help='来源，如 hn')
+    top_parser.add_argument('--tag', help='标签（不区分大小写）')
+    top_parser.add_argument('--min-score', type=int, default=None)
+    top_parser.add_argument('--json', action='store_true', help='输出 JSON')
+
+    import_parser = subparsers.add_parser('import', help='导入历史 JSON 结果文件')
+    import_parser.add_argument('paths', nargs='*', help='默认 data/opportunities_*.json 和 *.jsonl')
+
+    subparsers.add_parser('stats', help='存储概况')
+    parser.add_argument('--path', default=STORE_PATH, help='SQLite 文件路径')
+    args = parser.parse_args()
+
+    store = OpportunityStore(args.path)
+    if args.command == 'top':
+        started = time.perf_counter()
+        results = store.top(args.limit, args.since, args.until, args.source, args.tag, args.min_score)
+        elapsed = time.perf_counter() - started
+        if args.json:
+            print(json.dumps([opp.to_dict() for opp in results], ensure_ascii=False, indent=2))
+        else:
+            _print_table(results)
+            print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+    elif args.command == 'import':
+        paths = args.paths or sorted(
+            glob.glob(os.path.join(DATA_DIR, 'opportunities_*.json')) + glob.glob(os.path.join(DATA_DIR, 'opportunities_*.jsonl'))
+        )
+        print(f"Importing {len(paths)} files...")
+        print(store.import_json(paths))
+    else:
+        print(json.dumps(store.stats(), ensure_ascii=False, indent=2))
+    store.close()
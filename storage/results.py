@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+运行结果写入 - 每个机会产出即序列化一次，追加到本次运行的 JSONL 文件
+
+- 按批刷盘（flush + fsync），运行中途崩溃也保留已写出的结果
+- 运行正常结束后，latest.jsonl 原子地切换到本次运行的文件（符号链接，不支持时复制后 rename）
+- 给出 store 时同一批结果复用已序列化的 JSON 写入机会存储
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import List, Tuple
+
+from config import DATA_DIR
+from models.opportunity import Opportunity
+
+LATEST_NAME = "latest.jsonl"
+
+
+class ResultWriter:
+    """追加写入 opportunities_<时间>.jsonl，结束时切换 latest 指针"""
+
+    def __init__(self, output_dir: str = DATA_DIR, store=None, flush_every: int = 20):
+        """
+        Args:
+            output_dir: 输出目录
+            store: 可选的 OpportunityStore，每批结果同时写入
+            flush_every: 每多少条刷盘一次
+        """
+        self.output_dir = output_dir
+        self.store = store
+        self.flush_every = flush_every
+        self.path = os.path.join(output_dir, f"opportunities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        self.count = 0
+        self._file = None
+        self._pending: List[Tuple[Opportunity, str]] = []
+
+    def write(self, opp: Opportunity):
+        """序列化并缓冲一个机会，攒够 flush_every 条写盘"""
+        line = json.dumps(opp.to_dict(), ensure_ascii=False, default=str)
+        self._pending.append((opp, line))
+        self.count += 1
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        if self._file is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        pending, self._pending = self._pending, []
+        self._file.write(''.join(line + '\n' for _, line in pending))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self.store is not None:
+            self.store.upsert([opp for opp, _ in pending], serialized=[line for _, line in pending])
+
+    def close(self, finished: bool = True):
+        """
+        写出剩余结果并关闭文件；finished=True 且本次有结果时把 latest 指向本次运行
+
+        运行失败（finished=False）时保留已写出的文件，latest 仍指向上一次完成的运行。
+        """
+        try:
+            self.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if finished and self.count:
+            point_latest(self.path)
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(finished=exc_type is None)
+
+
+def point_latest(path: str, name: str = LATEST_NAME) -> str:
+    """把同目录下的 latest 原子地指向 path（先建临时链接再 rename 覆盖）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    latest = os.path.join(directory, name)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.symlink(os.path.basename(path), tmp_path)
+    except (OSError, NotImplementedError):
+        shutil.copyfile(path, tmp_path)  # 不支持符号链接（如 Windows 无权限）时复制
+    os.replace(tmp_path, latest)
+    return latest
+
+
+def read_results(path: str) -> List[Opportunity]:
+    """读取 JSONL 结果文件（或 latest 指针），跳过写到一半的末行"""
+    opportunities = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                opportunities.append(Opportunity.from_dict(json.loads(line)))
+            except ValueError:
+                continue
+    return opportunities
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""已分析条目存储 - 跨运行跳过已分析过的条目（SQLite）"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple, AsyncIterable, AsyncIterator
+
+import metrics
+from config import STORE_PATH, SEEN_TTL_DAYS
+from models.opportunity import Opportunity
+from processors.dedup import canonicalize_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_items (
+    key TEXT PRIMARY KEY,
+    item_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    item_json TEXT NOT NULL,
+    first_seen_at REAL NOT NULL,
+    last_analyzed_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    result_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seen_items_analyzed ON seen_items(last_analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_seen_items_source ON seen_items(source);
+"""
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """条目的唯一键：规范化 URL，没有 URL 时用 source:id"""
+    canonical = item.get('canonical_url') or canonicalize_url(item.get('url', ''))
+    return canonical or f"{item.get('source', 'unknown')}:{item.get('id', '')}"
+
+
+class SeenStore:
+    """记录每个条目最近一次分析的时间和结果"""
+
+    def __init__(self, path: str = STORE_PATH, ttl_days: float = SEEN_TTL_DAYS, commit_every: int = 20):
+        """
+        Args:
+            path: SQLite 文件路径
+            ttl_days: 分析结果有效期（天），过期后重新分析；0 表示永久有效
+            commit_every: 每记录多少条提交一次
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.ttl = ttl_days * 86400
+        self.commit_every = commit_every
+        self._pending = 0
+        self._recent: Optional[Set[str]] = None
+        self.skipped = 0
+
+    def recent_keys(self) -> Set[str]:
+        """一次性加载有效期内已分析过的所有键"""
+        if self._recent is None:
+            cutoff = time.time() - self.ttl if self.ttl else 0
+            rows = self.conn.execute("SELECT key FROM seen_items WHERE last_analyzed_at >= ?", (cutoff,))
+            self._recent = {row[0] for row in rows}
+        return self._recent
+
+    def is_seen(self, item: Dict[str, Any]) -> bool:
+        return item_key(item) in self.recent_keys()
+
+    def filter_new(self, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        拆分条目
+
+        Returns:
+            (需要分析的新条目, 已分析过的条目)
+        """
+        seen = self.recent_keys()
+        new_items, skipped = [], []
+        for item in items:
+            (skipped if item_key(item) in seen else new_items).append(item)
+        self.skipped += len(skipped)
+        metrics.inc('seen_skipped_total', len(skipped))
+        return new_items, skipped
+
+    async def stream(self, items: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """流式过滤：只产出需要分析的新条目"""
+        async for item in items:
+            if self.is_seen(item):
+                self.skipped += 1
+                metrics.inc('seen_skipped_total')
+                continue
+            yield item
+
+    def record(self, item: Dict[str, Any], opp: Optional[Opportunity]):
+        """记录一次分析结果；分析失败（opp 为 None）不记录，下次运行会重试"""
+        if opp is None:
+            return
+        key = item_key(item)
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT INTO seen_items (key, item_id, source, title, item_json, first_seen_at,
+                                    last_analyzed_at, score, result_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                item_json = excluded.item_json,
+                last_analyzed_at = excluded.last_analyzed_at,
+                score = excluded.score,
+                result_json = excluded.result_json
+            """,
+            (
+                key,
+                str(item.get('id', '')),
+                item.get('source', 'unknown'),
+                item.get('title', ''),
+                json.dumps(item, ensure_ascii=False, default=str),
+                now,
+                now,
+                opp.score,
+                json.dumps(opp.to_dict(), ensure_ascii=False, default=str),
+            )
+        )
+        if self._recent is not None:
+            self._recent.add(key)
+        metrics.inc('store_writes_total', store='seen')
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def training_rows(self) -> List[Tuple[Dict[str, Any], int]]:
+        """全部历史 (条目, 模型评分)，用于训练本地预筛模型"""
+        rows = self.conn.execute("SELECT item_json, score FROM seen_items ORDER BY first_seen_at")
+        return [(json.loads(item_json), score) for item_json, score in rows]
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+
+import pytest
+import requests
+
+import main
+import transport
+from collectors import feed_cache
+from storage.archive import ResponseArchive, parse_replay_at
+
+FEED_URL = 'https://example.com/feed.xml'
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>
+<item><guid>1</guid><title>First</title><link>https://example.com/1</link></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ResponseArchive(str(tmp_path / 'archive'))
+
+
+def test_record_and_replay_latest(archive):
+    archive.record('GET', 'https://example.com/a', 200, {'Content-Type': 'application/json'}, b'{"v": 1}')
+    archive.record('GET', 'https://example.com/a', 200, {}, b'{"v": 2}')
+    status, headers, body = archive.lookup('get', 'https://example.com/a')
+    assert (status, body) == (200, b'{"v": 2}')
+    assert archive.lookup('GET', 'https://example.com/b') is None
+    assert archive.stats['missed'] == 1
+
+
+def test_identical_bodies_stored_once(archive):
+    for _ in range(3):
+        archive.record('GET', 'https://example.com/a', 200, {}, b'same body')
+    summary = archive.summary()
+    assert summary['responses'] == 3
+    assert summary['unique_bodies'] == 1
+
+
+def test_replay_before_time_point(archive):
+    archive.record('GET', 'https://example.com/a', 200, {}, b'old')
+    assert archive.lookup('GET', 'https://example.com/a', before=parse_replay_at('2000-01-01')) is None
+    assert archive.lookup('GET', 'https://example.com/a', before=parse_replay_at('2999-01-01'))[2] == b'old'
+
+
+def test_not_modified_reuses_previous_body(archive):
+    # 没有之前的 200 时 304 无法回放，不记录
+    archive.record('GET', 'https://example.com/a', 304, {}, b'')
+    assert archive.lookup('GET', 'https://example.com/a') is None
+    archive.record('GET', 'https://example.com/a', 200, {}, b'full')
+    archive.record('GET', 'https://example.com/a', 304, {}, b'')
+    assert archive.lookup('GET', 'https://example.com/a')[:1] == (200,)
+    assert archive.lookup('GET', 'https://example.com/a')[2] == b'full'
+
+
+def test_request_body_is_part_of_key(archive):
+    archive.record('POST', 'https://example.com/q', 200, {}, b'one', request_body=b'{"page": 1}')
+    assert archive.lookup('POST', 'https://example.com/q', b'{"page": 2}') is None
+    assert archive.lookup('POST', 'https://example.com/q', b'{"page": 1}')[2] == b'one'
+
+
+@pytest.mark.parametrize('mode,incremental', [('off', True), ('record', False), ('replay', False)])
+def test_hn_incremental_only_without_archive(monkeypatch, mode, incremental):
+    monkeypatch.setattr(main, 'HN_INCREMENTAL', True)
+    monkeypatch.setattr(transport, 'archive_mode', lambda: mode)
+    runner = main.build_collector_runner()
+    hn = next(source for source in runner.sources if source.name == 'hn')
+    assert hn.kwargs['incremental'] is incremental
+
+
+def _feed_response(status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = RSS if status == 200 else b''
+    response.headers['ETag'] = '"v1"'
+    return response
+
+
+def _warm_feed_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(feed_cache, 'FEED_CACHE_DIR', str(tmp_path / 'feeds'))
+    monkeypatch.setattr(transport, 'archive_mode', lambda: 'off')
+    monkeypatch.setattr(transport, 'get', lambda url, headers, timeout: _feed_response())
+    feed_cache.fetch_feed(FEED_URL)
+    (path,) = os.listdir(tmp_path / 'feeds')
+    return os.path.join(tmp_path / 'feeds', path)
+
+
+def test_feed_sends_validators_only_without_archive(monkeypatch, tmp_path):
+    _warm_feed_cache(monkeypatch, tmp_path)
+    sent = []
+
+    def get(url, headers, timeout):
+        sent.append(headers)
+        return _feed_response(304 if 'If-None-Match' in headers else 200)
+
+    monkeypatch.setattr(transport, 'get', get)
+    assert [entry.title for entry in feed_cache.fetch_feed(FEED_URL)] == ['First']
+    assert sent[-1].get('If-None-Match') == '"v1"'
+
+    monkeypatch.setattr(transport, 'archive_mode', lambda: 'record')
+    assert [entry.title for entry in feed_cache.fetch_feed(FEED_URL)] == ['First']
+    assert 'If-None-Match' not in sent[-1] and 'If-Modified-Since' not in sent[-1]
+
+
+def test_feed_replay_does_not_write_cache(monkeypatch, tmp_path):
+    path = _warm_feed_cache(monkeypatch, tmp_path)
+    before = open(path, 'rb').read()
+    monkeypatch.setattr(transport, 'archive_mode', lambda: 'replay')
+    monkeypatch.setattr(transport, 'get', lambda url, headers, timeout: _feed_response())
+    assert [entry.title for entry in feed_cache.fetch_feed(FEED_URL)] == ['First']
+    assert open(path, 'rb').read() == before
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: bytes):
+        self.status = status
+        self.headers = {'Content-Type': 'application/json'}
+        self.body = body
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def json(self):
+        return json.loads(self.body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def get(self, url, timeout=None):
+        return FakeResponse(*self.responses[url])
+
+
+@pytest.mark.parametrize('status,body,expected', [(200, b'{"id": 1}', {'id': 1}), (404, b'null', None)])
+def test_async_json_archived_like_sync_path(archive, status, body, expected):
+    url = 'https://hacker-news.firebaseio.com/v0/item/1.json'
+    recorder = transport.HttpTransport(default_rate=0)
+    recorder.use_archive('record', archive=archive)
+    assert asyncio.run(recorder.get_json_async(FakeSession({url: (status, body)}), url, 5)) == expected
+    assert archive.lookup('GET', url)[0] == status
+
+    player = transport.HttpTransport(default_rate=0)
+    player.use_archive('replay', archive=archive)
+    assert asyncio.run(player.get_json_async(None, url, 5)) == expected
+    assert archive.stats['missed'] == 0
+
+
+def test_async_json_skips_throttled_responses(archive):
+    url = 'https://hacker-news.firebaseio.com/v0/item/2.json'
+    recorder = transport.HttpTransport(default_rate=0, max_retries=0)
+    recorder.use_archive('record', archive=archive)
+    assert asyncio.run(recorder.get_json_async(FakeSession({url: (503, b'')}), url, 5)) is None
+    assert archive.lookup('GET', url) is None
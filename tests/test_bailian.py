@@ -0,0 +1,109 @@
+import asyncio
+import json
+import re
+
+from analyzers.bailian import BailianAnalyzer
+from analyzers.limiter import AdaptiveLimiter
+from analyzers.usage import UsageTracker
+
+
+def make_analyzer(tmp_path, **kwargs) -> BailianAnalyzer:
+    return BailianAnalyzer(
+        api_key='test',
+        cache=False,
+        usage=UsageTracker(str(tmp_path / 'usage'), daily_token_budget=0, daily_cost_budget=0),
+        **kwargs
+    )
+
+
+def stub_requests(analyzer: BailianAnalyzer, score: int = 80) -> list:
+    """替换模型请求：按提示词中的 id 返回分析结果，记录每次请求的条目数"""
+    requests = []
+
+    async def request(prompt, session=None, max_tokens=None, abort_below=None, sources=None):
+        ids = re.findall(r'### 机会 id=(\S+)', prompt)
+        requests.append(len(ids) or 1)
+        await asyncio.sleep(0.01)
+        if not ids:
+            return json.dumps({'score': score})
+        return json.dumps([{'id': item_id, 'score': score} for item_id in ids])
+
+    analyzer._request = request
+    return requests
+
+
+async def produce(count: int):
+    for n in range(count):
+        yield {'id': str(n), 'title': f"item {n}", 'source': 'hn', 'url': f"https://example.com/{n}"}
+
+
+def test_batched_stream_sends_full_batches(tmp_path):
+    analyzer = make_analyzer(tmp_path, batch_size=5, limiter=AdaptiveLimiter(initial=32, ceiling=32))
+    requests = stub_requests(analyzer)
+
+    async def run():
+        return [opp async for opp in analyzer.analyze_stream(produce(60), min_score=60)]
+
+    assert len(asyncio.run(run())) == 60
+    assert requests == [5] * 12
+
+
+def test_early_abort_flag_follows_the_item(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+    verdicts = {'a': {'score': 10, 'rejected': True}, 'b': {'score': 80}}
+
+    async def request(prompt, session=None, max_tokens=None, abort_below=None, sources=None):
+        return json.dumps(verdicts[re.search(r'item (\w+)', prompt).group(1)])
+
+    analyzer._request = request
+    item_a = {'id': 'a', 'title': 'item a', 'source': 'hn'}
+    # 直接调用 analyze_async 留下的提前终止标记不影响其他条目
+    assert asyncio.run(analyzer.analyze_async(item_a, min_score=60)).score == 10
+
+    results = []
+
+    async def run(items):
+        async def produce_items():
+            for item in items:
+                yield item
+        return [opp async for opp in analyzer.analyze_stream(
+            produce_items(), min_score=60, on_result=lambda item, opp: results.append((item['id'], opp)))]
+
+    asyncio.run(run([{'id': 'b', 'title': 'item b', 'source': 'hn'}]))
+    assert [(item_id, opp is not None) for item_id, opp in results] == [('b', True)]
+
+    # 同一条目之后得到完整分析时标记被清除
+    verdicts['a'] = {'score': 70}
+    results.clear()
+    asyncio.run(run([dict(item_a)]))
+    assert [(item_id, opp is not None) for item_id, opp in results] == [('a', True)]
+
+
+class FakeStream:
+    def __init__(self, events):
+        self.lines = [b'data: ' + json.dumps(event).encode() + b'\n' for event in events]
+        self.closed = False
+
+    @property
+    def content(self):
+        async def lines():
+            for line in self.lines:
+                yield line
+        return lines()
+
+    def close(self):
+        self.closed = True
+
+
+def test_aborted_stream_estimates_output_tokens(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+    text = '{"score": 20, "summary": "' + '很' * 200
+    response = FakeStream([
+        {'type': 'message_start', 'message': {'usage': {'input_tokens': 500, 'output_tokens': 1}}},
+        {'type': 'content_block_delta', 'delta': {'text': text}},
+        {'type': 'message_delta', 'usage': {'output_tokens': 400}},
+    ])
+    result = asyncio.run(analyzer._read_stream(response, abort_below=50))
+    assert response.closed
+    assert result['stop_reason'] == 'aborted'
+    assert result['usage'] == {'input_tokens': 500, 'output_tokens': len(text) // 2}
@@ -0,0 +1,67 @@
+import pytest
+
+import processors.dedup as dedup_module
+from processors.dedup import Deduplicator, canonicalize_url, dedupe, simhash
+
+
+def test_canonicalize_strips_tracking_and_normalizes():
+    assert canonicalize_url('http://www.Example.com/a//b/?utm_source=hn&b=2&a=1#top') == 'https://example.com/a/b?a=1&b=2'
+    assert canonicalize_url('https://m.example.com/post?ref=producthunt') == 'https://example.com/post'
+    assert canonicalize_url('https://www.producthunt.com/posts/tool?ref=header_nav') == 'https://producthunt.com/posts/tool'
+    # 其他站点的 ref 可能有实际含义（如 git 分支），保留
+    assert canonicalize_url('https://example.com/api/contents?ref=main') == 'https://example.com/api/contents?ref=main'
+    assert canonicalize_url('https://example.com:8080/') == 'https://example.com:8080/'
+    assert canonicalize_url('') == ''
+
+
+def test_canonicalize_unwraps_redirectors():
+    wrapped = 'https://out.reddit.com/t3_x?url=https%3A%2F%2Fexample.com%2Ftool%3Futm_medium%3Dx&token=1'
+    assert canonicalize_url(wrapped) == 'https://example.com/tool'
+    assert canonicalize_url('https://www.google.com/url?q=https://example.com/tool&sa=D') == 'https://example.com/tool'
+    # google.com 只有 /url 是跳转，/search?q= 是真实的搜索页
+    assert canonicalize_url('https://www.google.com/search?q=https://example.com') == 'https://google.com/search?q=https%3A%2F%2Fexample.com'
+
+
+def test_simhash_near_duplicates_are_close():
+    a = simhash('Show HN: An open source CRM for indie hackers', 'Self-hosted CRM with AI agents')
+    b = simhash('An open source CRM for indie hackers!', 'Self-hosted CRM with AI agents')
+    c = simhash('Rust compiler internals explained', 'Borrow checker deep dive')
+    assert bin(a ^ b).count('1') <= 3
+    assert bin(a ^ c).count('1') > 10
+
+
+def test_dedupe_merges_sources_and_keeps_order():
+    items = [
+        {'id': 1, 'source': 'hn', 'title': 'Tool A', 'url': 'https://example.com/a?utm_source=hn', 'description': ''},
+        {'id': 2, 'source': 'ph', 'title': 'Something else entirely', 'url': 'https://www.example.com/a/', 'description': 'longer text'},
+        {'id': 3, 'source': 'hn', 'title': 'Unrelated B', 'url': 'https://other.com/b'},
+    ]
+    kept = dedupe(items)
+    assert [item['id'] for item in kept] == [1, 3]
+    assert [signal['source'] for signal in kept[0]['sources']] == ['hn', 'ph']
+    assert kept[0]['description'] == 'longer text'
+
+
+def test_deduplicator_counts_duplicates():
+    deduplicator = Deduplicator()
+    title = 'Open source alternative to Notion built with Rust and SQLite'
+    assert deduplicator.add({'id': 1, 'source': 'hn', 'title': title, 'url': 'https://a.com/1'}) is not None
+    assert deduplicator.add({'id': 2, 'source': 'reddit', 'title': title + '!', 'url': 'https://b.com/2'}) is None
+    assert deduplicator.duplicates == 1
+
+
+def test_bands_cover_configured_distance(monkeypatch):
+    # 距离 5，且 4 段 16 位每段都不同：只有按距离增加分段数才能找到
+    far = (1 << 0) | (1 << 1) | (1 << 16) | (1 << 32) | (1 << 48)
+    fingerprints = {'a': 1 << 63, 'b': (1 << 63) ^ far}
+    monkeypatch.setattr(dedup_module, 'simhash', lambda title, description='': fingerprints[title])
+
+    deduplicator = Deduplicator(max_distance=5)
+    assert len(deduplicator.bands) == 6
+    assert deduplicator.add({'id': 1, 'source': 'hn', 'title': 'a', 'url': 'https://a.com/1'}) is not None
+    assert deduplicator.add({'id': 2, 'source': 'hn', 'title': 'b', 'url': 'https://b.com/2'}) is None
+
+
+def test_rejects_distance_beyond_fingerprint():
+    with pytest.raises(ValueError):
+        Deduplicator(max_distance=64)
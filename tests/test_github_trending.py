@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from collectors.github_trending import GitHubTrendingCollector
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'github_trending', 'all_daily.html')
+
+
+@pytest.fixture(scope='module')
+def page() -> str:
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_fast_parser_reads_trending_page(page):
+    repos = GitHubTrendingCollector()._parse_fast(page)
+
+    assert len(repos) == 13
+    assert repos[0] == {
+        'full_name': 'browser-use/browser-use',
+        'description': 'Make websites accessible for AI agents. Automate tasks online with ease.',
+        'stars': 68412,
+        'forks': 7921,
+        'language': 'Python',
+    }
+    by_name = {repo['full_name']: repo for repo in repos}
+    # 实体解码、无描述、无语言、k 单位
+    assert by_name['oven-sh/bun']['description'].endswith('package manager – all in one')
+    assert by_name['sindresorhus/awesome'] == {
+        'full_name': 'sindresorhus/awesome', 'description': '', 'stars': 393215, 'forks': 30412, 'language': ''
+    }
+    assert by_name['awesome-selfhosted/awesome-selfhosted']['language'] == ''
+    assert by_name['public-apis/public-apis']['stars'] == 1200
+
+
+def test_fast_parser_matches_bs4(page):
+    pytest.importorskip('bs4')
+    collector = GitHubTrendingCollector()
+    # 与原 BeautifulSoup 实现逐字段一致（包括 get_text(strip=True) 拼接嵌套标签的方式）
+    assert collector._parse_fast(page) == collector._parse_bs4(page)
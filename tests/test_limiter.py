@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from analyzers.limiter import AdaptiveLimiter, OK, THROTTLED, FAILED
+
+
+def test_success_grows_window_up_to_ceiling():
+    limiter = AdaptiveLimiter(initial=2, floor=1, ceiling=4)
+    for _ in range(50):
+        limiter.in_flight += 1
+        limiter.release(time.monotonic(), OK)
+    assert limiter.window == 4
+
+
+def test_throttle_halves_once_per_congestion_round():
+    limiter = AdaptiveLimiter(initial=8, floor=1, ceiling=16)
+    started = 0.0  # 在缩减之前发出的请求
+    limiter.in_flight = 3
+    for _ in range(3):
+        limiter.release(started, THROTTLED)
+    assert limiter.window == 4
+    assert limiter.stats['cuts'] == 1
+
+
+def test_window_never_below_floor_and_failures_do_not_adjust():
+    limiter = AdaptiveLimiter(initial=2, floor=2, ceiling=8)
+    limiter.in_flight = 1
+    limiter.release(float('inf'), THROTTLED)
+    assert limiter.window == 2
+    limiter.in_flight = 1
+    limiter.release(float('inf'), FAILED)
+    assert limiter.window == 2 and limiter.stats['failed'] == 1
+
+
+def test_acquire_respects_limit():
+    async def run():
+        limiter = AdaptiveLimiter(initial=2, floor=1, ceiling=2)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            started = await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.005)
+            limiter.release(started, FAILED)
+
+        await asyncio.gather(*(request() for _ in range(10)))
+        return peak, limiter.in_flight
+
+    assert asyncio.run(run()) == (2, 0)
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def run():
+        limiter = AdaptiveLimiter(initial=1, floor=1, ceiling=1)
+        started = await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release(started, FAILED)
+        return limiter.in_flight, len(limiter._waiters)
+
+    assert asyncio.run(run()) == (0, 0)
@@ -0,0 +1,70 @@
+from dataclasses import fields
+
+import pytest
+
+from models import Opportunity, RevenueModel, StartupCost
+from models.categories import OTHER, UNKNOWN, REVENUE_MODEL
+
+
+def make(**kwargs) -> Opportunity:
+    return Opportunity(id='1', title='t', source='hn', url='https://example.com', **kwargs)
+
+
+def test_encode_known_labels_ignoring_spacing_and_case():
+    assert REVENUE_MODEL.encode('订阅') == RevenueModel.SUBSCRIPTION
+    assert REVENUE_MODEL.encode('api收费') == RevenueModel.API
+    assert REVENUE_MODEL.encode('') == UNKNOWN
+    assert REVENUE_MODEL.encode('订阅 + 广告') == OTHER
+
+
+def test_encode_non_string_values_as_other():
+    assert REVENUE_MODEL.encode(['订阅', 'API 收费']) == OTHER
+    assert REVENUE_MODEL.encode(90) == OTHER
+    assert REVENUE_MODEL.encode(None) == OTHER
+
+
+def test_codes_and_text():
+    opp = make(startup_cost='<$1k', revenue_model='订阅')
+    assert opp.startup_cost_code == StartupCost.UNDER_1K
+    assert opp.revenue_model == '订阅'
+    assert opp.time_to_revenue == '' and opp.time_to_revenue_code == UNKNOWN
+
+    opp.revenue_model = '按量付费'
+    assert opp.revenue_model_code == OTHER and opp.revenue_model == '按量付费'
+    opp.revenue_model = '广告'
+    assert opp.revenue_model_code == RevenueModel.ADS
+    assert opp._other_text is None
+
+
+def test_non_string_values_round_trip_unchanged():
+    opp = make(revenue_model=['订阅', 'API 收费'], automation_rate=90)
+    assert opp.revenue_model == ['订阅', 'API 收费']
+    assert opp.revenue_model_code == OTHER
+    assert opp.automation_rate == 90
+
+    data = opp.to_dict()
+    assert data['revenue_model'] == ['订阅', 'API 收费']
+    assert data['automation_rate'] == 90
+    assert Opportunity.from_dict(data) == opp
+
+
+def test_to_dict_from_dict_round_trip():
+    opp = make(score=80, startup_cost='$1-5k', customer_acquisition='SEO 和口碑', tags=['SaaS'])
+    data = opp.to_dict()
+    assert data['startup_cost'] == '$1-5k'
+    assert data['customer_acquisition'] == 'SEO 和口碑'
+    restored = Opportunity.from_dict(data)
+    assert restored == opp
+    assert restored.to_dict() == data
+
+
+def test_slots():
+    opp = make()
+    assert not hasattr(opp, '__dict__')
+    # 分类字段不是 dataclass 字段，序列化用 to_dict()
+    assert 'revenue_model_code' in {f.name for f in fields(opp)}
+
+
+def test_from_dict_missing_required_field():
+    with pytest.raises(TypeError):
+        Opportunity.from_dict({'id': '1', 'title': 't'})
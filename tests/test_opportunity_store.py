@@ -0,0 +1,100 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from models import Opportunity
+from storage.opportunities import OpportunityStore
+from storage.results import ResultWriter
+from storage.seen import SeenStore
+
+
+def make(id: str = '1', score: int = 70, created_at: str = '2026-09-10T12:00:00', source: str = 'hn', **kwargs) -> Opportunity:
+    return Opportunity(id=id, title=f"title {id}", source=source, url=f"https://example.com/{id}",
+                       score=score, created_at=datetime.fromisoformat(created_at), **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OpportunityStore(str(tmp_path / 'research.db'))
+    yield store
+    store.close()
+
+
+def test_newer_result_replaces_older(store):
+    assert store.upsert([make(score=50, tags=['old'])]) == 1
+    assert store.upsert([make(score=90, created_at='2026-09-11T12:00:00', tags=['SaaS'])]) == 1
+    (opp,) = store.top()
+    assert opp.score == 90
+    assert store.top(tag='old') == []
+    assert [o.id for o in store.top(tag='saas')] == ['1']
+
+
+def test_older_result_is_ignored(store):
+    store.upsert([make(score=90, created_at='2026-09-11T12:00:00')])
+    assert store.upsert([make(score=10, created_at='2026-09-01T12:00:00')]) == 0
+    assert store.top()[0].score == 90
+
+
+def test_newest_wins_within_one_batch(store):
+    store.upsert([
+        make(score=10, created_at='2026-09-12T00:00:00'),
+        make(score=80, created_at='2026-09-10T00:00:00'),
+    ])
+    assert [o.score for o in store.top()] == [10]
+    assert store.stats()['total'] == 1
+
+
+def test_top_filters(store):
+    store.upsert([
+        make('a', 95, '2026-09-01T10:00:00', source='hn', tags=['AI']),
+        make('b', 85, '2026-09-15T10:00:00', source='ph', tags=['AI', 'SaaS']),
+        make('c', 75, '2026-09-30T23:00:00', source='hn'),
+        make('d', 40, '2026-10-02T10:00:00', source='hn'),
+    ])
+    assert [o.id for o in store.top(limit=2)] == ['a', 'b']
+    assert [o.id for o in store.top(since='2026-09-10', until='2026-09-30')] == ['b', 'c']
+    assert [o.id for o in store.top(source='hn', min_score=50)] == ['a', 'c']
+    assert [o.id for o in store.top(tag='ai', source='ph')] == ['b']
+
+
+def test_round_trip_keeps_fields(store):
+    opp = make(revenue_model='订阅', startup_cost='视情况', agent_roles=['内容 Agent'], tags=['AI'])
+    store.upsert([opp])
+    assert store.top()[0] == opp
+
+
+def test_import_json_and_jsonl(store, tmp_path):
+    legacy = tmp_path / 'opportunities_20260901.json'
+    legacy.write_text(json.dumps([make('a').to_dict(), {'broken': True}]), encoding='utf-8')
+    lines = tmp_path / 'opportunities_20260902.jsonl'
+    lines.write_text(json.dumps(make('b').to_dict()) + '\n', encoding='utf-8')
+
+    summary = store.import_json([str(legacy), str(lines)])
+    assert summary == {'files': 2, 'records': 2, 'written': 2}
+    # 可重复执行：同样的结果不会重复写入
+    assert store.import_json([str(legacy), str(lines)])['written'] == 2
+    assert store.stats()['total'] == 2
+
+
+def test_shared_connection_interleaves_with_seen_store(tmp_path):
+    # 每个分析结果都记入 SeenStore，只有达到阈值的写入结果：两边的提交时机错开
+    path = str(tmp_path / 'research.db')
+    seen = SeenStore(path, commit_every=20)
+    store = OpportunityStore(conn=seen.conn)
+    writer = ResultWriter(str(tmp_path), store=store, flush_every=20)
+    for n in range(45):
+        opp = make(id=str(n), score=70 if n % 3 else 10)
+        seen.record({'id': str(n), 'source': 'hn', 'title': opp.title, 'url': opp.url}, opp)
+        if n % 3:
+            writer.write(opp)
+    writer.close()
+    store.close()
+    seen.close()
+
+    reopened = OpportunityStore(path)
+    try:
+        assert reopened.stats()['total'] == 30
+        assert reopened.conn.execute("SELECT COUNT(*) FROM seen_items").fetchone()[0] == 45
+    finally:
+        reopened.close()
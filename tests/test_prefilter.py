@@ -0,0 +1,85 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from processors.prefilter import Prefilter, HASH_BITS, NUMERIC_FEATURES
+
+
+def make_prefilter() -> Prefilter:
+    """只看热度：score 越高概率越高"""
+    weights = np.zeros((1 << HASH_BITS) + len(NUMERIC_FEATURES))
+    weights[1 << HASH_BITS] = 5.0
+    return Prefilter(weights, -1.0, threshold=60, cutoff=0.5,
+                     numeric_mean=np.zeros(len(NUMERIC_FEATURES)), numeric_std=np.ones(len(NUMERIC_FEATURES)))
+
+
+def collect(prefilter: Prefilter, items, **kwargs):
+    async def source():
+        for item in items:
+            yield item
+
+    async def run():
+        return [item async for item in prefilter.stream(source(), min_score=60, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_stream_scores_in_batches(monkeypatch):
+    prefilter = make_prefilter()
+    sizes = []
+    predict = prefilter.predict_proba
+    monkeypatch.setattr(prefilter, 'predict_proba', lambda items: sizes.append(len(items)) or predict(items))
+
+    items = [{'id': n, 'title': f"item {n}", 'score': 100 if n % 2 else 0} for n in range(10)]
+    kept = collect(prefilter, items, batch_size=4, linger=1.0)
+
+    assert [item['id'] for item in kept] == [1, 3, 5, 7, 9]
+    assert sizes == [4, 4, 2]
+    assert prefilter.dropped == 5
+
+
+def test_stream_matches_split():
+    prefilter = make_prefilter()
+    items = [{'id': n, 'title': f"item {n}", 'score': n * 10} for n in range(20)]
+    kept, _ = make_prefilter().split(items, 60)
+    assert collect(prefilter, items, batch_size=8, linger=0.01) == kept
+
+
+def test_stream_raises_upstream_error_before_scoring(monkeypatch):
+    prefilter = make_prefilter()
+    sizes = []
+    predict = prefilter.predict_proba
+    monkeypatch.setattr(prefilter, 'predict_proba', lambda items: sizes.append(len(items)) or predict(items))
+
+    async def source():
+        yield {'id': 1, 'title': 'item 1', 'score': 100}
+        yield {'id': 2, 'title': 'item 2', 'score': 100}
+        raise RuntimeError('collector down')
+
+    async def run():
+        return [item async for item in prefilter.stream(source(), min_score=60, batch_size=10, linger=5.0)]
+
+    with pytest.raises(RuntimeError, match='collector down'):
+        asyncio.run(run())
+    assert sizes == []
+
+
+def test_early_stop_closes_upstream():
+    closed = []
+
+    async def source():
+        try:
+            for n in range(100):
+                yield {'id': n, 'title': f"item {n}", 'score': 100}
+        finally:
+            closed.append(True)
+
+    async def run():
+        stream = make_prefilter().stream(source(), min_score=60, batch_size=4, linger=0.01)
+        async for _ in stream:
+            break
+        await stream.aclose()
+        return list(closed)
+
+    assert asyncio.run(run()) == [True]
@@ -0,0 +1,30 @@
+from analyzers.policy import RequestPolicy, TokenBudget
+from transport import TokenBucket
+
+
+def test_bucket_waits_when_overdrawn():
+    bucket = TokenBucket(rate=10, capacity=10)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) > 0.4
+
+
+def test_refund_does_not_exceed_capacity():
+    budget = TokenBudget(rate=1, capacity=100)
+    budget.reserve(10)
+    budget.reserve(-1000)
+    assert budget._tokens == 100
+    # 退还被截断到容量：再预定超过容量的部分仍需等待
+    assert budget.reserve(100) == 0.0
+    assert budget.reserve(50) > 40
+
+
+def test_settle_refund_clamped():
+    policy = RequestPolicy(rpm=0, tpm=6000)
+    capacity = policy.tokens.capacity
+    policy.settle(estimated_tokens=5000, actual_tokens=100)
+    assert policy.tokens.reserve(capacity) == 0.0
+    assert policy.tokens.reserve(capacity) > 0
+
+
+def test_unlimited_bucket():
+    assert TokenBucket(rate=0).reserve(1e9) == 0.0
@@ -0,0 +1,76 @@
+import asyncio
+import gc
+
+from collectors.runner import CollectorRunner
+
+
+async def numbers(count: int = 100):
+    for n in range(count):
+        yield {'id': n}
+        await asyncio.sleep(0.001)
+
+
+def failing():
+    raise RuntimeError('source down')
+
+
+def test_stream_collects_all_sources():
+    runner = CollectorRunner()
+    runner.register('a', numbers, count=3)
+    runner.register('b', failing)
+
+    async def run():
+        return [item async for item in runner.stream()]
+
+    assert sorted(item['id'] for item in asyncio.run(run())) == [0, 1, 2]
+    assert {entry['source']: entry['status'] for entry in runner.report} == {'a': 'ok', 'b': 'error'}
+
+
+def test_early_stop_leaves_no_unretrieved_exception():
+    errors = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        runner = CollectorRunner()
+        runner.register('a', numbers)
+        runner.register('b', numbers)
+        stream = runner.stream()
+        async for _ in stream:
+            break
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        gc.collect()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert errors == []
+
+
+async def slow_to_close():
+    try:
+        while True:
+            yield {'id': 0}
+            await asyncio.sleep(1)
+    finally:
+        await asyncio.sleep(0.2)
+
+
+def test_cancelling_consumer_during_close_propagates():
+    async def consume():
+        stream = CollectorRunner().register('a', slow_to_close).stream()
+        async for _ in stream:
+            break
+        await stream.aclose()
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)  # 此时 consume 正在 aclose() 中等待数据源清理
+        task.cancel()
+        try:
+            await asyncio.wait_for(task, 1)
+        except asyncio.CancelledError:
+            pass
+        return task.cancelled()
+
+    assert asyncio.run(run())
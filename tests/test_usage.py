@@ -0,0 +1,18 @@
+import json
+from datetime import datetime, timedelta
+
+from analyzers.usage import DAILY_KEEP_DAYS, UsageTracker
+
+
+def test_daily_totals_keep_recent_days_only(tmp_path):
+    today = datetime.now()
+    days = [(today - timedelta(days=n)).strftime('%Y-%m-%d') for n in range(30)]
+    (tmp_path / 'daily.json').write_text(json.dumps({day: {'tokens': 100, 'cost': 0.1} for day in days}))
+
+    tracker = UsageTracker(str(tmp_path), daily_token_budget=0, daily_cost_budget=0)
+    assert tracker._previous_tokens == 100
+    tracker.save()
+
+    saved = json.loads((tmp_path / 'daily.json').read_text())
+    assert sorted(saved) == sorted(days[:DAILY_KEEP_DAYS])
+    assert saved[days[0]]['tokens'] == 100
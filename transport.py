@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 传输层 - 所有收集器和 GitHub Issue 创建共用
+
+- 同一个 requests.Session：按主机复用 keep-alive 连接池，减少 TLS 握手
+- 每个主机一个令牌桶（HTTP_RATE_LIMITS），替代各处零散的 time.sleep
+- 429/503 的 Retry-After 记录在主机上，对所有调用方（线程/协程）生效
+- 可选的响应归档（ARCHIVE_MODE）：record 记录原始响应，replay 从归档回放、不访问网络
+"""
+
+import asyncio
+import email.utils
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import metrics
+from config import (
+    HTTP_RATE_LIMITS, HTTP_DEFAULT_RATE, HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_MAX_RETRY_AFTER,
+    ARCHIVE_MODE, ARCHIVE_REPLAY_AT
+)
+
+RETRY_STATUSES = (429, 503)
+ARCHIVE_MODES = ('off', 'record', 'replay')
+
+
+class TokenBucket:
+    """线程安全令牌桶：每秒补充 rate 个令牌，最多积累 capacity 个"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预定令牌，返回需要等待的秒数（令牌立即扣除，可透支）
+
+        rate <= 0 表示不限速。
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期），无法解析返回 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpTransport:
+    """带连接池、按主机限速和 Retry-After 协调的 HTTP 客户端"""
+
+    def __init__(
+        self,
+        rate_limits: Optional[Dict[str, float]] = None,
+        default_rate: float = HTTP_DEFAULT_RATE,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES
+    ):
+        self.rate_limits = dict(HTTP_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.default_rate = default_rate
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.archive = None  # storage.archive.ResponseArchive，由 use_archive() 设置
+        self.archive_mode = 'off'
+        self.replay_at: Optional[float] = None
+
+    def use_archive(self, mode: str, replay_at: Optional[str] = None, archive: Any = None):
+        """
+        设置响应归档模式
+
+        Args:
+            mode: off | record（记录除限流和服务端错误外的所有响应）| replay（只从归档读取，不访问网络）
+            replay_at: 回放时间点（YYYY-MM-DD 或 ISO 时间），默认最新
+        """
+        if mode not in ARCHIVE_MODES:
+            raise ValueError(f"Unknown archive mode: {mode} (expected one of {', '.join(ARCHIVE_MODES)})")
+        from storage.archive import ResponseArchive, parse_replay_at
+
+        self.archive_mode = mode
+        self.replay_at = parse_replay_at(replay_at)
+        if mode == 'off':
+            self.archive = None
+        elif self.archive is None or archive is not None:
+            self.archive = archive or ResponseArchive()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate_limits.get(host, self.default_rate))
+            return bucket
+
+    def _delay(self, url: str) -> float:
+        """本次请求需要等待的时间：令牌桶 + 主机的 Retry-After 封锁"""
+        host = urlparse(url).netloc
+        wait = self._bucket(host).reserve()
+        with self._lock:
+            blocked = self._blocked_until.get(host, 0.0) - time.monotonic()
+        return max(wait, blocked)
+
+    def acquire(self, url: str):
+        """同步等待，直到可以向 url 的主机发请求"""
+        delay = self._delay(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, url: str):
+        """异步等待，直到可以向 url 的主机发请求"""
+        delay = self._delay(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str, status: int, headers: Any, attempt: int = 0) -> bool:
+        """
+        记录响应状态；429/503 时封锁该主机直到 Retry-After（没有则指数退避）
+
+        Returns:
+            是否为可重试的限流响应
+        """
+        if status not in RETRY_STATUSES:
+            return False
+        delay = parse_retry_after(headers.get('Retry-After'))
+        if delay is None:
+            delay = (2 ** attempt) + random.uniform(0, 1)
+        delay = min(delay, HTTP_MAX_RETRY_AFTER)
+
+        host = urlparse(url).netloc
+        metrics.inc('http_throttled_total', host=host, status=status)
+        with self._lock:
+            until = time.monotonic() + delay
+            self._blocked_until[host] = max(self._blocked_until.get(host, 0.0), until)
+        print(f"  {host}: HTTP {status}, backing off {delay:.1f}s")
+        return True
+
+    def request(self, method: str, url: str, archive: bool = True, **kwargs) -> requests.Response:
+        """
+        发送请求：限速、限流重试，其余行为同 requests.request
+
+        archive=False 表示不经过响应归档（有副作用的请求，如创建 Issue）。
+        """
+        if archive and self.archive_mode == 'replay':
+            return self._replay(method, url, kwargs)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(url)
+            started = time.perf_counter()
+            response = self.session.request(method, url, **kwargs)
+            self._measure(url, response.status_code, started)
+            if not self.observe(url, response.status_code, response.headers, attempt) or attempt == self.max_retries:
+                break
+        if archive and self.archive_mode == 'record':
+            self._record(response)
+        return response
+
+    @staticmethod
+    def _measure(url: str, status: int, started: float):
+        """请求耗时直方图和按状态码的响应计数"""
+        host = urlparse(url).netloc
+        metrics.observe('http_request_seconds', time.perf_counter() - started, host=host)
+        metrics.inc('http_responses_total', host=host, status=status)
+
+    def _replay(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        """从归档构造响应；没有记录时返回 404"""
+        prepared = requests.Request(
+            method, url, params=kwargs.get('params'), data=kwargs.get('data'), json=kwargs.get('json')
+        ).prepare()
+        body = prepared.body.encode('utf-8') if isinstance(prepared.body, str) else prepared.body
+        found = self.archive.lookup(method, prepared.url, body, before=self.replay_at)
+
+        response = requests.Response()
+        response.url = prepared.url
+        response.request = prepared
+        if found is None:
+            print(f"  Archive miss: {method} {prepared.url}")
+            response.status_code = 404
+            response._content = b''
+            return response
+        response.status_code, headers, response._content = found
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def _record(self, response: requests.Response):
+        """记录原始响应（限流和服务端错误不记录）"""
+        if not _archivable(response.status_code):
+            return
+        body = response.request.body
+        body = body.encode('utf-8') if isinstance(body, str) else body
+        self.archive.record(response.request.method, response.request.url, response.status_code,
+                            response.headers, response.content, body)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    async def get_json_async(self, session: aiohttp.ClientSession, url: str, timeout: float) -> Any:
+        """aiohttp GET 并解析 JSON（同样限速、限流重试、响应归档），非 200 返回 None"""
+        if self.archive_mode == 'replay':
+            found = self.archive.lookup('GET', url, before=self.replay_at)
+            return json.loads(found[2]) if found and found[0] == 200 else None
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(url)
+            started = time.perf_counter()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                self._measure(url, response.status, started)
+                if self.archive_mode == 'record' and _archivable(response.status):
+                    # 与同步路径的 _record 规则一致：404 等响应也记录，回放时同样得到 None
+                    body = await response.read()
+                    self.archive.record('GET', url, response.status, response.headers, body)
+                    return json.loads(body) if response.status == 200 else None
+                if response.status == 200:
+                    return await response.json()
+                if not self.observe(url, response.status, response.headers, attempt):
+                    return None
+        return None
+
+
+def _archivable(status: int) -> bool:
+    """是否记录到响应归档：限流和服务端错误是临时状态，不记录"""
+    return status not in RETRY_STATUSES and status < 500
+
+
+# 进程内共享的默认实例
+_default = HttpTransport()
+if ARCHIVE_MODE != 'off':
+    _default.use_archive(ARCHIVE_MODE, ARCHIVE_REPLAY_AT)
+
+
+def use_archive(mode: str, replay_at: Optional[str] = None, archive: Any = None):
+    """设置默认实例的响应归档模式（见 HttpTransport.use_archive）"""
+    _default.use_archive(mode, replay_at, archive)
+
+
+def archive_mode() -> str:
+    return _default.archive_mode
+
+
+def archive_stats() -> Optional[Dict[str, int]]:
+    """本次运行的归档计数（未启用归档时为 None）"""
+    return dict(_default.archive.stats) if _default.archive else None
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return _default.get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return _default.post(url, **kwargs)
+
+
+async def get_json_async(session: aiohttp.ClientSession, url: str, timeout: float) -> Any:
+    return await _default.get_json_async(session, url, timeout)